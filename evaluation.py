@@ -1,11 +1,18 @@
 """
 Chess position evaluation functions.
-Implements material counting, piece-square tables, and positional evaluation.
+Implements material counting, piece-square tables, and positional evaluation
+directly on python-chess bitboards. Leaf scores (rollout endpoints and
+evaluate_board) are memoised in a bounded LRU cache keyed by the
+position's Zobrist hash.
 """
 
+import atexit
+import os
+from collections import OrderedDict
 import chess
+import chess.polyglot
 import numpy as np
-from src.chess_ai.position_encoding import encode_position
+from src.chess_ai.config import Config
 
 # Piece values
 PIECE_VALUES = {
@@ -29,6 +36,50 @@ PAWN_TABLE = [
     0,  0,  0,  0,  0,  0,  0,  0
 ]
 
+def _rank_tables(table):
+    """
+    Precompute, for every rank, the table sum of each 8-bit file pattern so a
+    bitboard can be scored with one lookup per rank instead of per square.
+    """
+    rank_tables = []
+    for rank in range(8):
+        sums = [0] * 256
+        for pattern in range(256):
+            sums[pattern] = sum(table[rank * 8 + file]
+                                for file in range(8) if pattern >> file & 1)
+        rank_tables.append(sums)
+    return rank_tables
+
+# Black pawns use the table mirrored through the centre (square 63 - s)
+WHITE_PAWN_RANK_TABLES = _rank_tables(PAWN_TABLE)
+BLACK_PAWN_RANK_TABLES = _rank_tables([PAWN_TABLE[63 - square] for square in chess.SQUARES])
+
+CENTER_MASK = chess.BB_E4 | chess.BB_E5 | chess.BB_D4 | chess.BB_D5
+
+def _table_score(mask, rank_tables):
+    score = 0
+    for rank in range(8):
+        pattern = (mask >> (rank * 8)) & 0xFF
+        if pattern:
+            score += rank_tables[rank][pattern]
+    return score
+
+def attack_mask(board, color):
+    """
+    Squares attacked by color, as a bitboard.
+    
+    A square is included exactly when board.is_attacked_by(color, square).
+    """
+    pawns = board.pieces_mask(chess.PAWN, color)
+    if color == chess.WHITE:
+        mask = ((pawns & ~chess.BB_FILE_A) << 7 | (pawns & ~chess.BB_FILE_H) << 9) & chess.BB_ALL
+    else:
+        mask = (pawns & ~chess.BB_FILE_A) >> 9 | (pawns & ~chess.BB_FILE_H) >> 7
+    
+    for square in chess.scan_forward(board.occupied_co[color] & ~pawns):
+        mask |= board.attacks_mask(square)
+    return mask
+
 def evaluate_material(board):
     """
     Calculates material balance of the position.
@@ -39,56 +90,227 @@ def evaluate_material(board):
     Returns:
         int: Material balance score (positive favors white)
     """
+    white = board.occupied_co[chess.WHITE]
+    black = board.occupied_co[chess.BLACK]
     score = 0
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece is not None:
-            value = PIECE_VALUES[piece.piece_type]
-            if piece.color == chess.WHITE:
-                score += value
-            else:
-                score -= value
+    for piece_type, pieces in ((chess.PAWN, board.pawns), (chess.KNIGHT, board.knights),
+                               (chess.BISHOP, board.bishops), (chess.ROOK, board.rooks),
+                               (chess.QUEEN, board.queens), (chess.KING, board.kings)):
+        score += PIECE_VALUES[piece_type] * (chess.popcount(pieces & white) -
+                                             chess.popcount(pieces & black))
     return score
 
 def evaluate_piece_position(board):
     """Evaluate piece positions using piece-square tables"""
-    score = 0
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece is not None and piece.piece_type == chess.PAWN:
-            if piece.color == chess.WHITE:
-                score += PAWN_TABLE[square]
-            else:
-                score -= PAWN_TABLE[63 - square]
-    return score
+    return (_table_score(board.pawns & board.occupied_co[chess.WHITE], WHITE_PAWN_RANK_TABLES) -
+            _table_score(board.pawns & board.occupied_co[chess.BLACK], BLACK_PAWN_RANK_TABLES))
 
 def evaluate_center_control(board):
     """Evaluate control of the center squares"""
-    central_squares = [chess.E4, chess.E5, chess.D4, chess.D5]
-    score = 0
-    for square in central_squares:
-        if board.is_attacked_by(chess.WHITE, square):
-            score += 10
-        if board.is_attacked_by(chess.BLACK, square):
-            score -= 10
+    return 10 * (chess.popcount(attack_mask(board, chess.WHITE) & CENTER_MASK) -
+                 chess.popcount(attack_mask(board, chess.BLACK) & CENTER_MASK))
+
+class EvaluationCache:
+    """
+    Least-recently-used cache of evaluation scores.
+    
+    Attributes:
+        capacity (int): Maximum number of positions kept
+        hits (int): Lookups answered from the cache
+        misses (int): Lookups that had to evaluate the position
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._scores = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self):
+        return len(self._scores)
+    
+    def get(self, key):
+        """Cached score for key, or None"""
+        score = self._scores.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self._scores.move_to_end(key)
+        self.hits += 1
+        return score
+    
+    def put(self, key, score):
+        """Store a score, evicting the least recently used entry when full"""
+        self._scores[key] = score
+        self._scores.move_to_end(key)
+        while len(self._scores) > self.capacity:
+            self._scores.popitem(last=False)
+    
+    def clear(self):
+        """Remove all entries and reset the counters"""
+        self._scores.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def save(self, path):
+        """Write the cache to an .npz file, oldest entries first"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        keys = np.fromiter(self._scores.keys(), dtype=np.uint64, count=len(self._scores))
+        scores = np.fromiter(self._scores.values(), dtype=np.float64, count=len(self._scores))
+        with open(path, 'wb') as f:
+            np.savez(f, keys=keys, scores=scores)
+    
+    def load(self, path):
+        """
+        Warm-start from a file written by save.
+        
+        Returns:
+            int: Number of entries loaded (0 if the file does not exist)
+        """
+        if not os.path.exists(path):
+            return 0
+        with np.load(path) as data:
+            keys, scores = data['keys'], data['scores']
+        for key, score in zip(keys.tolist(), scores.tolist()):
+            self.put(key, score)
+        return len(keys)
+    
+    def stats(self):
+        """Hit/miss counters and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._scores),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+def _create_evaluation_cache():
+    settings = Config.EVALUATION_SETTINGS
+    if settings['cache_size'] <= 0:
+        return None
+    cache = EvaluationCache(settings['cache_size'])
+    if settings['persist_cache']:
+        cache.load(Config.PATHS['evaluation_cache'])
+        atexit.register(cache.save, Config.PATHS['evaluation_cache'])
+    return cache
+
+# Process-wide cache of leaf scores, None when disabled
+evaluation_cache = _create_evaluation_cache()
+
+def _cached_score(board, evaluate):
+    """Score of board from evaluation_cache, calling evaluate() on a miss"""
+    if evaluation_cache is None:
+        return evaluate()
+    
+    key = chess.polyglot.zobrist_hash(board)
+    score = evaluation_cache.get(key)
+    if score is None:
+        score = evaluate()
+        evaluation_cache.put(key, score)
     return score
 
 def evaluate_board(board):
-    """Enhanced evaluation function using new position encoding"""
-    if board.is_checkmate():
+    """Evaluate a position, using the evaluation cache when enabled"""
+    return _cached_score(board, lambda: evaluate_position(board))
+
+def evaluate_position(board):
+    """
+    Evaluate a position from white's point of view.
+    
+    Combines material, pawn piece-square tables, mobility (legal moves of
+    the side to move) and the number of squares each side attacks. Works
+    on bitboards with a single legal move generation; the result is the
+    same as scoring the encode_position feature planes.
+    """
+    return _evaluate_with(board, evaluate_material(board), evaluate_piece_position(board))
+
+def _evaluate_with(board, material_score, position_score):
+    """evaluate_position with the material and piece-square terms supplied"""
+    mobility = board.legal_moves.count()
+    if mobility == 0 and board.is_check():
         return -10000 if board.turn else 10000
-    if board.is_stalemate() or board.is_insufficient_material():
+    if mobility == 0 or board.is_insufficient_material():
         return 0
     
-    # Get position encoding
-    features = encode_position(board)
+    # Mobility and attack terms, with the same float32 arithmetic as summing
+    # the feature planes
+    white_attacks = chess.popcount(attack_mask(board, chess.WHITE))
+    black_attacks = chess.popcount(attack_mask(board, chess.BLACK))
+    mobility_score = np.float32(mobility) * 0.1
+    attack_score = (np.float32(white_attacks) - np.float32(black_attacks)) * 5
     
-    # Basic material and position evaluation
-    material_score = evaluate_material(board)
-    position_score = evaluate_piece_position(board)
+    return material_score + position_score + mobility_score + attack_score
+
+def _pawn_square_value(square, color):
+    return PAWN_TABLE[square] if color == chess.WHITE else PAWN_TABLE[63 - square]
+
+class IncrementalEvaluator:
+    """
+    Keeps the material and piece-square terms of evaluate_position up to
+    date while moves are pushed and popped, so a leaf only needs the
+    mobility and attack terms computed from scratch.
     
-    # Enhanced evaluation using mobility and attack maps
-    mobility_score = np.sum(features[:,:,-1]) * 0.1
-    attack_score = (np.sum(features[:,:,-3]) - np.sum(features[:,:,-2])) * 5
+    Attributes:
+        board (chess.Board): Tracked board; moves must go through push/pop
+        material (int): Current evaluate_material score
+        position (int): Current evaluate_piece_position score
+    """
+    def __init__(self, board):
+        self.board = board
+        self.material = evaluate_material(board)
+        self.position = evaluate_piece_position(board)
+        self._deltas = []
     
-    return material_score + position_score + mobility_score + attack_score
+    def push(self, move):
+        """Play a move on the tracked board"""
+        material, position = self._move_delta(move)
+        self._deltas.append((material, position))
+        self.material += material
+        self.position += position
+        self.board.push(move)
+    
+    def pop(self):
+        """Take back the last move pushed through this evaluator"""
+        material, position = self._deltas.pop()
+        self.material -= material
+        self.position -= position
+        return self.board.pop()
+    
+    def evaluate(self):
+        """
+        Same score as evaluate_position(self.board). Rollouts score their
+        final position here, so it goes through the evaluation cache.
+        """
+        return _cached_score(self.board,
+                             lambda: _evaluate_with(self.board, self.material, self.position))
+    
+    def _move_delta(self, move):
+        """Change in the material and piece-square scores caused by move"""
+        board = self.board
+        color = board.turn
+        sign = 1 if color == chess.WHITE else -1
+        material = 0
+        position = 0
+        
+        if board.is_en_passant(move):
+            captured_square = move.to_square - 8 if color == chess.WHITE else move.to_square + 8
+            captured_type = chess.PAWN
+        elif board.color_at(move.to_square) == (not color):
+            captured_square = move.to_square
+            captured_type = board.piece_type_at(move.to_square)
+        else:
+            captured_type = None
+        
+        if captured_type is not None:
+            material += sign * PIECE_VALUES[captured_type]
+            if captured_type == chess.PAWN:
+                position += sign * _pawn_square_value(captured_square, not color)
+        
+        if board.piece_type_at(move.from_square) == chess.PAWN:
+            position -= sign * _pawn_square_value(move.from_square, color)
+            if move.promotion:
+                material += sign * (PIECE_VALUES[move.promotion] - PIECE_VALUES[chess.PAWN])
+            else:
+                position += sign * _pawn_square_value(move.to_square, color)
+        return material, position
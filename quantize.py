@@ -0,0 +1,30 @@
+import sys
+from src.chess_ai.config import Config
+from src.chess_ai.quantization import (calibration_planes, quantization_drift, quantize_model,
+                                       save_quantized)
+from src.chess_ai.reinforcement import RLTrainer
+
+def main():
+    # 'static' (default) or 'dynamic'
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'static'
+    Config.create_directories()
+    
+    trainer = RLTrainer.from_checkpoint()
+    
+    # Calibrate on self-play positions and measure drift on the same positions
+    positions = calibration_planes(Config.PATHS['replay_buffer'],
+                                   Config.INFERENCE_SETTINGS['calibration_size'])
+    if len(positions) == 0:
+        print("No self-play positions found; run train_self_play.py first")
+        return
+    
+    quantized = quantize_model(trainer.model, mode, positions)
+    save_quantized(quantized, Config.PATHS['quantized_model'])
+    drift = quantization_drift(trainer.model, quantized, positions)
+    
+    print(f"Saved {mode} int8 model to {Config.PATHS['quantized_model']}")
+    print(f"Policy top-1 agreement: {drift['top1_agreement']:.1%} over {drift['positions']} positions")
+    print(f"Value mean absolute error: {drift['value_mae']:.4f}")
+
+if __name__ == "__main__":
+    main()
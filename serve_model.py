@@ -0,0 +1,4 @@
+from src.chess_ai.model_server import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Array-backed Monte Carlo Tree Search.
+Stores the whole tree in preallocated NumPy arrays instead of per-node
+Python objects. Positions are not stored; they are rebuilt by replaying
+moves from the root during selection.
+"""
+
+import chess
+import math
+import random
+import time
+import numpy as np
+from src.mcts import moves_since
+from src.rollout import rollout
+from src.chess_ai.config import Config
+from src.transposition import position_key
+
+TERMINAL = -2
+
+def pack_move(move):
+    """Pack a move into 16 bits: from | to << 6 | promotion << 12"""
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+def unpack_move(packed):
+    """Inverse of pack_move"""
+    packed = int(packed)
+    promotion = packed >> 12
+    return chess.Move(packed & 0x3F, (packed >> 6) & 0x3F, promotion or None)
+
+class NodeArrays:
+    """
+    Fixed-capacity structure-of-arrays storage for tree nodes.
+
+    Children of a node occupy a contiguous index range
+    [first_child, first_child + num_children).
+
+    Attributes:
+        capacity (int): Maximum number of nodes
+        size (int): Number of nodes allocated so far
+        visits (np.ndarray): Visit count per node
+        value_sum (np.ndarray): Sum of backed-up results per node
+        prior (np.ndarray): Prior probability of the move leading to the node
+        parent (np.ndarray): Parent index, -1 for the root
+        first_child (np.ndarray): Index of the first child, -1 if unexpanded
+            and TERMINAL if the position has no legal moves
+        num_children (np.ndarray): Number of children
+        move (np.ndarray): Packed move leading to the node
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.size = 0
+        self.visits = np.zeros(capacity, dtype=np.int32)
+        self.value_sum = np.zeros(capacity, dtype=np.float32)
+        self.prior = np.ones(capacity, dtype=np.float32)
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        self.first_child = np.full(capacity, -1, dtype=np.int32)
+        self.num_children = np.zeros(capacity, dtype=np.int16)
+        self.move = np.zeros(capacity, dtype=np.uint16)
+
+    def allocate(self, count):
+        """Reserve count consecutive nodes, returns the first index or -1 when full"""
+        if self.size + count > self.capacity:
+            return -1
+        start = self.size
+        self.size += count
+        return start
+
+    @property
+    def nbytes(self):
+        """Memory used by the node arrays"""
+        return sum(array.nbytes for array in (
+            self.visits, self.value_sum, self.prior, self.parent,
+            self.first_child, self.num_children, self.move))
+
+class ArrayMCTS:
+    """
+    MCTS with the same selection, rollout and backup rules as MCTS, but with
+    a memory footprint fixed by max_nodes. Once the arrays are full the
+    tree stops growing and further iterations only refine existing nodes.
+
+    Attributes:
+        root_board (chess.Board): Position at the root; moves are pushed
+            onto it during an iteration and popped again afterwards
+        nodes (NodeArrays): Tree storage, node 0 is the root
+        max_iterations (int): Upper bound on iterations per search
+        iterations (int): Iterations completed by the last search
+        simulations (int): Simulations (rollouts) run by the last search
+        elapsed (float): Wall-clock seconds spent in the last search
+        transpositions (TranspositionTable): Optional table of leaf results
+        tt_samples (int): Results a table entry needs before it replaces a
+            rollout
+        rollout_policy (RolloutPolicy): Plays the simulations, the default
+            policy if None
+    """
+    def __init__(self, board, max_iterations=None, max_nodes=None, transpositions=None,
+                 rollout_policy=None):
+        self.root_board = board.copy()
+        self.root_ply = self.root_board.ply()
+        self.nodes = NodeArrays(max_nodes or Config.MCTS_SETTINGS['max_nodes'])
+        self.nodes.allocate(1)
+        self.max_iterations = max_iterations or Config.MCTS_SETTINGS['max_iterations']
+        self.transpositions = transpositions
+        self.tt_samples = Config.MCTS_SETTINGS['tt_samples']
+        self.rollout_policy = rollout_policy
+        self.iterations = 0
+        self.simulations = 0
+        self.elapsed = 0.0
+
+    def select_child(self, node):
+        """Select child with highest UCB1 value"""
+        nodes = self.nodes
+        start = nodes.first_child[node]
+        end = start + nodes.num_children[node]
+        visits = nodes.visits[start:end]
+
+        unvisited = np.flatnonzero(visits == 0)
+        if len(unvisited):
+            return start + unvisited[0]
+
+        exploration = (Config.MCTS_SETTINGS['exploration_constant'] *
+                       np.sqrt(math.log(nodes.visits[node]) / visits))
+        ucb = nodes.value_sum[start:end] / visits + exploration
+        return start + int(np.argmax(ucb))
+
+    def select(self):
+        """Walk down to a leaf, returning its index and root_board at the leaf"""
+        nodes = self.nodes
+        board = self.root_board
+        node = 0
+        while nodes.num_children[node] > 0:
+            node = self.select_child(node)
+            board.push(unpack_move(nodes.move[node]))
+        return node, board
+
+    def expand(self, node, board):
+        """
+        Allocate all children of a leaf in one contiguous block.
+
+        Returns:
+            bool: False if the position is terminal or the tree is full
+        """
+        nodes = self.nodes
+        if nodes.first_child[node] != -1:
+            return False
+
+        legal_moves = list(board.legal_moves)
+        if not legal_moves:
+            nodes.first_child[node] = TERMINAL
+            return False
+
+        start = nodes.allocate(len(legal_moves))
+        if start < 0:
+            return False
+
+        end = start + len(legal_moves)
+        nodes.move[start:end] = [pack_move(move) for move in legal_moves]
+        nodes.parent[start:end] = node
+        nodes.first_child[node] = start
+        nodes.num_children[node] = len(legal_moves)
+        return True
+
+    def simulate(self, board):
+        """Run a simulation from the current position"""
+        if self.rollout_policy is None:
+            return rollout(board)
+        return self.rollout_policy(board)
+
+    def evaluate_leaf(self, board):
+        """Result for a leaf, from the transposition table or a new rollout"""
+        if self.transpositions is None:
+            self.simulations += 1
+            return self.simulate(board)
+
+        result, simulated = self.transpositions.sample(position_key(board),
+                                                       lambda: self.simulate(board),
+                                                       self.tt_samples)
+        self.simulations += simulated
+        return result
+
+    def backpropagate(self, node, result):
+        """Backpropagate the simulation result up the tree"""
+        nodes = self.nodes
+        while node != -1:
+            nodes.visits[node] += 1
+            nodes.value_sum[node] += result
+            node = nodes.parent[node]
+            result = 1 - result  # Flip result for opponent
+
+    def get_best_move(self, time_limit=None):
+        """
+        Run MCTS and return the best move.
+
+        Args:
+            time_limit (float, optional): Wall-clock budget in seconds
+
+        Returns:
+            chess.Move: Most visited move at the root
+        """
+        start = time.monotonic()
+        deadline = start + time_limit if time_limit is not None else None
+        self.iterations = 0
+        self.simulations = 0
+
+        while self.iterations < self.max_iterations:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+            leaf, board = self.select()
+            if self.expand(leaf, board):
+                leaf = self.select_child(leaf)
+                board.push(unpack_move(self.nodes.move[leaf]))
+
+            result = self.evaluate_leaf(board)
+            while board.ply() > self.root_ply:
+                board.pop()
+            self.backpropagate(leaf, result)
+            self.iterations += 1
+
+        self.elapsed = time.monotonic() - start
+        return self.best_move()
+
+    def best_move(self):
+        """Most visited root move, or a random legal move if nothing was searched"""
+        nodes = self.nodes
+        if nodes.num_children[0] == 0:
+            return random.choice(list(self.root_board.legal_moves))
+
+        start = nodes.first_child[0]
+        end = start + nodes.num_children[0]
+        return unpack_move(nodes.move[start + int(np.argmax(nodes.visits[start:end]))])
+
+    def root_statistics(self):
+        """Visit count and summed result of each expanded root move"""
+        nodes = self.nodes
+        start = nodes.first_child[0]
+        if start < 0:
+            return {}
+        return {unpack_move(nodes.move[child]): (int(nodes.visits[child]),
+                                                 float(nodes.value_sum[child]))
+                for child in range(start, start + nodes.num_children[0])}
+
+    def find_child(self, node, move):
+        """Index of the child reached by move, or -1 if it was never expanded"""
+        nodes = self.nodes
+        start = nodes.first_child[node]
+        if start < 0:
+            return -1
+        end = start + nodes.num_children[node]
+        matches = np.flatnonzero(nodes.move[start:end] == pack_move(move))
+        return start + int(matches[0]) if len(matches) else -1
+
+    def reroot(self, board):
+        """
+        Move the root to the node for board, keeping its subtree.
+
+        The subtree is copied into fresh arrays so that the space used by
+        the discarded part of the tree is reclaimed.
+
+        Args:
+            board (chess.Board): Position reached from the current root
+
+        Returns:
+            bool: False if board does not continue the root position
+        """
+        moves = moves_since(self.root_board, board)
+        if moves is None:
+            return False
+
+        node = 0
+        for move in moves:
+            node = self.find_child(node, move)
+            if node < 0:
+                break
+
+        self.nodes = self._copy_subtree(node) if node >= 0 else self._empty_tree()
+        self.root_board = board.copy()
+        self.root_ply = self.root_board.ply()
+        return True
+
+    def _empty_tree(self):
+        nodes = NodeArrays(self.nodes.capacity)
+        nodes.allocate(1)
+        return nodes
+
+    def _copy_subtree(self, root):
+        """Copy the subtree under root into a new NodeArrays with root at index 0"""
+        old = self.nodes
+        new = self._empty_tree()
+        new.visits[0] = old.visits[root]
+        new.value_sum[0] = old.value_sum[root]
+
+        queue = [(root, 0)]
+        while queue:
+            old_node, new_node = queue.pop()
+            if old.first_child[old_node] == TERMINAL:
+                new.first_child[new_node] = TERMINAL
+                continue
+
+            count = int(old.num_children[old_node])
+            if count == 0:
+                continue
+
+            old_start = old.first_child[old_node]
+            old_end = old_start + count
+            start = new.allocate(count)
+            end = start + count
+            new.visits[start:end] = old.visits[old_start:old_end]
+            new.value_sum[start:end] = old.value_sum[old_start:old_end]
+            new.prior[start:end] = old.prior[old_start:old_end]
+            new.move[start:end] = old.move[old_start:old_end]
+            new.parent[start:end] = new_node
+            new.first_child[new_node] = start
+            new.num_children[new_node] = count
+            queue.extend(zip(range(old_start, old_end), range(start, end)))
+        return new
+
+    def search_stats(self):
+        """Summary of the last search for logging and time tuning"""
+        return {
+            'iterations': self.iterations,
+            'simulations': self.simulations,
+            'elapsed': self.elapsed,
+            'simulations_per_second': (self.simulations / self.elapsed
+                                       if self.elapsed > 0 else 0.0),
+            'root_visits': int(self.nodes.visits[0]),
+            'nodes': self.nodes.size,
+            'tree_bytes': self.nodes.nbytes,
+            'transpositions': (self.transpositions.stats()
+                               if self.transpositions is not None else None),
+        }
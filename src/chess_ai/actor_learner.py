@@ -0,0 +1,195 @@
+"""
+Asynchronous actor/learner training.
+Self-play actors (SelfPlayTrainer worker processes) keep writing finished
+games into an on-disk ReplayBuffer while a learner process trains on
+samples from it. The learner publishes its weights every few steps and
+the actors reload them before their next game, so generating and
+learning run side by side instead of taking turns.
+"""
+
+import multiprocessing
+import queue
+import time
+from src.chess_ai.config import Config
+from src.chess_ai.quantization import publish_quantized, quantized_path
+from src.chess_ai.reinforcement import RLTrainer
+from src.chess_ai.replay_buffer import ReplayBuffer
+from src.chess_ai.self_play import SelfPlayTrainer
+
+def run_learner(directory, weights_path, stop_event, stats_queue=None, batch_size=None,
+                publish_interval=None, min_samples=None, max_steps=None):
+    """
+    Train on a replay buffer until stop_event is set.
+
+    Starts from the weights published at weights_path, if any, and
+    publishes the trained weights every publish_interval steps and once
+    more when it stops. With NN_QUANTIZE set, an int8 copy is published
+    next to them each time, so actors never quantize themselves.
+
+    Args:
+        directory (str): ReplayBuffer directory written by the actors
+        weights_path (str): Where weights are published
+        stop_event (multiprocessing.Event): Set to end training
+        stats_queue (multiprocessing.Queue, optional): Receives a stats dict
+            after every publish
+        batch_size (int, optional): Samples per training step
+        publish_interval (int, optional): Training steps between publishes
+        min_samples (int, optional): Samples the buffer needs before training
+        max_steps (int, optional): Stop after this many steps
+
+    Returns:
+        dict: Final stats (steps, samples, samples_per_second, version, loss)
+    """
+    settings = Config.ACTOR_LEARNER_SETTINGS
+    batch_size = batch_size or Config.RL_SETTINGS['batch_size']
+    publish_interval = publish_interval or settings['publish_interval']
+    min_samples = min_samples if min_samples is not None else settings['min_samples']
+
+    trainer = RLTrainer()
+    version = trainer.load_published_weights(weights_path) or 0
+    buffer = ReplayBuffer(directory)
+    quantize = Config.INFERENCE_SETTINGS['quantize']
+
+    def publish():
+        trainer.publish_weights(weights_path, version)
+        if quantize != 'none':
+            publish_quantized(trainer.model, quantized_path(weights_path), quantize, directory)
+    steps = 0
+    loss = None
+    start = None  # Set at the first training step, so waiting for samples is not counted
+
+    def stats():
+        elapsed = time.monotonic() - start if start is not None else 0.0
+        return {
+            'steps': steps,
+            'samples': steps * batch_size,
+            'samples_per_second': steps * batch_size / elapsed if elapsed > 0 else 0.0,
+            'version': version,
+            'loss': loss,
+            'buffer_size': len(buffer),
+        }
+
+    while not stop_event.is_set() and (max_steps is None or steps < max_steps):
+        buffer.refresh()
+        if len(buffer) < max(min_samples, 1):
+            stop_event.wait(0.1)
+            continue
+        try:
+            records = buffer.sample(batch_size)
+        except FileNotFoundError:
+            continue  # A shard left the window while sampling; retry with the new window
+        if start is None:
+            start = time.monotonic()
+        loss = trainer.train_records(records)
+        steps += 1
+
+        if steps % publish_interval == 0:
+            version += 1
+            publish()
+            if stats_queue is not None:
+                stats_queue.put(stats())
+
+    if steps % publish_interval != 0:
+        version += 1
+        publish()
+    final_stats = stats()
+    if stats_queue is not None:
+        stats_queue.put(final_stats)
+    return final_stats
+
+class ActorLearnerPipeline:
+    """
+    Runs self-play actors and a learner process concurrently.
+
+    With N actors and one learner, N + 1 cores are kept busy; set
+    SELF_PLAY_WORKERS to the number of cores minus one.
+
+    Attributes:
+        num_games (int): Games the actors play before the pipeline stops
+        replay_buffer (ReplayBuffer): Buffer the actors write and the
+            learner samples
+        weights_path (str): File the learner publishes weights to
+        self_play_trainer (SelfPlayTrainer): Actor pool
+        learner_stats (dict): Latest stats reported by the learner
+    """
+    def __init__(self, num_games=1000, replay_buffer=None, weights_path=None, num_workers=None):
+        self.num_games = num_games
+        # An empty buffer is falsy, so test for None
+        self.replay_buffer = (replay_buffer if replay_buffer is not None
+                              else ReplayBuffer(Config.PATHS['replay_buffer']))
+        self.weights_path = weights_path or Config.PATHS['published_model']
+        self.self_play_trainer = SelfPlayTrainer(num_games=num_games, num_workers=num_workers,
+                                                 replay_buffer=self.replay_buffer,
+                                                 weights_path=self.weights_path)
+        self.learner_stats = None
+
+    def run(self, **learner_options):
+        """
+        Play num_games with the actors while the learner trains, then stop
+        the learner and load its final weights into self_play_trainer.ai.
+
+        Args:
+            **learner_options: Extra keyword arguments for run_learner
+
+        Returns:
+            dict: actor and learner stats
+        """
+        ai = self.self_play_trainer.ai
+        # Actors and learner start from the same weights
+        ai.rl_trainer.publish_weights(self.weights_path, 0)
+
+        context = multiprocessing.get_context()
+        stop_event = context.Event()
+        stats_queue = context.Queue()
+        learner = context.Process(
+            target=run_learner,
+            args=(self.replay_buffer.directory, self.weights_path, stop_event, stats_queue),
+            kwargs=learner_options,
+            daemon=True,
+        )
+        learner.start()
+
+        try:
+            for i, (moves, result) in enumerate(self.self_play_trainer.generate_games(self.num_games)):
+                self._drain_stats(stats_queue)
+                print(f"Game {i+1}: {result} in {len(moves)} moves "
+                      f"({self.self_play_trainer.games_per_hour:.0f} games/hour) | "
+                      f"{self._learner_summary()}")
+        finally:
+            stop_event.set()
+            # Collect the final stats before joining so the queue can drain
+            deadline = time.monotonic() + 60
+            while learner.is_alive() and time.monotonic() < deadline:
+                self._drain_stats(stats_queue, timeout=0.5)
+            learner.join(timeout=5)
+            self._drain_stats(stats_queue)
+
+        ai.rl_trainer.load_published_weights(self.weights_path)
+        return self.stats()
+
+    def stats(self):
+        """Throughput of both stages"""
+        trainer = self.self_play_trainer
+        return {
+            'games': trainer.games_played,
+            'games_per_hour': trainer.games_per_hour,
+            'failed_games': trainer.failed_games,
+            'learner': self.learner_stats,
+        }
+
+    def _drain_stats(self, stats_queue, timeout=None):
+        """Keep the latest learner stats, waiting up to timeout for the first"""
+        try:
+            if timeout is not None:
+                self.learner_stats = stats_queue.get(timeout=timeout)
+            while True:
+                self.learner_stats = stats_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _learner_summary(self):
+        if self.learner_stats is None:
+            return "learner waiting for samples"
+        stats = self.learner_stats
+        return (f"learner: {stats['steps']} steps, {stats['samples_per_second']:.0f} samples/s, "
+                f"weights v{stats['version']}")
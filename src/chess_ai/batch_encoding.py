@@ -0,0 +1,134 @@
+"""
+Batch position encoder for the neural network.
+Produces (N, 8, 8, 15) float32 tensors in the RLTrainer.board_to_tensor
+layout by unpacking piece bitboards with NumPy instead of looping over
+squares. Only NumPy is needed; torch is imported when a pinned buffer is
+requested.
+"""
+
+import chess
+import numpy as np
+
+NUM_PLANES = 15
+
+# Plane order: white P N B R Q K, then black P N B R Q K
+PLANE_PIECES = [(color, piece_type)
+                for color in (chess.WHITE, chess.BLACK)
+                for piece_type in (chess.PAWN, chess.KNIGHT, chess.BISHOP,
+                                   chess.ROOK, chess.QUEEN, chess.KING)]
+
+# Bits of the per-position flags byte
+FLAG_TURN = 1
+FLAG_KINGSIDE = 2   # Either side may still castle kingside
+FLAG_QUEENSIDE = 4  # Either side may still castle queenside
+
+def board_to_bitboards(board):
+    """
+    Pack a position into 12 piece bitboards and a flags byte.
+
+    Args:
+        board (chess.Board): Position to pack
+
+    Returns:
+        tuple: (list of 12 ints, int flags)
+    """
+    bitboards = [board.pieces_mask(piece_type, color) for color, piece_type in PLANE_PIECES]
+    flags = 0
+    if board.turn:
+        flags |= FLAG_TURN
+    if (board.has_kingside_castling_rights(chess.WHITE) or
+            board.has_kingside_castling_rights(chess.BLACK)):
+        flags |= FLAG_KINGSIDE
+    if (board.has_queenside_castling_rights(chess.WHITE) or
+            board.has_queenside_castling_rights(chess.BLACK)):
+        flags |= FLAG_QUEENSIDE
+    return bitboards, flags
+
+def boards_to_bitboards(boards):
+    """
+    Pack several positions.
+
+    Args:
+        boards (list): chess.Board objects or FEN strings
+
+    Returns:
+        tuple: (bitboards (N, 12) uint64 array, flags (N,) uint8 array)
+    """
+    bitboards = np.empty((len(boards), len(PLANE_PIECES)), dtype='<u8')
+    flags = np.empty(len(boards), dtype=np.uint8)
+    for i, board in enumerate(boards):
+        if isinstance(board, str):
+            board = chess.Board(board)
+        bitboards[i], flags[i] = board_to_bitboards(board)
+    return bitboards, flags
+
+def empty_batch(batch_size, pin_memory=False):
+    """
+    Allocate an uninitialised (batch_size, 8, 8, 15) float32 buffer.
+
+    Args:
+        batch_size (int): Number of positions
+        pin_memory (bool): Back the buffer with a page-locked torch tensor,
+            so torch.from_numpy(buffer) shares it without a copy and can be
+            sent to the GPU asynchronously. Falls back to ordinary memory
+            when pinning is unavailable.
+
+    Returns:
+        np.ndarray: Buffer to pass as out= to the encoders
+    """
+    shape = (batch_size, 8, 8, NUM_PLANES)
+    if not pin_memory:
+        return np.empty(shape, dtype=np.float32)
+
+    import torch
+    try:
+        tensor = torch.empty(shape, dtype=torch.float32, pin_memory=True)
+    except RuntimeError:
+        tensor = torch.empty(shape, dtype=torch.float32)
+    return tensor.numpy()
+
+def encode_bitboards(bitboards, flags, out=None):
+    """
+    Encode packed positions into network input planes.
+
+    Args:
+        bitboards (np.ndarray): (N, 12) piece bitboards
+        flags (np.ndarray): (N,) flags bytes
+        out (np.ndarray, optional): Contiguous (N, 8, 8, 15) float32 buffer
+            to write into
+
+    Returns:
+        np.ndarray: (N, 8, 8, 15) float32 encoding
+    """
+    bitboards = np.ascontiguousarray(bitboards, dtype='<u8')
+    flags = np.asarray(flags, dtype=np.uint8)
+    count = len(bitboards)
+    if out is None:
+        out = np.empty((count, 8, 8, NUM_PLANES), dtype=np.float32)
+    elif out.shape != (count, 8, 8, NUM_PLANES) or not out.flags['C_CONTIGUOUS']:
+        raise ValueError(f"out must be a contiguous array of shape {(count, 8, 8, NUM_PLANES)}")
+
+    # Bit i of a bitboard is square i = rank * 8 + file
+    bits = np.unpackbits(bitboards.view(np.uint8).reshape(count, len(PLANE_PIECES), 8),
+                         axis=2, bitorder='little')
+    squares = out.reshape(count, 64, NUM_PLANES)
+    squares[:, :, :len(PLANE_PIECES)] = bits.transpose(0, 2, 1)
+    squares[:, :, 12] = (flags & FLAG_TURN != 0)[:, np.newaxis]
+    squares[:, :, 13] = (flags & FLAG_KINGSIDE != 0)[:, np.newaxis]
+    squares[:, :, 14] = (flags & FLAG_QUEENSIDE != 0)[:, np.newaxis]
+    return out
+
+def encode_boards(boards, out=None):
+    """
+    Encode several positions into network input planes.
+
+    Args:
+        boards (list): chess.Board objects or FEN strings
+        out (np.ndarray, optional): Contiguous (N, 8, 8, 15) float32 buffer,
+            e.g. from empty_batch
+
+    Returns:
+        np.ndarray: (N, 8, 8, 15) float32 encoding
+    """
+    bitboards, flags = boards_to_bitboards(boards)
+    return encode_bitboards(bitboards, flags, out=out)
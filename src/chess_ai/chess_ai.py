@@ -4,18 +4,26 @@ Includes opening book and tablebase support.
 """
 
 import chess
-import chess.polyglot
-import random
+import os
+import sys
+import time
 from src.mcts import MCTS
-from src.chess_ai.reinforcement import RLTrainer
+from src.array_mcts import ArrayMCTS
+from src.parallel_mcts import RootParallelMCTS, TreeParallelMCTS
+from src.neural_mcts import NeuralMCTS
+from src.transposition import TranspositionTable
+from src.chess_ai.model_client import ModelClient
 from src.time_management import TimeManager
 from src.chess_ai.config import Config
-from src.chess_ai.tablebase import TablebaseManager
+from src.chess_ai.resources import get_opening_book, get_tablebase
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Load Polyglot Opening Book
+# Iteration bound of searches given a deadline: the deadline alone ends them
+UNBOUNDED_ITERATIONS = sys.maxsize
+
+# Polyglot Opening Book
 def get_opening_move(board):
     """
     Retrieves a move from the opening book database.
@@ -24,12 +32,11 @@ def get_opening_move(board):
         board (chess.Board): Current board position
         
     Returns:
-        chess.Move: A move from the opening book, or None if not found
+        chess.Move: A weighted choice of the book moves, or None if not found
     """
     try:
-        with chess.polyglot.open_reader(Config.PATHS['opening_book']) as reader:
-            for entry in reader.find_all(board):
-                return entry.move
+        book = get_opening_book(Config.PATHS['opening_book'])
+        return book.choose(board) if book is not None else None
     except Exception as e:
         print(f"Opening book error: {str(e)}")
         return None
@@ -38,33 +45,177 @@ class ModernChessAI:
     """
     Advanced chess AI combining multiple strategies.
     
+    With use_mcts and use_rl the search is guided by the network's policy
+    and value (PUCT) once there is a trained network (see MCTS_GUIDANCE);
+    until then, and with use_mcts alone, MCTS uses rollouts. With use_rl
+    alone the network's top legal move is played directly.
+    
+    With use_book, positions in the opening book are answered with a book
+    move without searching.
+    
+    Creating an instance loads nothing: the network, the model server
+    connection, the opening book and the tablebase are set up on first
+    use, and checkpoints, books and tablebases are cached for the whole
+    process. With MODEL_SERVER enabled, positions are evaluated by the
+    shared model server and the local network (and torch) is only loaded
+    if rl_trainer is used, for example to train.
+    
     Attributes:
         use_mcts (bool): Whether to use Monte Carlo Tree Search
         use_rl (bool): Whether to use Reinforcement Learning
-        rl_trainer (RLTrainer): Neural network for move evaluation
+        use_book (bool): Whether to play opening book moves (with BOOK on)
+        guidance (str): Overrides MCTS_SETTINGS['guidance'] for this
+            instance, or None to follow it
+        rl_trainer (RLTrainer): Local neural network, loaded from the saved
+            model on first use unless one is passed in
+        evaluator: Evaluates positions for search: the one passed in (for
+            example a QuantizedEvaluator), a ModelClient or rl_trainer
         time_manager (TimeManager): Manages time control
+        opening_book (OpeningBook): Book moves, or None if disabled or missing
         tablebase (TablebaseManager): Endgame tablebase handler
+        transpositions (TranspositionTable): Leaf evaluations shared by all
+            searches of this instance, or None if disabled
     """
-    def __init__(self, use_mcts=True, use_rl=True):
+    def __init__(self, use_mcts=True, use_rl=True, rl_trainer=None, evaluator=None,
+                 use_book=True, guidance=None):
         self.use_mcts = use_mcts
         self.use_rl = use_rl
-        if use_rl:
-            self.rl_trainer = RLTrainer()
-            self.rl_trainer.load_model()  # Load the trained model
+        self.use_book = use_book
+        self.guidance = guidance
+        self._rl_trainer = rl_trainer
+        self._evaluator = evaluator
+        self._network_given = rl_trainer is not None or evaluator is not None
         self.time_manager = TimeManager(
             initial_time=Config.TIME_SETTINGS['initial_time'],
             increment=Config.TIME_SETTINGS['increment']
         )
-        self.tablebase = TablebaseManager(path=Config.PATHS['tablebase'])
+        self.last_search_stats = None
+        self.search_type = None  # Class name of the last search created
+        self._search = None  # Tree kept between moves when reuse_tree is on
+        tt_size = Config.MCTS_SETTINGS['tt_size']
+        self.transpositions = TranspositionTable(tt_size) if tt_size > 0 else None
+    
+    @property
+    def rl_trainer(self):
+        if self._rl_trainer is None:
+            from src.chess_ai.reinforcement import RLTrainer  # Imports torch
+            self._rl_trainer = RLTrainer.from_checkpoint()  # Load the trained model
+            if Config.INFERENCE_SETTINGS['warm_up']:
+                self._rl_trainer.inference.warm_up((1, Config.MCTS_SETTINGS['eval_batch_size']))
+        return self._rl_trainer
+    
+    @property
+    def evaluator(self):
+        if self._evaluator is None and self.use_rl:
+            if Config.MODEL_SERVER_SETTINGS['enabled']:
+                self._evaluator = ModelClient()
+            else:
+                self._evaluator = self.rl_trainer
+        return self._evaluator
+    
+    @property
+    def opening_book(self):
+        if not self.use_book or not Config.BOOK_SETTINGS['enabled']:
+            return None
+        return get_opening_book(Config.PATHS['opening_book'])
+    
+    @property
+    def tablebase(self):
+        return get_tablebase(Config.PATHS['tablebase'])
     
     def get_best_move(self, board, time_limit=1.0):
-        """Get the best move for the current position"""
-        # Reduce iterations to make moves faster (100 iterations per second instead of 1000)
-        iterations = int(time_limit * 100)
+        """
+        Get the best move for the current position.
+        
+        Args:
+            board (chess.Board): Current board position
+            time_limit (float): Wall-clock budget for this move in seconds,
+                or None to search MCTS_MAX_ITERATIONS iterations instead
+            
+        Returns:
+            chess.Move: Selected move
+        """
+        book = self.opening_book
+        if book is not None:
+            move = book.choose(board)
+            if move is not None:
+                logger.debug("Book move %s", move)
+                return move
+        
+        if self.use_rl and not self.use_mcts:
+            priors, _ = self.evaluator.evaluate(board)
+            return max(priors, key=priors.get)
+        
+        start = time.monotonic()
+        if self.transpositions is not None:
+            self.transpositions.new_search()
+        mcts = self._reuse_search(board) or self._create_search(board)
+        reused_visits = mcts.search_stats()['root_visits']
         
-        # Initialize MCTS with max_iterations
-        mcts = MCTS(board, max_iterations=iterations)
-        return mcts.get_best_move()
+        if time_limit is None:
+            mcts.max_iterations = Config.MCTS_SETTINGS['max_iterations']
+            move = mcts.get_best_move()
+        else:
+            # The deadline governs think time, so it does not depend on how
+            # many iterations this machine manages
+            mcts.max_iterations = UNBOUNDED_ITERATIONS
+            # Leave a safety margin for everything outside the search loop
+            budget = time_limit - Config.TIME_SETTINGS['move_overhead']
+            budget -= time.monotonic() - start
+            move = mcts.get_best_move(time_limit=max(budget, 0.0))
+        
+        self.last_search_stats = mcts.search_stats()
+        self.last_search_stats['reused_visits'] = reused_visits
+        logger.debug(
+            "MCTS: %d iterations in %.3fs (%.0f sims/s), %d visits reused",
+            self.last_search_stats['iterations'],
+            self.last_search_stats['elapsed'],
+            self.last_search_stats['simulations_per_second'],
+            reused_visits
+        )
+        
+        if Config.MCTS_SETTINGS['reuse_tree']:
+            self._search = mcts
+        return move
+    
+    def _reuse_search(self, board):
+        """Re-root the tree from the previous move at board, if possible"""
+        if self._search is None or not Config.MCTS_SETTINGS['reuse_tree']:
+            return None
+        if not self._search.reroot(board):
+            self._search = None
+            return None
+        return self._search
+    
+    def _create_search(self, board):
+        """Build the search selected by use_rl and Config.MCTS_SETTINGS"""
+        if self.network_guided():
+            search = NeuralMCTS(board, self.evaluator, transpositions=self.transpositions)
+        elif Config.MCTS_SETTINGS['parallel_mode'] == 'root':
+            search = RootParallelMCTS(board)
+        elif Config.MCTS_SETTINGS['parallel_mode'] == 'tree':
+            search = TreeParallelMCTS(board, transpositions=self.transpositions)
+        elif Config.MCTS_SETTINGS['tree_type'] == 'array':
+            search = ArrayMCTS(board, transpositions=self.transpositions)
+        else:
+            search = MCTS(board, transpositions=self.transpositions)
+        
+        if type(search).__name__ != self.search_type:
+            self.search_type = type(search).__name__
+            logger.info("Searching with %s", self.search_type)
+        return search
+    
+    def network_guided(self):
+        """Whether searches use the network, per guidance or MCTS_SETTINGS['guidance']"""
+        guidance = self.guidance or Config.MCTS_SETTINGS['guidance']
+        if not self.use_rl or guidance == 'rollout':
+            return False
+        if guidance == 'network':
+            return True
+        # 'auto': an untrained network would only mislead the search
+        return (self._network_given
+                or Config.MODEL_SERVER_SETTINGS['enabled']
+                or os.path.exists(Config.PATHS['model_save']))
     
     def train(self, positions, moves, values=None):
         """Train the AI on a set of positions"""
@@ -75,3 +226,10 @@ class ModernChessAI:
             values = [1.0] * len(positions)  # Default to positive values
         
         return self.rl_trainer.train_step(positions, moves, values)
+    
+    def train_records(self, records):
+        """Train the AI on replay buffer records"""
+        if not self.use_rl:
+            return
+        
+        return self.rl_trainer.train_records(records)
@@ -16,6 +16,12 @@ class Config:
         'opening_book': os.path.join(DATA_DIR, 'books', 'Perfect2023.bin'),
         'tablebase': os.path.join(DATA_DIR, 'tablebases', 'syzygy'),
         'model_save': os.path.join(DATA_DIR, 'models', 'chess_model.pth'),
+        'published_model': os.path.join(DATA_DIR, 'models', 'published.pth'),
+        'quantized_model': os.path.join(DATA_DIR, 'models', 'chess_model.int8.pt'),
+        'evaluation_cache': os.path.join(DATA_DIR, 'cache', 'evaluation_cache.npz'),
+        'label_store': os.path.join(DATA_DIR, 'cache', 'labels.sqlite'),
+        'replay_buffer': os.path.join(DATA_DIR, 'replay', 'self_play'),
+        'stockfish_buffer': os.path.join(DATA_DIR, 'replay', 'stockfish'),
         'stockfish': os.getenv('STOCKFISH_PATH', r"/path/to/stockfish"),
     }
     
@@ -23,20 +29,137 @@ class Config:
     MCTS_SETTINGS = {
         'exploration_constant': float(os.getenv('MCTS_EXPLORATION_CONSTANT', '1.41')),
         'max_iterations': int(os.getenv('MCTS_MAX_ITERATIONS', '1000')),
-        'max_depth': int(os.getenv('MCTS_MAX_DEPTH', '50'))
+        'max_depth': int(os.getenv('MCTS_MAX_DEPTH', '50')),
+        # Rollout move choice: 'uniform' or 'heavy' (biased towards captures and checks)
+        'rollout_policy': os.getenv('MCTS_ROLLOUT_POLICY', 'uniform'),
+        'rollout_capture_weight': float(os.getenv('MCTS_ROLLOUT_CAPTURE_WEIGHT', '2.0')),
+        'rollout_check_weight': float(os.getenv('MCTS_ROLLOUT_CHECK_WEIGHT', '0.0')),
+        # Stop a rollout once material differs by this many centipawns, 0 disables
+        'rollout_cutoff': int(os.getenv('MCTS_ROLLOUT_CUTOFF', '1000')),
+        # 'node' for the object tree in src/mcts.py, 'array' for src/array_mcts.py
+        'tree_type': os.getenv('MCTS_TREE_TYPE', 'node'),
+        'max_nodes': int(os.getenv('MCTS_MAX_NODES', '200000')),
+        # Keep the search tree between moves and re-root it at the new position
+        'reuse_tree': os.getenv('MCTS_REUSE_TREE', 'true').lower() == 'true',
+        # Parallel search: 'none', 'root' (independent trees) or 'tree' (shared tree)
+        'parallel_mode': os.getenv('MCTS_PARALLEL_MODE', 'none'),
+        # Empty uses every core
+        'num_workers': int(os.getenv('MCTS_NUM_WORKERS') or os.cpu_count() or 1),
+        # How root-parallel results are combined: 'visits' or 'vote'
+        'merge_policy': os.getenv('MCTS_MERGE_POLICY', 'visits'),
+        'virtual_loss': float(os.getenv('MCTS_VIRTUAL_LOSS', '1.0')),
+        # Exploration weight of the policy prior in network-guided (PUCT) search
+        'c_puct': float(os.getenv('MCTS_C_PUCT', '1.5')),
+        # Search used with use_rl: 'network' (PUCT on ChessNet), 'rollout' (the
+        # parallel_mode/tree_type search) or 'auto' (network once a trained
+        # model is saved or served)
+        'guidance': os.getenv('MCTS_GUIDANCE', 'auto'),
+        # Leaves evaluated per ChessNet forward pass in PUCT search
+        'eval_batch_size': int(os.getenv('MCTS_EVAL_BATCH_SIZE', '8')),
+        # Transposition table slots (rounded up to a power of two), 0 disables it
+        'tt_size': int(os.getenv('MCTS_TT_SIZE', '262144')),
+        # Rollouts averaged into a table entry before searches reuse its mean
+        'tt_samples': int(os.getenv('MCTS_TT_SAMPLES', '8'))
+    }
+    
+    EVALUATION_SETTINGS = {
+        # Positions kept in the LRU cache of leaf scores (rollout endpoints
+        # and evaluate_board), 0 disables it
+        'cache_size': int(os.getenv('EVAL_CACHE_SIZE', '100000')),
+        # Load the cache from PATHS['evaluation_cache'] at startup and save it at exit
+        'persist_cache': os.getenv('EVAL_CACHE_PERSIST', 'false').lower() == 'true'
     }
     
     RL_SETTINGS = {
         'learning_rate': float(os.getenv('RL_LEARNING_RATE', '0.001')),
         'batch_size': int(os.getenv('RL_BATCH_SIZE', '64')),
-        'num_epochs': int(os.getenv('RL_NUM_EPOCHS', '10'))
+        'num_epochs': int(os.getenv('RL_NUM_EPOCHS', '10')),
+        # DataLoader processes encoding training batches, 0 encodes in the trainer
+        'num_workers': int(os.getenv('RL_NUM_WORKERS', '2')),
+        # Print loss and samples/sec every this many batches
+        'log_interval': int(os.getenv('RL_LOG_INTERVAL', '10'))
+    }
+    
+    INFERENCE_SETTINGS = {
+        # Keep ChessNet weights channels-last so NHWC input is used without a copy
+        'channels_last': os.getenv('NN_CHANNELS_LAST', 'true').lower() == 'true',
+        # bfloat16 autocast for evaluation (needs a CPU with bf16 support to pay off)
+        'bf16': os.getenv('NN_BF16', 'false').lower() == 'true',
+        # Evaluate through torch.compile; the first call compiles
+        'compile': os.getenv('NN_COMPILE', 'false').lower() == 'true',
+        # int8 network for self-play workers: 'none', 'dynamic' or 'static'
+        'quantize': os.getenv('NN_QUANTIZE', 'none'),
+        # Self-play positions used to calibrate static quantization
+        'calibration_size': int(os.getenv('NN_CALIBRATION_SIZE', '512')),
+        # Run dummy batches when the AI is created so searches start warm
+        'warm_up': os.getenv('NN_WARM_UP', 'true').lower() == 'true'
+    }
+    
+    MODEL_SERVER_SETTINGS = {
+        # Evaluate positions on a running serve_model.py instead of loading the model in every AI
+        'enabled': os.getenv('MODEL_SERVER', 'false').lower() == 'true',
+        'socket': os.getenv('MODEL_SERVER_SOCKET', os.path.join(DATA_DIR, 'model_server.sock')),
+        # Positions per forward pass, and how long to wait for a batch to fill
+        'max_batch': int(os.getenv('MODEL_SERVER_MAX_BATCH', '64')),
+        'max_wait_ms': float(os.getenv('MODEL_SERVER_MAX_WAIT_MS', '2')),
+        # Seconds a client waits for an answer
+        'timeout': float(os.getenv('MODEL_SERVER_TIMEOUT', '30'))
+    }
+    
+    REPLAY_SETTINGS = {
+        # Most recent samples kept in a replay buffer
+        'capacity': int(os.getenv('REPLAY_CAPACITY', '500000')),
+        # Samples per memory-mapped shard file
+        'shard_size': int(os.getenv('REPLAY_SHARD_SIZE', '65536'))
+    }
+    
+    LABELLING_SETTINGS = {
+        # Engine processes labelling positions in parallel
+        'num_engines': int(os.getenv('LABEL_ENGINES', str(os.cpu_count() or 1))),
+        # Search limits per position; 0 leaves a limit unset
+        'depth': int(os.getenv('LABEL_DEPTH', '10')),
+        'nodes': int(os.getenv('LABEL_NODES', '0')),
+        # Keep labels in PATHS['label_store'] and skip positions already analysed
+        'use_store': os.getenv('LABEL_STORE', 'true').lower() == 'true'
+    }
+    
+    SELF_PLAY_SETTINGS = {
+        # Worker processes generating games, 1 plays them in the training process
+        'num_workers': int(os.getenv('SELF_PLAY_WORKERS', '1')),
+        'seed': int(os.getenv('SELF_PLAY_SEED', '0')),
+        'time_per_move': float(os.getenv('SELF_PLAY_TIME_PER_MOVE', '0.1')),
+        'random_move_rate': float(os.getenv('SELF_PLAY_RANDOM_MOVE_RATE', '0.1')),
+        # Open self-play games from the opening book (with BOOK on); book
+        # moves are then recorded as policy targets like searched moves
+        'book': os.getenv('SELF_PLAY_BOOK', 'false').lower() == 'true'
+    }
+    
+    ACTOR_LEARNER_SETTINGS = {
+        # Run self-play actors and a learner process side by side
+        'enabled': os.getenv('ACTOR_LEARNER', 'false').lower() == 'true',
+        # Learner steps between weight publishes
+        'publish_interval': int(os.getenv('ACTOR_LEARNER_PUBLISH_INTERVAL', '50')),
+        # Replay buffer samples needed before the learner starts
+        'min_samples': int(os.getenv('ACTOR_LEARNER_MIN_SAMPLES', '1000'))
+    }
+    
+    BOOK_SETTINGS = {
+        # Play moves from PATHS['opening_book'] before searching
+        'enabled': os.getenv('BOOK', 'true').lower() == 'true',
+        # Seed of the weighted move choice; empty picks a different line every run
+        'seed': int(os.getenv('BOOK_SEED')) if os.getenv('BOOK_SEED') else None,
+        'max_ply': int(os.getenv('BOOK_MAX_PLY', '40')),
+        'min_weight': int(os.getenv('BOOK_MIN_WEIGHT', '1')),
+        # Positions kept in the book's in-memory map
+        'cache_size': int(os.getenv('BOOK_CACHE_SIZE', '65536'))
     }
     
     TIME_SETTINGS = {
         'initial_time': 180,  # 3 minutes
         'increment': 2,
         'min_time_per_move': 0.1,
-        'max_time_percentage': 0.2
+        'max_time_percentage': 0.2,
+        'move_overhead': 0.02  # Seconds reserved outside the search loop
     }
 
     @classmethod
@@ -46,7 +169,9 @@ class Config:
             os.path.join(cls.DATA_DIR, 'models'),
             os.path.join(cls.DATA_DIR, 'logs'),
             os.path.join(cls.DATA_DIR, 'tablebases'),
-            os.path.join(cls.DATA_DIR, 'books')
+            os.path.join(cls.DATA_DIR, 'books'),
+            os.path.join(cls.DATA_DIR, 'cache'),
+            os.path.join(cls.DATA_DIR, 'replay')
         ]
         for directory in directories:
             os.makedirs(directory, exist_ok=True) 
\ No newline at end of file
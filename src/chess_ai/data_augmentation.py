@@ -1,5 +1,6 @@
 import chess
 import numpy as np
+from src.chess_ai.batch_encoding import FLAG_KINGSIDE, FLAG_QUEENSIDE
 
 def mirror_position(board):
     """Mirror the position horizontally"""
@@ -46,4 +47,34 @@ def augment_position(board):
     for rotation in [90, 180, 270]:
         positions.append(rotate_position(board, rotation))
     
-    return positions 
\ No newline at end of file
+    return positions
+
+# Each byte value with its bit order reversed, i.e. a rank with its files mirrored
+_REVERSED_BYTES = np.array([int(f'{byte:08b}'[::-1], 2) for byte in range(256)], dtype=np.uint8)
+
+def mirror_records(records, mask=None):
+    """
+    Mirror replay buffer records horizontally (file a <-> file h), moves
+    included. Only positions without castling rights are mirrored, since
+    castling is not symmetric.
+
+    Args:
+        records (np.ndarray): Replay buffer records
+        mask (np.ndarray, optional): Boolean array selecting the records to
+            mirror; all eligible records if None
+
+    Returns:
+        np.ndarray: Copy of records with the selected positions mirrored
+    """
+    records = records.copy()
+    eligible = (records['flags'] & (FLAG_KINGSIDE | FLAG_QUEENSIDE)) == 0
+    if mask is not None:
+        eligible &= mask
+    if not eligible.any():
+        return records
+
+    bitboards = np.ascontiguousarray(records['bitboards'][eligible])
+    records['bitboards'][eligible] = _REVERSED_BYTES[bitboards.view(np.uint8)].view(bitboards.dtype)
+    # Packed move: from | to << 6 | promotion << 12; mirroring flips the file bits
+    records['move'][eligible] ^= 0x7 | (0x7 << 6)
+    return records
@@ -0,0 +1,112 @@
+"""
+Inference path for ChessNet.
+Encoded positions are NHWC, which in memory is exactly a channels-last
+NCHW tensor, so with the weights in channels-last format the convolutions
+read the input as it is without a transposing copy. On top of that the
+forward pass can run under bfloat16 autocast and through torch.compile.
+int8 networks are evaluated by src.chess_ai.quantization.QuantizedEvaluator.
+"""
+
+import logging
+import numpy as np
+import torch
+from src.chess_ai.config import Config
+
+logger = logging.getLogger(__name__)
+
+def masked_policy(logits, indices):
+    """
+    Policy over each position's legal moves only.
+
+    Gathers the logits of the given policy indices and takes the softmax
+    over that subset, so no probability mass is spent on illegal moves.
+
+    Args:
+        logits (torch.Tensor): (N, 4672) policy logits
+        indices (list): N int64 arrays of policy indices, for example from
+            move_encoding.legal_move_indices
+
+    Returns:
+        tuple: (logits, priors), each a list of N float32 arrays in the
+        order of indices
+    """
+    lengths = [len(row) for row in indices]
+    padded = np.zeros((len(indices), max(max(lengths, default=0), 1)), dtype=np.int64)
+    mask = np.zeros(padded.shape, dtype=bool)
+    for row, (row_indices, length) in enumerate(zip(indices, lengths)):
+        padded[row, :length] = row_indices
+        mask[row, :length] = True
+
+    gathered = logits.gather(1, torch.from_numpy(padded).to(logits.device)).float()
+    # Rows without legal moves come out as NaN and are cut to length 0 below
+    priors = torch.softmax(gathered.masked_fill(~torch.from_numpy(mask).to(logits.device),
+                                                float('-inf')), dim=1)
+    gathered, priors = gathered.cpu().numpy(), priors.cpu().numpy()
+    return ([row[:length] for row, length in zip(gathered, lengths)],
+            [row[:length] for row, length in zip(priors, lengths)])
+
+class InferenceModel:
+    """
+    Runs a ChessNet for evaluation only.
+
+    Wraps the model without copying it, so weights loaded into the model
+    later are used straight away.
+
+    Attributes:
+        model (ChessNet): Network being evaluated
+        channels_last (bool): Weights kept in channels-last format
+        bf16 (bool): Run under bfloat16 autocast; outputs are float32
+        compile (bool): Run through torch.compile
+        warmed_up (bool): warm_up has run
+    """
+    def __init__(self, model, channels_last=None, bf16=None, compile=None):
+        settings = Config.INFERENCE_SETTINGS
+        self.model = model
+        self.channels_last = channels_last if channels_last is not None else settings['channels_last']
+        self.bf16 = bf16 if bf16 is not None else settings['bf16']
+        self.compile = compile if compile is not None else settings['compile']
+        self.warmed_up = False
+        self._device_type = next(model.parameters()).device.type
+        self._forward = model
+
+        if self.channels_last:
+            # Converts parameters in place, so the optimizer keeps training them
+            model.to(memory_format=torch.channels_last)
+        if self.compile:
+            self._forward = torch.compile(model, dynamic=True)
+
+    def __call__(self, positions):
+        """
+        Evaluate encoded positions.
+
+        Args:
+            positions (torch.Tensor): (N, 8, 8, 15) encoded positions
+
+        Returns:
+            tuple: (policy logits (N, 4672), value (N, 1)) float32 tensors
+        """
+        self.model.eval()
+        with torch.inference_mode(), torch.autocast(self._device_type, dtype=torch.bfloat16,
+                                                    enabled=self.bf16):
+            try:
+                policy, value = self._forward(positions)
+            except Exception as e:
+                if self._forward is self.model:
+                    raise
+                logger.warning(f"Compiled forward failed, using eager mode: {str(e)}")
+                self._forward = self.model
+                policy, value = self._forward(positions)
+        return policy.float(), value.float()
+
+    def warm_up(self, batch_sizes=(1, 8)):
+        """
+        Run dummy batches so compilation and kernel selection happen before
+        the first real search instead of during it.
+
+        Args:
+            batch_sizes (tuple): Batch sizes to run
+        """
+        device = next(self.model.parameters()).device
+        for batch_size in batch_sizes:
+            self(torch.zeros((batch_size, 8, 8, 15), device=device))
+        self.warmed_up = True
@@ -0,0 +1,124 @@
+"""
+Persistent store of engine labels.
+Positions analysed by EngineLabeller are saved in an SQLite database keyed
+by Zobrist hash and search depth, so later training runs only send
+positions the engines have not analysed deeply enough yet.
+"""
+
+import os
+import sqlite3
+import numpy as np
+from src.array_mcts import pack_move, unpack_move
+from src.transposition import position_key
+
+def _to_signed(key):
+    # SQLite integers are signed 64-bit
+    return key - (1 << 64) if key >= (1 << 63) else key
+
+def _to_unsigned(key):
+    return key + (1 << 64) if key < 0 else key
+
+class LabelStore:
+    """
+    On-disk map from (position, depth) to the engine's best move and score.
+
+    A position may be stored at several depths; lookups return the deepest
+    label that meets the requested depth.
+
+    Attributes:
+        path (str): SQLite database file
+        hits (int): Lookups answered from the store
+        misses (int): Lookups that need the engine
+    """
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS labels ("
+            "key INTEGER NOT NULL, depth INTEGER NOT NULL, "
+            "move INTEGER NOT NULL, score INTEGER NOT NULL, "
+            "PRIMARY KEY (key, depth))")
+        self._connection.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+
+    def get(self, board, min_depth=0):
+        """
+        Look up a position.
+
+        Args:
+            board (chess.Board): Position
+            min_depth (int): Shallowest acceptable analysis
+
+        Returns:
+            tuple: (best move, centipawn score for the side to move), or
+            None if the position was not analysed to min_depth
+        """
+        row = self._connection.execute(
+            "SELECT move, score FROM labels WHERE key = ? AND depth >= ? "
+            "ORDER BY depth DESC LIMIT 1",
+            (_to_signed(position_key(board)), min_depth)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return unpack_move(row[0]), row[1]
+
+    def put_many(self, boards, labels, depth):
+        """
+        Save labels produced at depth; None labels are skipped.
+
+        Args:
+            boards (list): chess.Board positions
+            labels (list): (move, score) or None per board
+            depth (int): Search depth the labels were produced at
+        """
+        rows = [(_to_signed(position_key(board)), depth, pack_move(label[0]), label[1])
+                for board, label in zip(boards, labels) if label is not None]
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO labels VALUES (?, ?, ?, ?)", rows)
+
+    def export(self, path):
+        """Write every label to an .npz file for import into another store"""
+        rows = self._connection.execute("SELECT key, depth, move, score FROM labels").fetchall()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f,
+                     keys=np.array([_to_unsigned(row[0]) for row in rows], dtype=np.uint64),
+                     depths=np.array([row[1] for row in rows], dtype=np.int32),
+                     moves=np.array([row[2] for row in rows], dtype=np.uint16),
+                     scores=np.array([row[3] for row in rows], dtype=np.int32))
+        return len(rows)
+
+    def import_file(self, path):
+        """
+        Merge labels from a file written by export. Existing labels at the
+        same depth are replaced.
+
+        Returns:
+            int: Number of labels imported
+        """
+        with np.load(path) as data:
+            keys, depths = data['keys'], data['depths']
+            moves, scores = data['moves'], data['scores']
+        rows = [(_to_signed(key), depth, move, score) for key, depth, move, score
+                in zip(keys.tolist(), depths.tolist(), moves.tolist(), scores.tolist())]
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO labels VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def close(self):
+        self._connection.close()
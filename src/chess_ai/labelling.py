@@ -0,0 +1,227 @@
+"""
+Engine labelling for supervised training data.
+Keeps a pool of long-lived UCI engine processes driven by chess.engine on
+an asyncio event loop in a background thread. Positions are fanned out
+to whichever engine is idle, so throughput grows with the number of
+engines (one per core by default). With a LabelStore, positions already
+analysed deeply enough, and repeats within a batch, skip the engines.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import chess
+import chess.engine
+from src.chess_ai.config import Config
+from src.transposition import position_key
+
+logger = logging.getLogger(__name__)
+
+MATE_SCORE = 10000  # Centipawn score given to a forced mate
+
+class EngineLabeller:
+    """
+    Pool of UCI engines returning a best move and score per position.
+
+    Engines are started on the first call to label and kept until close.
+    An engine that dies is restarted and its position is reported as
+    unlabelled.
+
+    Attributes:
+        command (str or list): Engine executable, or argv list
+        num_engines (int): Number of engine processes
+        limit (chess.engine.Limit): Search limit per position
+        options (dict): UCI options set on engines that support them
+        store (LabelStore): Saved labels to reuse and extend, or None;
+            only used when the limit is a depth alone (see store_depth)
+        labelled (int): Positions labelled by the engines so far
+        reused (int): Positions answered by store or by a repeat of a
+            position in the same batch
+        failed (int): Positions the engines could not label
+        elapsed (float): Seconds spent in label
+    """
+    def __init__(self, command=None, num_engines=None, depth=None, nodes=None,
+                 time_limit=None, options=None, store=None):
+        settings = Config.LABELLING_SETTINGS
+        self.command = command or Config.PATHS['stockfish']
+        self.num_engines = num_engines or settings['num_engines']
+        depth = depth if depth is not None else settings['depth']
+        nodes = nodes if nodes is not None else settings['nodes']
+        self.limit = chess.engine.Limit(depth=depth or None, nodes=nodes or None,
+                                        time=time_limit)
+        self.options = options if options is not None else {'Threads': 1}
+        self.store = store
+        self.labelled = 0
+        self.reused = 0
+        self.failed = 0
+        self.elapsed = 0.0
+        self._loop = None
+        self._thread = None
+        self._engines = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        """Start the event loop and engine processes, if not running yet"""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        try:
+            self._engines = self._run(self._open_engines(self.num_engines))
+        except Exception:
+            self.close()
+            raise
+
+    def label(self, boards):
+        """
+        Label positions across the engine pool.
+
+        Args:
+            boards (list): chess.Board positions
+
+        Returns:
+            list: (best move, centipawn score for the side to move) per
+            board, or None where no label could be produced
+        """
+        labels = [None] * len(boards)
+        pending = {}  # Zobrist key -> indices of the boards holding that position
+        use_store = self.store is not None and self.store_depth is not None
+        for i, board in enumerate(boards):
+            if use_store:
+                labels[i] = self.store.get(board, min_depth=self.store_depth)
+                if labels[i] is not None:
+                    self.reused += 1
+                    continue
+            pending.setdefault(position_key(board), []).append(i)
+        if not pending:
+            return labels
+
+        unique = [boards[indices[0]] for indices in pending.values()]
+        self.reused += sum(len(indices) - 1 for indices in pending.values())
+        self.start()
+        start = time.monotonic()
+        results = self._run(self._label_all(unique))
+        self.elapsed += time.monotonic() - start
+        succeeded = sum(result is not None for result in results)
+        self.labelled += succeeded
+        self.failed += len(results) - succeeded
+        if use_store:
+            self.store.put_many(unique, results, self.store_depth)
+
+        for indices, result in zip(pending.values(), results):
+            for i in indices:
+                labels[i] = result
+        return labels
+
+    @property
+    def store_depth(self):
+        """
+        Depth labels are saved at, or None when the search is not limited by
+        depth alone. The store is keyed by depth, so node- and time-limited
+        labels are neither saved nor looked up.
+        """
+        if self.limit.nodes or self.limit.time:
+            return None
+        return self.limit.depth
+
+    @property
+    def labels_per_second(self):
+        """Labelling throughput so far"""
+        return self.labelled / self.elapsed if self.elapsed > 0 else 0.0
+
+    def close(self):
+        """Quit the engines and stop the event loop"""
+        if self._loop is None:
+            return
+        if self._engines:
+            try:
+                self._run(self._quit_engines(self._engines))
+            except Exception as e:
+                logger.warning(f"Failed to quit engines cleanly: {str(e)}")
+        self._engines = []
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def _open_engine(self):
+        _, engine = await chess.engine.popen_uci(self.command)
+        options = {name: value for name, value in self.options.items() if name in engine.options}
+        if options:
+            await engine.configure(options)
+        return engine
+
+    async def _open_engines(self, count):
+        results = await asyncio.gather(*(self._open_engine() for _ in range(count)),
+                                       return_exceptions=True)
+        engines = [result for result in results if not isinstance(result, BaseException)]
+        if len(engines) < count:
+            await self._quit_engines(engines)
+            raise next(result for result in results if isinstance(result, BaseException))
+        return engines
+
+    async def _quit_engines(self, engines):
+        await asyncio.gather(*(engine.quit() for engine in engines), return_exceptions=True)
+
+    async def _label_all(self, boards):
+        idle = asyncio.Queue()
+        for engine in self._engines:
+            idle.put_nowait(engine)
+
+        async def label_one(board):
+            engine = await idle.get()
+            try:
+                info = await self._analyse(engine, board)
+            except chess.engine.EngineTerminatedError as e:
+                logger.warning(f"Engine died, restarting it: {str(e)}")
+                # Only a live engine goes back to idle, even if the restart raises
+                dead, engine = engine, None
+                engine = await self._replace_engine(dead)
+                return None
+            except (chess.engine.EngineError, asyncio.TimeoutError) as e:
+                logger.warning(f"Failed to label position {board.fen()}: {str(e)}")
+                return None
+            finally:
+                if engine is not None:
+                    idle.put_nowait(engine)
+
+            if not info.get('pv') or 'score' not in info:
+                return None
+            return info['pv'][0], info['score'].pov(board.turn).score(mate_score=MATE_SCORE)
+
+        return await asyncio.gather(*(label_one(board) for board in boards))
+
+    async def _analyse(self, engine, board):
+        """engine.analyse that also fails if the process exits mid-command"""
+        analysis = asyncio.ensure_future(engine.analyse(board, self.limit))
+        # A process dying outside the search can leave analyse waiting forever
+        await asyncio.wait({analysis, engine.returncode}, return_when=asyncio.FIRST_COMPLETED)
+        if not analysis.done():
+            analysis.cancel()
+            raise chess.engine.EngineTerminatedError(
+                f"engine process died (exit code: {engine.returncode.result()})")
+        return analysis.result()
+
+    async def _replace_engine(self, engine):
+        """Swap a dead engine for a new process; None if it cannot be started"""
+        self._engines.remove(engine)
+        try:
+            replacement = await self._open_engine()
+        except Exception as e:
+            logger.error(f"Failed to restart engine: {str(e)}")
+            if not self._engines:
+                raise RuntimeError("No labelling engines left") from e
+            return None
+        self._engines.append(replacement)
+        return replacement
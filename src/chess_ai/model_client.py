@@ -0,0 +1,187 @@
+"""
+Client of the model server (src/chess_ai/model_server.py).
+Sends positions over a Unix socket and gets back a value and legal-move
+priors for each, so a process can use the shared network without loading
+its own copy. Only NumPy and python-chess are imported; torch is not.
+
+Wire format: every message is a little-endian uint32 payload length and
+the payload. A request holds the position count N, N packed positions
+(12 piece bitboards and a flags byte, as in batch_encoding), N uint16
+legal move counts and the uint16 policy indices of all legal moves. The
+response holds N float32 values and the float32 priors of those moves in
+the same order.
+"""
+
+import socket
+import struct
+import numpy as np
+from src.chess_ai.batch_encoding import PLANE_PIECES, boards_to_bitboards
+from src.chess_ai.config import Config
+from src.chess_ai.move_encoding import legal_move_indices
+
+POSITION_DTYPE = np.dtype([
+    ('bitboards', '<u8', (len(PLANE_PIECES),)),
+    ('flags', 'u1'),
+])
+
+_LENGTH = struct.Struct('<I')
+
+def send_message(sock, payload):
+    sock.sendall(_LENGTH.pack(len(payload)) + payload)
+
+def receive_message(sock):
+    """Payload of the next message, or None if the peer closed the connection"""
+    header = _receive_exactly(sock, _LENGTH.size)
+    if header is None:
+        return None
+    payload = _receive_exactly(sock, _LENGTH.unpack(header)[0])
+    if payload is None:
+        raise ConnectionError("Connection closed in the middle of a message")
+    return payload
+
+def _receive_exactly(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            if received == 0:
+                return None
+            raise ConnectionError("Connection closed in the middle of a message")
+        received += count
+    return bytes(buffer)
+
+def encode_request(bitboards, flags, indices):
+    """
+    Build a request payload.
+
+    Args:
+        bitboards (np.ndarray): (N, 12) piece bitboards
+        flags (np.ndarray): (N,) flags bytes
+        indices (list): N arrays of legal move policy indices
+
+    Returns:
+        bytes: Payload for send_message
+    """
+    positions = np.empty(len(bitboards), dtype=POSITION_DTYPE)
+    positions['bitboards'] = bitboards
+    positions['flags'] = flags
+    counts = np.array([len(row) for row in indices], dtype='<u2')
+    moves = np.concatenate(indices).astype('<u2') if len(indices) else np.empty(0, '<u2')
+    return _LENGTH.pack(len(positions)) + positions.tobytes() + counts.tobytes() + moves.tobytes()
+
+def decode_request(payload):
+    """
+    Inverse of encode_request.
+
+    Returns:
+        tuple: (bitboards (N, 12), flags (N,), list of N int64 index arrays)
+    """
+    count = _LENGTH.unpack_from(payload)[0]
+    offset = _LENGTH.size
+    positions = np.frombuffer(payload, dtype=POSITION_DTYPE, count=count, offset=offset)
+    offset += positions.nbytes
+    counts = np.frombuffer(payload, dtype='<u2', count=count, offset=offset)
+    offset += counts.nbytes
+    moves = np.frombuffer(payload, dtype='<u2', offset=offset).astype(np.int64)
+    return (positions['bitboards'], positions['flags'],
+            np.split(moves, np.cumsum(counts, dtype=np.int64)[:-1]))
+
+def encode_response(values, priors):
+    """Response payload from N values and N prior arrays"""
+    values = np.asarray(values, dtype='<f4')
+    flat = np.concatenate(priors).astype('<f4') if len(priors) else np.empty(0, '<f4')
+    return values.tobytes() + flat.tobytes()
+
+def decode_response(payload, counts):
+    """
+    Inverse of encode_response.
+
+    Args:
+        payload (bytes): Response payload
+        counts (list): Legal move count of each position in the request
+
+    Returns:
+        tuple: (values array, list of prior arrays)
+    """
+    values = np.frombuffer(payload, dtype='<f4', count=len(counts))
+    priors = np.frombuffer(payload, dtype='<f4', offset=values.nbytes)
+    return values, np.split(priors, np.cumsum(counts, dtype=np.int64)[:-1])
+
+class ModelClient:
+    """
+    Evaluates positions on a model server.
+
+    Has the same evaluate and evaluate_batch methods as RLTrainer, so it
+    can guide NeuralMCTS directly. The connection is opened on first use
+    and reopened once if the server dropped it.
+
+    Attributes:
+        path (str): Unix socket of the server
+        timeout (float): Seconds to wait for a response
+        requests (int): Requests answered
+        positions (int): Positions evaluated
+    """
+    def __init__(self, path=None, timeout=None):
+        settings = Config.MODEL_SERVER_SETTINGS
+        self.path = path or settings['socket']
+        self.timeout = timeout if timeout is not None else settings['timeout']
+        self.requests = 0
+        self.positions = 0
+        self._socket = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def evaluate(self, board):
+        """(priors, value) for one position, as RLTrainer.evaluate"""
+        return self.evaluate_batch([board])[0]
+
+    def evaluate_batch(self, boards):
+        """
+        Evaluate positions in one request.
+
+        Args:
+            boards (list): chess.Board positions
+
+        Returns:
+            list: (priors dict of legal move to probability, value for the
+            side to move) per board
+        """
+        moves, indices = zip(*(legal_move_indices(board) for board in boards))
+        bitboards, flags = boards_to_bitboards(boards)
+        payload = encode_request(bitboards, flags, indices)
+        try:
+            response = self._round_trip(payload)
+        except (ConnectionError, BrokenPipeError):
+            self.close()  # The server restarted or dropped us; try once more
+            response = self._round_trip(payload)
+        values, priors = decode_response(response, [len(row) for row in indices])
+        self.requests += 1
+        self.positions += len(boards)
+        return [(dict(zip(board_moves, board_priors.tolist())), float(value))
+                for board_moves, board_priors, value in zip(moves, priors, values)]
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _round_trip(self, payload):
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(self.timeout)
+            try:
+                self._socket.connect(self.path)
+            except OSError:
+                self.close()
+                raise
+        send_message(self._socket, payload)
+        response = receive_message(self._socket)
+        if response is None:
+            raise ConnectionError("Model server closed the connection")
+        return response
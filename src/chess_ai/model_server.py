@@ -0,0 +1,238 @@
+"""
+Model server for shared ChessNet inference.
+One process holds the network and answers ModelClient requests over a
+Unix socket. Requests arriving from different clients within a few
+milliseconds are evaluated in a single forward pass, so many games on
+one machine share one copy of the weights and get larger batches.
+"""
+
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+import numpy as np
+import torch
+from src.chess_ai.batch_encoding import encode_bitboards
+from src.chess_ai.config import Config
+from src.chess_ai.inference import masked_policy
+from src.chess_ai.model_client import (decode_request, encode_response, receive_message,
+                                       send_message)
+
+logger = logging.getLogger(__name__)
+
+class _Request:
+    """Positions from one client message waiting for the batcher"""
+    def __init__(self, bitboards, flags, indices):
+        self.bitboards = bitboards
+        self.flags = flags
+        self.indices = indices
+        self.response = None
+        self.done = threading.Event()
+
+class _Handler(socketserver.BaseRequestHandler):
+    def setup(self):
+        with self.server.connections_lock:
+            self.server.connections.add(self.request)
+
+    def finish(self):
+        with self.server.connections_lock:
+            self.server.connections.discard(self.request)
+
+    def handle(self):
+        server = self.server.model_server
+        while True:
+            try:
+                payload = receive_message(self.request)
+            except (ConnectionError, OSError):
+                return
+            if payload is None:
+                return
+            request = _Request(*decode_request(payload))
+            server._requests.put(request)
+            request.done.wait()
+            if request.response is None:
+                return  # Evaluation failed or the server is stopping
+            try:
+                send_message(self.request, request.response)
+            except OSError:
+                return
+
+class _SocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, model_server):
+        super().__init__(path, _Handler)
+        self.model_server = model_server
+        self.connections = set()
+        self.connections_lock = threading.Lock()
+
+    def close_connections(self):
+        """Disconnect every client, so they notice the server is gone"""
+        with self.connections_lock:
+            for connection in self.connections:
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+class ModelServer:
+    """
+    Serves policy and value from one RLTrainer to many clients.
+
+    Attributes:
+        path (str): Unix socket the server listens on
+        trainer (RLTrainer): Network being served
+        max_batch (int): Positions per forward pass at most
+        max_wait (float): Seconds to wait for more requests before running
+            a batch that is not full
+        weights_path (str): Published weights reloaded when they change, or None
+        requests (int): Client requests answered
+        positions (int): Positions evaluated
+        batches (int): Forward passes run
+    """
+    def __init__(self, path=None, trainer=None, max_batch=None, max_wait=None, weights_path=None):
+        settings = Config.MODEL_SERVER_SETTINGS
+        self.path = path or settings['socket']
+        if trainer is None:
+            from src.chess_ai.reinforcement import RLTrainer
+            trainer = RLTrainer.from_checkpoint()
+        self.trainer = trainer
+        self.max_batch = max_batch or settings['max_batch']
+        self.max_wait = max_wait if max_wait is not None else settings['max_wait_ms'] / 1000
+        self.weights_path = weights_path
+        self.requests = 0
+        self.positions = 0
+        self.batches = 0
+        self._weights_mtime = None
+        self._requests = queue.Queue()
+        self._server = None
+        self._threads = []
+        self._stopping = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """Listen on path and start answering requests in background threads"""
+        if os.path.exists(self.path):
+            os.remove(self.path)  # Left behind by a server that did not shut down
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._reload_weights()
+        self.trainer.inference.warm_up((1, self.max_batch))
+        self._server = _SocketServer(self.path, self)
+        self._stopping.clear()
+        self._threads = [threading.Thread(target=self._server.serve_forever, daemon=True),
+                         threading.Thread(target=self._run_batches, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def serve_forever(self):
+        """Start and block until interrupted"""
+        self.start()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._stopping.set()
+        self._server.shutdown()
+        self._server.server_close()
+        self._server.close_connections()
+        for thread in self._threads:
+            thread.join()
+        # Release clients still waiting for a batch
+        while not self._requests.empty():
+            self._requests.get_nowait().done.set()
+        self._server = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def stats(self):
+        """Request and batching counters"""
+        return {
+            'requests': self.requests,
+            'positions': self.positions,
+            'batches': self.batches,
+            'mean_batch_size': self.positions / self.batches if self.batches else 0.0,
+        }
+
+    def _run_batches(self):
+        while not self._stopping.is_set():
+            try:
+                batch = [self._requests.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            size = len(batch[0].indices)
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request.indices)
+
+            try:
+                self._evaluate(batch)
+            except Exception as e:
+                logger.error(f"Model server batch failed: {str(e)}")
+            for request in batch:
+                request.done.set()
+
+    def _evaluate(self, batch):
+        self._reload_weights()
+        bitboards = np.concatenate([request.bitboards for request in batch])
+        flags = np.concatenate([request.flags for request in batch])
+        indices = [row for request in batch for row in request.indices]
+        positions = torch.from_numpy(encode_bitboards(bitboards, flags)).to(self.trainer.device)
+        policy_logits, value_pred = self.trainer.inference(positions)
+        _, priors = masked_policy(policy_logits, indices)
+        values = value_pred.cpu().numpy()[:, 0]
+
+        start = 0
+        for request in batch:
+            end = start + len(request.indices)
+            request.response = encode_response(values[start:end], priors[start:end])
+            start = end
+        self.requests += len(batch)
+        self.positions += len(indices)
+        self.batches += 1
+
+    def _reload_weights(self):
+        """Load newly published weights, as self-play workers do"""
+        if self.weights_path is None:
+            return
+        try:
+            mtime = os.stat(self.weights_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._weights_mtime:
+            self.trainer.load_published_weights(self.weights_path)
+            self._weights_mtime = mtime
+
+def main():
+    settings = Config.MODEL_SERVER_SETTINGS
+    server = ModelServer(weights_path=Config.PATHS['published_model'])
+    print(f"Serving the model on {server.path} "
+          f"(batches of up to {server.max_batch}, {settings['max_wait_ms']} ms wait)")
+    server.serve_forever()
+    print(f"Served {server.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Move encoding for the policy head.
+A move is indexed by its from square and one of 73 move types, as in
+AlphaZero, giving 64 * 73 = 4672 policy outputs:
+56 queen-style types (8 directions x distances 1-7), 8 knight jumps and
+9 underpromotions (knight, bishop, rook x left capture, push, right
+capture). Queen promotions use the queen-style type of their direction.
+Squares and directions are absolute (a1 = 0, like the position planes),
+and the direction tables are listed so that mirroring a move maps each
+type onto the mirrored type. Only NumPy is needed.
+"""
+
+import chess
+import numpy as np
+
+# (file step, rank step) of each queen-style direction: N, NE, E, SE, S, SW, W, NW
+QUEEN_DIRECTIONS = [(0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1)]
+KNIGHT_JUMPS = [(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)]
+UNDERPROMOTIONS = [chess.KNIGHT, chess.BISHOP, chess.ROOK]
+
+NUM_MOVE_TYPES = 56 + len(KNIGHT_JUMPS) + 3 * len(UNDERPROMOTIONS)  # 73
+POLICY_SIZE = 64 * NUM_MOVE_TYPES  # 4672
+
+def move_type(move):
+    """Move type (0-72) of a move, from its geometry and promotion piece"""
+    file_step = chess.square_file(move.to_square) - chess.square_file(move.from_square)
+    rank_step = chess.square_rank(move.to_square) - chess.square_rank(move.from_square)
+    if move.promotion is not None and move.promotion != chess.QUEEN:
+        return 64 + UNDERPROMOTIONS.index(move.promotion) * 3 + file_step + 1
+    if (file_step, rank_step) in KNIGHT_JUMPS:
+        return 56 + KNIGHT_JUMPS.index((file_step, rank_step))
+    distance = max(abs(file_step), abs(rank_step))
+    direction = (file_step // distance, rank_step // distance)
+    return QUEEN_DIRECTIONS.index(direction) * 7 + distance - 1
+
+def move_to_index(move):
+    """Index of a move in the policy head output"""
+    return move.from_square * NUM_MOVE_TYPES + move_type(move)
+
+def index_to_move(index, board):
+    """
+    Move for a policy index in a position.
+
+    Args:
+        index (int): Policy index from move_to_index
+        board (chess.Board): Position, needed to tell queen promotions
+            from other queen-style moves
+
+    Returns:
+        chess.Move: The move (not necessarily legal in board)
+    """
+    from_square, kind = divmod(int(index), NUM_MOVE_TYPES)
+    file, rank = chess.square_file(from_square), chess.square_rank(from_square)
+    promotion = None
+    if kind >= 64:
+        piece, file_step = divmod(kind - 64, 3)
+        promotion = UNDERPROMOTIONS[piece]
+        rank_step = 1 if board.turn == chess.WHITE else -1
+        file_step -= 1
+    elif kind >= 56:
+        file_step, rank_step = KNIGHT_JUMPS[kind - 56]
+    else:
+        direction, distance = divmod(kind, 7)
+        file_step, rank_step = (step * (distance + 1) for step in QUEEN_DIRECTIONS[direction])
+    to_square = chess.square(file + file_step, rank + rank_step)
+    if (promotion is None and board.piece_type_at(from_square) == chess.PAWN
+            and chess.square_rank(to_square) in (0, 7)):
+        promotion = chess.QUEEN
+    return chess.Move(from_square, to_square, promotion)
+
+def _packed_index_table():
+    """Policy index for every pack_move value (from | to << 6 | promotion << 12), -1 if none"""
+    table = np.full(1 << 15, -1, dtype=np.int64)
+    for from_square in chess.SQUARES:
+        for to_square in chess.SQUARES:
+            if from_square == to_square:
+                continue
+            file_step = abs(chess.square_file(to_square) - chess.square_file(from_square))
+            rank_step = abs(chess.square_rank(to_square) - chess.square_rank(from_square))
+            if not (file_step == 0 or rank_step == 0 or file_step == rank_step
+                    or {file_step, rank_step} == {1, 2}):
+                continue
+            move = chess.Move(from_square, to_square)
+            table[from_square | to_square << 6] = move_to_index(move)
+            if rank_step == 1 and file_step <= 1:
+                for promotion in (chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+                    move.promotion = promotion
+                    table[from_square | to_square << 6 | promotion << 12] = move_to_index(move)
+    return table
+
+_PACKED_INDEX = _packed_index_table()
+
+def packed_to_indices(packed_moves):
+    """Policy indices for an array of pack_move values"""
+    return _PACKED_INDEX[np.asarray(packed_moves, dtype=np.int64) & 0x7FFF]
+
+def legal_move_indices(board):
+    """
+    Legal moves of a position and their policy indices.
+
+    Returns:
+        tuple: (list of chess.Move, np.ndarray of int64 indices)
+    """
+    moves = list(board.legal_moves)
+    return moves, np.fromiter((move_to_index(move) for move in moves), dtype=np.int64,
+                              count=len(moves))
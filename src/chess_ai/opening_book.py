@@ -0,0 +1,112 @@
+"""
+Polyglot opening book kept open for the whole process.
+The book file is memory-mapped once, and the moves of every position
+looked up are kept in an LRU map keyed by the position's Zobrist hash (the
+Polyglot key), so the opening lines actually played are answered from
+memory without touching the file. Moves are picked in proportion to their
+book weight with a seedable RNG.
+"""
+
+import random
+from collections import OrderedDict
+import chess
+import chess.polyglot
+
+class OpeningBook:
+    """
+    Weighted move choice from a Polyglot book.
+
+    Attributes:
+        path (str): Book file
+        max_ply (int): Positions after this many plies are not looked up
+        min_weight (int): Entries with a lower weight are ignored
+        cache_size (int): Positions kept in the in-memory map
+        hits (int): Lookups answered from the in-memory map
+        misses (int): Lookups that searched the book file
+    """
+    def __init__(self, path, seed=None, max_ply=40, min_weight=1, cache_size=65536):
+        self.path = path
+        self.max_ply = max_ply
+        self.min_weight = min_weight
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._reader = chess.polyglot.MemoryMappedReader(path)
+        self._rng = random.Random(seed)
+        # Zobrist key -> (moves, cumulative weights), or None out of book
+        self._positions = OrderedDict()
+
+    def __len__(self):
+        """Entries in the book file"""
+        return len(self._reader)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def seed(self, seed):
+        """Restart the move choice from seed"""
+        self._rng.seed(seed)
+
+    def moves(self, board):
+        """
+        Book moves of a position.
+
+        Returns:
+            tuple: (moves, cumulative weights), or None if the position is
+            not in the book
+        """
+        if board.ply() > self.max_ply:
+            return None
+        key = chess.polyglot.zobrist_hash(board)
+        if key in self._positions:
+            self._positions.move_to_end(key)
+            self.hits += 1
+            return self._positions[key]
+
+        self.misses += 1
+        entry = None
+        moves, weights, total = [], [], 0
+        for book_entry in self._reader.find_all(board, minimum_weight=self.min_weight):
+            total += book_entry.weight
+            moves.append(book_entry.move)
+            weights.append(total)
+        if moves and total > 0:
+            entry = (tuple(moves), tuple(weights))
+        self._positions[key] = entry
+        while len(self._positions) > self.cache_size:
+            self._positions.popitem(last=False)
+        return entry
+
+    def choose(self, board):
+        """
+        Pick a book move, weighted by the book's weights.
+
+        Args:
+            board (chess.Board): Current position
+
+        Returns:
+            chess.Move: Book move, or None if the position is not in the book
+        """
+        entry = self.moves(board)
+        if entry is None:
+            return None
+        moves, weights = entry
+        return self._rng.choices(moves, cum_weights=weights)[0]
+
+    def stats(self):
+        """Hit/miss counters and occupancy of the in-memory map"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._positions),
+            'capacity': self.cache_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self._reader.close()
+        self._positions.clear()
@@ -34,21 +34,18 @@ def encode_attack_maps(board):
     return attack_map
 
 def encode_mobility(board):
-    """Encode piece mobility"""
-    mobility_map = np.zeros((8, 8), dtype=np.float32)
+    """
+    Encode piece mobility: the number of legal moves from each square.
     
-    for square in chess.SQUARES:
-        piece = board.piece_at(square)
-        if piece is not None:
-            rank = chess.square_rank(square)
-            file = chess.square_file(square)
-            # Count legal moves for the piece
-            board_copy = board.copy()
-            mobility = sum(1 for move in board_copy.legal_moves 
-                         if move.from_square == square)
-            mobility_map[rank, file] = mobility
+    Legal moves are generated once and bucketed by their from-square.
+    Only the side to move has legal moves, so the opponent's pieces are 0.
+    """
+    counts = [0] * 64
+    for move in board.legal_moves:
+        counts[move.from_square] += 1
     
-    return mobility_map
+    # Square index is rank * 8 + file, matching the [rank, file] layout
+    return np.array(counts, dtype=np.float32).reshape(8, 8)
 
 def encode_position(board):
     """Combine all encodings into one feature tensor"""
@@ -0,0 +1,175 @@
+"""
+Post-training int8 quantization of ChessNet for CPU search workers.
+'dynamic' quantizes the weights of the linear layers and their activations
+on the fly; 'static' also quantizes the convolutions, with activation
+ranges calibrated on self-play positions. Quantized models are saved as
+TorchScript, so loading one does not build the float32 network first, and
+QuantizedEvaluator searches with one without any float32 weights at all.
+"""
+
+import copy
+import logging
+import os
+import warnings
+import numpy as np
+import torch
+from torch.ao.quantization import get_default_qconfig_mapping, quantize_dynamic
+from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+from src.chess_ai.batch_encoding import encode_boards
+from src.chess_ai.config import Config
+from src.chess_ai.inference import masked_policy
+from src.chess_ai.move_encoding import legal_move_indices
+from src.chess_ai.replay_buffer import ReplayBuffer, records_to_planes
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = ('dynamic', 'static')
+
+def calibration_planes(directory, count):
+    """
+    Encoded positions for calibrating static quantization.
+
+    Args:
+        directory (str): ReplayBuffer directory with self-play games
+        count (int): Number of positions, taken from the most recent games
+
+    Returns:
+        torch.Tensor: (N, 8, 8, 15) positions; N is 0 for an empty buffer
+    """
+    return torch.from_numpy(records_to_planes(ReplayBuffer(directory).recent(count)))
+
+def quantize_model(model, mode='static', calibration=None):
+    """
+    Build an int8 copy of a ChessNet. The model itself is not changed.
+
+    Args:
+        model (ChessNet): Float32 network
+        mode (str): 'dynamic' or 'static'
+        calibration (torch.Tensor, optional): (N, 8, 8, 15) positions,
+            required for 'static'
+
+    Returns:
+        torch.jit.ScriptModule: Quantized network returning (policy, value)
+    """
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode {mode!r}, expected one of {QUANTIZATION_MODES}")
+    model = copy.deepcopy(model).cpu().to(memory_format=torch.contiguous_format).eval()
+    example = torch.zeros((1, 8, 8, 15))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # torch.ao.quantization and TorchScript deprecation notices
+        if mode == 'dynamic':
+            quantized = quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        else:
+            if calibration is None or len(calibration) == 0:
+                raise ValueError("Static quantization needs calibration positions")
+            # Observers for the kernels of this host (x86, qnnpack on ARM)
+            qconfig_mapping = get_default_qconfig_mapping(torch.backends.quantized.engine)
+            prepared = prepare_fx(model, qconfig_mapping, example_inputs=(example,))
+            with torch.inference_mode():
+                for batch in torch.split(calibration.cpu(), 64):
+                    prepared(batch)
+            quantized = convert_fx(prepared)
+
+        with torch.inference_mode():
+            return torch.jit.freeze(torch.jit.trace(quantized, (example,)))
+
+def save_quantized(module, path):
+    """Write a quantized network from quantize_model"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = path + '.tmp'
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        torch.jit.save(module, temp_path)
+    os.replace(temp_path, path)
+
+def load_quantized(path):
+    """Load a network written by save_quantized"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return torch.jit.load(path, map_location='cpu')
+
+def quantized_path(weights_path):
+    """Where the int8 copy of the weights at weights_path is published"""
+    return os.path.splitext(weights_path)[0] + '.int8.pt'
+
+def publish_quantized(model, path, mode, replay_directory=None):
+    """
+    Quantize a network once and save it for the processes evaluating it.
+
+    Static quantization is calibrated on the most recent positions of
+    replay_directory and falls back to dynamic when there are none yet.
+
+    Args:
+        model (ChessNet): Float32 network
+        path (str): File to write, replaced atomically
+        mode (str): 'dynamic' or 'static'
+        replay_directory (str, optional): ReplayBuffer with self-play games
+
+    Returns:
+        str: Mode actually used
+    """
+    calibration = None
+    if mode == 'static':
+        if replay_directory is not None:
+            calibration = calibration_planes(replay_directory,
+                                             Config.INFERENCE_SETTINGS['calibration_size'])
+        if calibration is None or len(calibration) == 0:
+            logger.warning("No self-play positions to calibrate with yet; "
+                           "using dynamic quantization")
+            mode = 'dynamic'
+    save_quantized(quantize_model(model, mode, calibration), path)
+    return mode
+
+class QuantizedEvaluator:
+    """
+    Evaluates positions with an int8 network alone.
+
+    Has the same evaluate and evaluate_batch methods as RLTrainer, so it
+    can guide NeuralMCTS, but holds neither the float32 ChessNet nor an
+    optimizer.
+
+    Attributes:
+        network (torch.jit.ScriptModule): Network from load_quantized
+    """
+    def __init__(self, network):
+        self.network = network
+
+    def evaluate(self, board):
+        """(priors, value) for one position, as RLTrainer.evaluate"""
+        return self.evaluate_batch([board])[0]
+
+    def evaluate_batch(self, boards):
+        """(priors, value) per board with a single forward pass"""
+        with torch.inference_mode():
+            policy_logits, value_pred = self.network(torch.from_numpy(encode_boards(boards)))
+        moves, indices = zip(*(legal_move_indices(board) for board in boards))
+        _, priors = masked_policy(policy_logits, indices)
+        return [(dict(zip(board_moves, board_priors.tolist())), float(value))
+                for board_moves, board_priors, value in zip(moves, priors, value_pred[:, 0].tolist())]
+
+def quantization_drift(model, quantized, positions):
+    """
+    Compare a quantized network with the float32 one it came from.
+
+    Args:
+        model (ChessNet): Float32 network
+        quantized (torch.jit.ScriptModule): Network from quantize_model
+        positions (torch.Tensor): (N, 8, 8, 15) positions to compare on
+
+    Returns:
+        dict: top1_agreement (share of positions with the same highest
+        policy output), value_mae (mean absolute value difference) and
+        positions
+    """
+    model.eval()
+    with torch.inference_mode():
+        policy, value = model(positions.to(next(model.parameters()).device))
+        quantized_policy, quantized_value = quantized(positions.cpu())
+    policy, value = policy.cpu().numpy(), value.cpu().numpy()
+    quantized_policy, quantized_value = quantized_policy.numpy(), quantized_value.numpy()
+    return {
+        'top1_agreement': float(np.mean(policy.argmax(axis=1) == quantized_policy.argmax(axis=1))),
+        'value_mae': float(np.mean(np.abs(value - quantized_value))),
+        'positions': len(positions),
+    }
@@ -1,8 +1,17 @@
+import os
+import time
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.optim as optim
 import numpy as np
 from src.chess_ai.config import Config
+from src.chess_ai.batch_encoding import encode_boards
+from src.chess_ai.inference import InferenceModel, masked_policy
+from src.chess_ai.move_encoding import POLICY_SIZE, legal_move_indices, move_to_index
+from src.chess_ai.resources import load_checkpoint
+from src.chess_ai.replay_buffer import records_to_planes, records_to_move_indices
+from src.chess_ai.training_data import make_data_loader
 
 class ChessNet(nn.Module):
     def __init__(self):
@@ -13,12 +22,13 @@ class ChessNet(nn.Module):
         self.conv3 = nn.Conv2d(128, 256, 3, padding=1)
         self.fc1 = nn.Linear(256 * 8 * 8, 1024)
         self.value_head = nn.Linear(1024, 1)
-        self.policy_head = nn.Linear(1024, 4672)
+        self.policy_head = nn.Linear(1024, POLICY_SIZE)  # Indexed by move_encoding
         
     def forward(self, x):
         # Input shape is [batch_size, 8, 8, 15]
-        # Need to reshape to [batch_size, 15, 8, 8]
-        x = x.permute(0, 3, 1, 2).contiguous()
+        # Permuting to [batch_size, 15, 8, 8] gives a channels-last view, which
+        # the convolutions take without copying
+        x = x.permute(0, 3, 1, 2)
         
         x = torch.relu(self.conv1(x))
         x = torch.relu(self.conv2(x))
@@ -26,9 +36,35 @@ class ChessNet(nn.Module):
         x = x.reshape(-1, 256 * 8 * 8)  # Using reshape instead of view
         x = torch.relu(self.fc1(x))
         value = torch.tanh(self.value_head(x))
-        policy = torch.softmax(self.policy_head(x), dim=1)
+        # Logits; callers take the softmax over the moves they need
+        policy = self.policy_head(x)
         return policy, value
 
+def create_model(state_dict=None, device=None):
+    """
+    Build a ChessNet on device.
+    
+    With a state_dict the random initialisation of the 16M parameters is
+    skipped: the parameters are allocated empty and the weights copied in.
+    
+    Args:
+        state_dict (dict, optional): Weights to load
+        device (torch.device, optional): Device for the parameters, the
+            GPU when there is one by default
+        
+    Returns:
+        ChessNet: The model
+    """
+    if device is None:
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    if state_dict is None:
+        return ChessNet().to(device)
+    with torch.device('meta'):
+        model = ChessNet()
+    model = model.to_empty(device=device)
+    model.load_state_dict(state_dict)
+    return model
+
 class RLTrainer:
     """
     Manages the training of the neural network model.
@@ -36,6 +72,7 @@ class RLTrainer:
     Attributes:
         device (torch.device): CPU or GPU device for training
         model (ChessNet): Neural network model
+        inference (InferenceModel): Evaluation-only forward pass of model
         optimizer (torch.optim.Optimizer): Optimization algorithm
     """
     def __init__(self, model=None):
@@ -51,17 +88,67 @@ class RLTrainer:
             self.model.parameters(), 
             lr=Config.RL_SETTINGS['learning_rate']
         )
+        self.inference = InferenceModel(self.model)
         print(f"Using device: {self.device}")
+    
+    @classmethod
+    def from_checkpoint(cls, path=None):
+        """
+        Trainer whose model is built straight from the saved weights, as
+        load_model would leave it but without the random initialisation.
+        
+        Args:
+            path (str, optional): Checkpoint, PATHS['model_save'] by default
+        """
+        state_dict = load_checkpoint(path or Config.PATHS['model_save'])
+        if state_dict is None:
+            print("No saved model found. Training from scratch.")
+            return cls()
+        trainer = cls(create_model(state_dict))
+        trainer.model.eval()
+        return trainer
         
     def save_model(self):
         torch.save(self.model.state_dict(), Config.PATHS['model_save'])
         
     def load_model(self):
+        state_dict = load_checkpoint(Config.PATHS['model_save'])
+        if state_dict is None:
+            print("No saved model found. Training from scratch.")
+            return
+        self.model.load_state_dict(state_dict)
+        self.model.eval()  # Set the model to evaluation mode
+    
+    def publish_weights(self, path, version):
+        """
+        Write the current weights for other processes to hot-reload.
+        
+        The file is replaced atomically, so readers never see a partial
+        checkpoint.
+        
+        Args:
+            path (str): Checkpoint path shared with the readers
+            version (int): Version number stored with the weights
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = path + '.tmp'
+        torch.save({'version': version, 'state_dict': self.model.state_dict()}, temp_path)
+        os.replace(temp_path, path)
+    
+    def load_published_weights(self, path):
+        """
+        Load weights written by publish_weights.
+        
+        Returns:
+            int: Version of the loaded weights, or None if nothing is published
+        """
         try:
-            self.model.load_state_dict(torch.load(Config.PATHS['model_save']))
-            self.model.eval()  # Set the model to evaluation mode
+            checkpoint = torch.load(path, map_location='cpu', mmap=True)
         except FileNotFoundError:
-            print("No saved model found. Training from scratch.")
+            return None
+        self.model.load_state_dict(checkpoint['state_dict'])
+        self.model.eval()
+        return checkpoint['version']
         
     def board_to_tensor(self, board):
         """
@@ -73,56 +160,56 @@ class RLTrainer:
         Returns:
             np.ndarray: Encoded board state as a tensor
         """
-        tensor = np.zeros((8, 8, 15), dtype=np.float32)
-        piece_idx = {'P': 0, 'N': 1, 'B': 2, 'R': 3, 'Q': 4, 'K': 5}
-        
-        # Encode piece positions and additional features
-        for square in range(64):
-            piece = board.piece_at(square)
-            if piece:
-                rank, file = square // 8, square % 8
-                offset = 0 if piece.color else 6
-                tensor[rank, file, piece_idx[piece.symbol().upper()] + offset] = 1
-        
-        # Add game state features
-        tensor[:, :, 12] = float(board.turn)
-        tensor[:, :, 13] = float(board.has_kingside_castling_rights(True) or 
-                                board.has_kingside_castling_rights(False))
-        tensor[:, :, 14] = float(board.has_queenside_castling_rights(True) or 
-                                board.has_queenside_castling_rights(False))
-        
-        return tensor
+        return encode_boards([board])[0]
+    
+    def boards_to_tensor(self, boards):
+        """
+        Encode a batch of positions into one contiguous tensor.
+        
+        Args:
+            boards (list): chess.Board positions (or FEN strings)
+            
+        Returns:
+            torch.Tensor: (N, 8, 8, 15) tensor on the trainer's device
+        """
+        return torch.from_numpy(encode_boards(boards)).to(self.device)
     
     def train_step(self, positions, moves, values):
         """Single training step"""
+        return self.train_batch(self.boards_to_tensor(positions),
+                                [move_to_index(move) for move in moves], values)
+    
+    def train_records(self, records):
+        """Single training step on replay buffer records"""
+        position_tensor = torch.from_numpy(records_to_planes(records)).to(self.device)
+        return self.train_batch(position_tensor, records_to_move_indices(records),
+                                np.ascontiguousarray(records['value'], dtype=np.float32))
+    
+    def train_batch(self, position_tensor, move_indices, values):
+        """
+        Single training step on encoded positions.
+        
+        Args:
+            position_tensor (torch.Tensor): (N, 8, 8, 15) encoded positions
+            move_indices (array-like or torch.Tensor): Policy index of each
+                played move
+            values (array-like or torch.Tensor): Target value of each position
+            
+        Returns:
+            float: Total loss
+        """
         try:
             self.model.train()
             self.optimizer.zero_grad()
             
-            # Convert boards to tensors
-            position_tensors = [self.board_to_tensor(board) for board in positions]
-            position_tensor = torch.FloatTensor(np.stack(position_tensors)).to(self.device)
-            
-            # Create move policy tensors
-            policy_tensors = torch.zeros((len(moves), 4672)).to(self.device)
-            for i, move in enumerate(moves):
-                from_square = move.from_square
-                to_square = move.to_square
-                move_index = from_square * 64 + to_square
-                policy_tensors[i][move_index] = 1.0
-            
-            value_tensor = torch.FloatTensor(values).to(self.device)
-            
-            # Debug prints
-            print(f"Position tensor shape: {position_tensor.shape}")
-            print(f"Policy tensor shape: {policy_tensors.shape}")
-            print(f"Value tensor shape: {value_tensor.shape}")
+            move_indices = torch.as_tensor(move_indices, dtype=torch.int64).to(self.device)
+            value_tensor = torch.as_tensor(values, dtype=torch.float32).to(self.device)
             
             # Forward pass
-            policy_pred, value_pred = self.model(position_tensor)
+            policy_logits, value_pred = self.model(position_tensor)
             
             # Calculate losses
-            policy_loss = -torch.sum(policy_tensors * torch.log(policy_pred + 1e-8))
+            policy_loss = F.cross_entropy(policy_logits, move_indices, reduction='sum')
             value_loss = torch.mean((value_tensor - value_pred.squeeze()) ** 2)
             total_loss = policy_loss + value_loss
             
@@ -136,15 +223,102 @@ class RLTrainer:
             print(f"Error in train_step: {str(e)}")
             print(f"Tensor shapes:")
             print(f"Position tensor: {position_tensor.shape if 'position_tensor' in locals() else 'not created'}")
-            print(f"Policy tensor: {policy_tensors.shape if 'policy_tensors' in locals() else 'not created'}")
+            print(f"Move indices: {move_indices.shape if 'move_indices' in locals() else 'not created'}")
             print(f"Value tensor: {value_tensor.shape if 'value_tensor' in locals() else 'not created'}")
             raise e
     
+    def train_epochs(self, directory, num_epochs=None, batch_size=None, num_workers=None,
+                     augment=True):
+        """
+        Train for several epochs on a replay buffer, one mini-batch at a time.
+        
+        Batches are read, augmented and encoded by DataLoader workers, so
+        memory use does not grow with the size of the buffer.
+        
+        Args:
+            directory (str): ReplayBuffer directory
+            num_epochs (int, optional): Passes over the data, RL_SETTINGS['num_epochs']
+                by default
+            batch_size (int, optional): Samples per step, RL_SETTINGS['batch_size']
+                by default
+            num_workers (int, optional): DataLoader worker processes
+            augment (bool): Mirror eligible positions at random
+            
+        Returns:
+            dict: samples, elapsed, samples_per_second and the loss of every batch
+        """
+        num_epochs = num_epochs or Config.RL_SETTINGS['num_epochs']
+        log_interval = Config.RL_SETTINGS['log_interval']
+        loader = make_data_loader(directory, batch_size=batch_size, num_workers=num_workers,
+                                  augment=augment)
+        losses = []
+        samples = 0
+        start = time.monotonic()
+        
+        for epoch in range(num_epochs):
+            for positions, move_indices, values in loader:
+                loss = self.train_batch(positions.to(self.device, non_blocking=True),
+                                        move_indices, values)
+                losses.append(loss)
+                samples += len(positions)
+                if len(losses) % log_interval == 0:
+                    elapsed = time.monotonic() - start
+                    print(f"Epoch {epoch + 1}, batch {len(losses)}: loss {loss:.4f} "
+                          f"({samples / elapsed:.0f} samples/s)")
+        
+        elapsed = time.monotonic() - start
+        return {
+            'samples': samples,
+            'elapsed': elapsed,
+            'samples_per_second': samples / elapsed if elapsed > 0 else 0.0,
+            'losses': losses,
+        }
+    
     def get_move_probabilities(self, board):
-        """Get move probabilities from the current model"""
-        self.model.eval()
-        with torch.no_grad():
-            position = self.board_to_tensor(board)
-            position_tensor = torch.FloatTensor([position]).to(self.device)
-            policy_pred, _ = self.model(position_tensor)
-            return policy_pred.cpu().numpy()[0] 
\ No newline at end of file
+        """Get move probabilities from the current model, indexed by move_to_index"""
+        policy_logits, _ = self.inference(self.boards_to_tensor([board]))
+        return torch.softmax(policy_logits, dim=1).cpu().numpy()[0]
+    
+    def legal_policy(self, boards):
+        """
+        Policy logits and priors for the legal moves of several positions,
+        with a single forward pass. The softmax only covers legal moves.
+        
+        Args:
+            boards (list): chess.Board positions
+            
+        Returns:
+            tuple: (list of (moves, logits, priors) per board, values array)
+        """
+        policy_logits, value_pred = self.inference(self.boards_to_tensor(boards))
+        moves, indices = zip(*(legal_move_indices(board) for board in boards))
+        logits, priors = masked_policy(policy_logits, indices)
+        return list(zip(moves, logits, priors)), value_pred.cpu().numpy()[:, 0]
+    
+    def evaluate(self, board):
+        """
+        Evaluate a position for network-guided search.
+        
+        Args:
+            board (chess.Board): Position to evaluate
+            
+        Returns:
+            tuple: (priors, value) where priors maps each legal move to its
+            policy probability, a softmax over the legal moves only, and value
+            is in [-1, 1] for the side to move
+        """
+        return self.evaluate_batch([board])[0]
+    
+    def evaluate_batch(self, boards):
+        """
+        Evaluate several positions with a single forward pass.
+        
+        Args:
+            boards (list): chess.Board positions to evaluate
+            
+        Returns:
+            list: (priors, value) per board, as returned by evaluate
+        """
+        policies, values = self.legal_policy(boards)
+        return [(dict(zip(moves, priors.tolist())), float(value))
+                for (moves, _, priors), value in zip(policies, values)]
@@ -0,0 +1,189 @@
+"""
+On-disk replay buffer for training samples.
+Each (position, move, value) sample is stored as a fixed 103-byte record:
+the 12 piece bitboards and flags byte from batch_encoding, the move packed
+into 16 bits and a float32 value. Records live in memory-mapped NumPy
+shards, so the buffer survives restarts and only the pages touched by
+sampling are read into memory.
+"""
+
+import json
+import os
+import numpy as np
+from src.array_mcts import pack_move, unpack_move
+from src.chess_ai.batch_encoding import PLANE_PIECES, board_to_bitboards, encode_bitboards
+from src.chess_ai.config import Config
+from src.chess_ai.move_encoding import packed_to_indices
+
+RECORD_DTYPE = np.dtype([
+    ('bitboards', '<u8', (len(PLANE_PIECES),)),
+    ('flags', 'u1'),
+    ('move', '<u2'),
+    ('value', '<f4'),
+])
+
+def records_to_planes(records, out=None):
+    """Network input planes, (N, 8, 8, 15) float32, for an array of records"""
+    return encode_bitboards(records['bitboards'], records['flags'], out=out)
+
+def records_to_move_indices(records):
+    """Policy indices (as move_encoding.move_to_index) for an array of records"""
+    return packed_to_indices(records['move'])
+
+def records_to_moves(records):
+    """chess.Move objects for an array of records"""
+    return [unpack_move(move) for move in records['move']]
+
+class ReplayBuffer:
+    """
+    Append-only store of training records with a sliding window.
+
+    Record i (counting every record ever appended) lives in shard
+    i // shard_size at offset i % shard_size. Only the most recent capacity
+    records are visible; shards that fall entirely out of the window are
+    deleted.
+
+    Attributes:
+        directory (str): Folder holding the shards and metadata
+        capacity (int): Size of the sliding window
+        shard_size (int): Records per shard file
+        total (int): Records appended since the buffer was created
+    """
+    def __init__(self, directory, capacity=None, shard_size=None):
+        settings = Config.REPLAY_SETTINGS
+        self.directory = directory
+        self.capacity = capacity or settings['capacity']
+        self.shard_size = shard_size or settings['shard_size']
+        self.total = 0
+        self._shards = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Re-read the saved length, picking up records appended by another
+        process. Readers call this; the buffer must have a single writer.
+        """
+        meta_path = os.path.join(self.directory, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            # The shard layout is fixed once records exist
+            self.shard_size = meta['shard_size']
+            self.total = meta['total']
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    @property
+    def start(self):
+        """Index of the oldest record in the window"""
+        return max(self.total - self.capacity, 0)
+
+    def append(self, boards, moves, values):
+        """
+        Append samples and save the new length.
+
+        Args:
+            boards (list): chess.Board positions
+            moves (list): chess.Move played in each position
+            values (list): Training value of each position
+        """
+        records = np.empty(len(boards), dtype=RECORD_DTYPE)
+        for record, board, move, value in zip(records, boards, moves, values):
+            bitboards, flags = board_to_bitboards(board)
+            record['bitboards'] = bitboards
+            record['flags'] = flags
+            record['move'] = pack_move(move)
+            record['value'] = value
+        self.append_records(records)
+
+    def append_records(self, records):
+        """Append an array of RECORD_DTYPE records and save the new length"""
+        written = 0
+        while written < len(records):
+            index = self.total + written
+            shard, offset = divmod(index, self.shard_size)
+            count = min(len(records) - written, self.shard_size - offset)
+            self._shard(shard, create=True)[offset:offset + count] = records[written:written + count]
+            written += count
+        self.total += len(records)
+        self.flush()
+        self._drop_old_shards()
+
+    def get(self, indices):
+        """
+        Read records by index within the window, 0 being the oldest.
+
+        Args:
+            indices (array-like): Window indices
+
+        Returns:
+            np.ndarray: RECORD_DTYPE records in the order of indices
+        """
+        indices = np.asarray(indices, dtype=np.int64) + self.start
+        records = np.empty(len(indices), dtype=RECORD_DTYPE)
+        shards = indices // self.shard_size
+        for shard in np.unique(shards):
+            selected = shards == shard
+            records[selected] = self._shard(int(shard))[indices[selected] % self.shard_size]
+        return records
+
+    def sample(self, batch_size, rng=None):
+        """
+        Draw records uniformly from the window, with replacement.
+
+        Args:
+            batch_size (int): Number of records
+            rng (np.random.Generator, optional): Source of randomness
+
+        Returns:
+            np.ndarray: RECORD_DTYPE records
+        """
+        if len(self) == 0:
+            raise ValueError("Cannot sample from an empty replay buffer")
+        rng = rng or np.random.default_rng()
+        return self.get(rng.integers(0, len(self), size=batch_size))
+
+    def recent(self, count):
+        """The count most recent records, oldest first"""
+        count = min(count, len(self))
+        return self.get(np.arange(len(self) - count, len(self)))
+
+    def flush(self):
+        """Write shard contents and the metadata to disk"""
+        for shard in self._shards.values():
+            if isinstance(shard, np.memmap):
+                shard.flush()
+        meta_path = os.path.join(self.directory, 'meta.json')
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({'shard_size': self.shard_size, 'total': self.total}, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def close(self):
+        """Flush and release the memory maps"""
+        self.flush()
+        self._shards.clear()
+
+    def _shard_path(self, shard):
+        return os.path.join(self.directory, f'shard_{shard:06d}.npy')
+
+    def _shard(self, shard, create=False):
+        if shard not in self._shards:
+            path = self._shard_path(shard)
+            if create and not os.path.exists(path):
+                self._shards[shard] = np.lib.format.open_memmap(
+                    path, mode='w+', dtype=RECORD_DTYPE, shape=(self.shard_size,))
+            else:
+                self._shards[shard] = np.load(path, mmap_mode='r+')
+        return self._shards[shard]
+
+    def _drop_old_shards(self):
+        first_needed = self.start // self.shard_size
+        for name in os.listdir(self.directory):
+            if name.startswith('shard_') and name.endswith('.npy'):
+                shard = int(name[len('shard_'):-len('.npy')])
+                if shard < first_needed:
+                    self._shards.pop(shard, None)
+                    os.remove(os.path.join(self.directory, name))
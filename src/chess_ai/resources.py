@@ -0,0 +1,77 @@
+"""
+Process-wide cache of loaded resources.
+Tablebases, opening books and model checkpoints are opened on first use
+and shared by every ModernChessAI in the process, so creating another AI
+is free and a game never pays for a resource it does not touch.
+"""
+
+import os
+import threading
+from src.chess_ai.config import Config
+from src.chess_ai.opening_book import OpeningBook
+from src.chess_ai.tablebase import TablebaseManager
+
+_lock = threading.Lock()
+_tablebases = {}
+_books = {}
+_checkpoints = {}
+
+def get_tablebase(path=None):
+    """TablebaseManager for path (PATHS['tablebase'] by default), opened once"""
+    path = path or Config.PATHS['tablebase']
+    with _lock:
+        if path not in _tablebases:
+            _tablebases[path] = TablebaseManager(path=path)
+        return _tablebases[path]
+
+def get_opening_book(path=None):
+    """
+    OpeningBook for path (PATHS['opening_book'] by default), opened once
+    with Config.BOOK_SETTINGS.
+
+    Returns:
+        OpeningBook: The book, or None if there is no book file
+    """
+    path = path or Config.PATHS['opening_book']
+    with _lock:
+        if path not in _books:
+            settings = Config.BOOK_SETTINGS
+            _books[path] = OpeningBook(
+                path, seed=settings['seed'], max_ply=settings['max_ply'],
+                min_weight=settings['min_weight'], cache_size=settings['cache_size']
+            ) if os.path.isfile(path) else None
+        return _books[path]
+
+def load_checkpoint(path):
+    """
+    State dict saved with torch.save at path.
+
+    The file is memory-mapped rather than read, so only the pages that
+    are copied out are loaded, and the result is cached until the file
+    changes. The tensors are shared between callers: copy them (for
+    example with load_state_dict) before modifying.
+
+    Returns:
+        dict: Tensors by parameter name, or None if there is no file
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _lock:
+        cached = _checkpoints.get(path)
+        if cached is None or cached[0] != mtime:
+            import torch  # Only processes that load a network pay for the import
+            state_dict = torch.load(path, map_location='cpu', mmap=True, weights_only=True)
+            _checkpoints[path] = (mtime, state_dict)
+        return _checkpoints[path][1]
+
+def clear():
+    """Drop every cached resource"""
+    with _lock:
+        _tablebases.clear()
+        for book in _books.values():
+            if book is not None:
+                book.close()
+        _books.clear()
+        _checkpoints.clear()
@@ -1,75 +1,358 @@
 """
 Self-play training module for the chess AI.
-Generates training data through AI vs AI games.
+Generates training data through AI vs AI games, either one game at a time
+in this process or in parallel worker processes that stream finished
+games back to the trainer.
 """
 
 import chess
-from src.chess_ai.chess_ai import ModernChessAI
+import logging
+import os
 import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import torch
+from src.chess_ai.chess_ai import ModernChessAI
+from src.chess_ai.config import Config
+from src.chess_ai.quantization import (QuantizedEvaluator, load_quantized, publish_quantized,
+                                       quantized_path)
+from src.chess_ai.reinforcement import RLTrainer, create_model
+
+logger = logging.getLogger(__name__)
+
+def play_game(ai, seed, time_per_move, random_move_rate):
+    """
+    Play one self-play game.
+
+    The seed fixes the exploration moves, the opening book choices (if
+    the AI uses the book, see SELF_PLAY_BOOK) and every other random
+    choice made in this process. Searches are time-limited, so moves
+    chosen by the AI can still differ between runs.
+
+    Args:
+        ai (ModernChessAI): AI playing both sides
+        seed (int): Seed for this game
+        time_per_move (float): Search time per move in seconds
+        random_move_rate (float): Probability of playing a random legal
+            move instead of searching
+
+    Returns:
+        tuple: (list of moves, result string such as "1-0")
+    """
+    rng = random.Random(seed)
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    torch.manual_seed(seed)
+    if ai is not None and ai.opening_book is not None:
+        ai.opening_book.seed(seed)
+
+    board = chess.Board()
+    moves = []
+    while not board.is_game_over():
+        # Add random moves occasionally to explore different positions
+        if rng.random() < random_move_rate:
+            move = rng.choice(list(board.legal_moves))
+        else:
+            move = ai.get_best_move(board, time_limit=time_per_move)
+        moves.append(move)
+        board.push(move)
+    return moves, board.result()
+
+# State of a self-play worker process, set up by _init_worker
+_worker_ai = None
+_worker_weights_path = None
+_worker_weights_mtime = None
+_worker_quantized_path = None
+
+def _init_worker(model_state, weights_path=None, quantized_path=None, guidance=None):
+    """
+    Set up the worker's AI: from model_state, or with quantized_path from
+    the int8 network alone, so the float32 model is never built. guidance
+    is the trainer's choice of search ('network' or 'rollout'), so workers
+    play the same kind of games as the trainer's own AI.
+    """
+    global _worker_ai, _worker_weights_path, _worker_weights_mtime, _worker_quantized_path
+    torch.set_num_threads(1)  # One core per worker
+    _worker_weights_path = weights_path
+    _worker_quantized_path = quantized_path
+    if quantized_path is not None:
+        _worker_ai = ModernChessAI(use_mcts=True, use_rl=True,
+                                   evaluator=QuantizedEvaluator(load_quantized(quantized_path)),
+                                   use_book=Config.SELF_PLAY_SETTINGS['book'], guidance=guidance)
+        _worker_weights_mtime = os.stat(quantized_path).st_mtime_ns
+        return
+    # Built straight from the trainer's weights rather than the saved model
+    trainer = RLTrainer(create_model(model_state)) if model_state is not None else None
+    _worker_ai = ModernChessAI(use_mcts=True, use_rl=True, rl_trainer=trainer,
+                               use_book=Config.SELF_PLAY_SETTINGS['book'], guidance=guidance)
+    _worker_weights_mtime = None
+
+def _reload_published_weights():
+    """
+    Load newly published weights into the worker's AI, if there are any.
+    A worker evaluating an int8 network loads the int8 copy published
+    with the weights instead.
+    """
+    global _worker_weights_mtime
+    path = _worker_quantized_path or _worker_weights_path
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return
+    if mtime == _worker_weights_mtime:
+        return
+    if _worker_quantized_path is not None:
+        _worker_ai.evaluator.network = load_quantized(path)
+    else:
+        _worker_ai.rl_trainer.load_published_weights(path)
+    _worker_weights_mtime = mtime
+    # Cached evaluations and trees came from the old weights
+    if _worker_ai.transpositions is not None:
+        _worker_ai.transpositions.clear()
+    _worker_ai._search = None
+
+def _self_play_worker(seed, time_per_move, random_move_rate):
+    if _worker_weights_path is not None:
+        _reload_published_weights()
+    return play_game(_worker_ai, seed, time_per_move, random_move_rate)
 
 class SelfPlayTrainer:
     """
     Manages self-play training process for the AI.
-    
+
     Attributes:
         num_games (int): Number of games to play
+        num_workers (int): Worker processes playing games; 1 plays them
+            in this process
+        seed (int): Seed of the first game; game i uses seed + i
+        time_per_move (float): Search time per move in seconds
+        random_move_rate (float): Probability of a random exploration move
+        replay_buffer (ReplayBuffer): Where finished games are stored; if
+            None they are kept in positions, moves and results
+        weights_path (str): Published weights that workers reload before
+            each game when they change, or None
+        weights_version (int): Version of the weights last published for
+            the model server
+        new_samples (int): Samples added to replay_buffer since the last
+            training step
         positions (list): Collected board positions
         moves (list): Moves played in the games
         results (list): Game results for training
-        ai (ModernChessAI): AI instance for self-play
+        ai (ModernChessAI): AI instance for self-play; it plays book moves
+            only with SELF_PLAY_BOOK
+        games_played (int): Games finished so far
+        failed_games (int): Games lost to errors or repeated worker crashes
+        worker_crashes (int): Times the worker pool had to be restarted
+        elapsed (float): Seconds spent generating games
     """
-    def __init__(self, num_games=1000):
+    def __init__(self, num_games=1000, num_workers=None, seed=None, time_per_move=None,
+                 random_move_rate=None, replay_buffer=None, weights_path=None):
+        settings = Config.SELF_PLAY_SETTINGS
         self.num_games = num_games
+        self.num_workers = num_workers or settings['num_workers']
+        self.seed = seed if seed is not None else settings['seed']
+        self.time_per_move = (time_per_move if time_per_move is not None
+                              else settings['time_per_move'])
+        self.random_move_rate = (random_move_rate if random_move_rate is not None
+                                 else settings['random_move_rate'])
+        self.replay_buffer = replay_buffer
+        self.weights_path = weights_path
+        self.weights_version = 0
+        self._weights_changed = True  # Not yet published for the model server
+        self.new_samples = 0
         self.positions = []
         self.moves = []
         self.results = []
-        self.ai = ModernChessAI(use_mcts=True, use_rl=True)
-        
+        self.ai = ModernChessAI(use_mcts=True, use_rl=True,
+                                use_book=Config.SELF_PLAY_SETTINGS['book'])
+        self.games_played = 0
+        self.failed_games = 0
+        self.worker_crashes = 0
+        self.elapsed = 0.0
+
     def generate_game(self):
-        board = chess.Board()
-        game_positions = []
-        game_moves = []
-        
-        while not board.is_game_over():
-            # Add random moves occasionally to explore different positions
-            if random.random() < 0.1:
-                legal_moves = list(board.legal_moves)
-                move = random.choice(legal_moves)
-            else:
-                move = self.ai.get_best_move(board, time_limit=0.1)
-            
-            game_positions.append(board.copy())
-            game_moves.append(move)
-            board.push(move)
+        """Play the next game in this process and record its positions"""
+        start = time.monotonic()
+        game_moves, result = play_game(self.ai, self.seed + self.games_played,
+                                       self.time_per_move, self.random_move_rate)
+        self.elapsed += time.monotonic() - start
+        self._record_game(game_moves, result)
+        return game_moves, result
+
+    def generate_games(self, num_games, max_restarts=3):
+        """
+        Play games in worker processes, yielding each one as it finishes.
+
+        Every worker gets its own ModernChessAI with the trainer's current
+        weights. When NN_QUANTIZE is set they are quantized to int8 once
+        here, and workers load only that int8 network; later weights are
+        quantized by whoever publishes them (see run_learner). With
+        MODEL_SERVER enabled the workers evaluate on the model server
+        instead and get no weights; the current weights are published for
+        the server first (see publish_for_server). Workers search the way
+        the trainer's own AI would (see ModernChessAI.network_guided).
+        Finished games are recorded as soon as they arrive, so a crashed
+        worker only costs the games that were still running; the pool is
+        restarted and those games are played again, up to max_restarts
+        times.
+
+        Args:
+            num_games (int): Number of games to play
+            max_restarts (int): Pool restarts allowed after worker crashes
+
+        Yields:
+            tuple: (list of moves, result string) per finished game
+        """
+        initargs = self._worker_initargs()
+        remaining = [self.seed + self.games_played + i for i in range(num_games)]
+        restarts = 0
+        start = time.monotonic()
+
+        while remaining:
+            pool = ProcessPoolExecutor(max_workers=self.num_workers, initializer=_init_worker,
+                                       initargs=initargs)
+            try:
+                futures = {pool.submit(_self_play_worker, seed, self.time_per_move,
+                                       self.random_move_rate): seed
+                           for seed in remaining}
+                for future in as_completed(futures):
+                    seed = futures[future]
+                    try:
+                        game_moves, result = future.result()
+                    except BrokenProcessPool:
+                        continue  # Played again after the restart
+                    except Exception as e:
+                        logger.error(f"Self-play game {seed} failed: {str(e)}")
+                        remaining.remove(seed)
+                        self.failed_games += 1
+                        continue
+
+                    remaining.remove(seed)
+                    self.elapsed += time.monotonic() - start
+                    self._record_game(game_moves, result)
+                    yield game_moves, result
+                    start = time.monotonic()  # Time spent by the caller is not counted
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+            if remaining:
+                self.worker_crashes += 1
+                restarts += 1
+                if restarts > max_restarts:
+                    logger.error(f"Self-play workers keep crashing; dropping {len(remaining)} games")
+                    self.failed_games += len(remaining)
+                    break
+                logger.warning(f"Self-play worker crashed; replaying {len(remaining)} unfinished games")
+
+        self.elapsed += time.monotonic() - start
+
+    def _worker_initargs(self):
+        """Arguments of _init_worker for the current weights and guidance"""
+        # Passing weights marks the network as given in the workers, so
+        # they follow this AI's decision instead of making their own
+        guidance = 'network' if self.ai.network_guided() else 'rollout'
+        if Config.MODEL_SERVER_SETTINGS['enabled']:
+            # The server holds the weights and reloads published ones itself
+            self.publish_for_server()
+            return (None, None, None, guidance)
+        quantized = self._quantize_for_workers()
+        if quantized is not None:
+            return (None, self.weights_path, quantized, guidance)
+        model_state = {name: tensor.cpu()
+                       for name, tensor in self.ai.rl_trainer.model.state_dict().items()}
+        return (model_state, self.weights_path, None, guidance)
+
+    def publish_for_server(self):
+        """
+        Publish the trainer's weights to PATHS['published_model'], which the
+        model server reloads, if they changed since the last publish.
         
-        # Store game result
-        result = board.result()
+        Only applies with MODEL_SERVER enabled and no weights_path: inside
+        ActorLearnerPipeline the learner publishes the weights instead.
+        """
+        if (not Config.MODEL_SERVER_SETTINGS['enabled'] or self.weights_path is not None
+                or not self._weights_changed):
+            return
+        self.weights_version += 1
+        self.ai.rl_trainer.publish_weights(Config.PATHS['published_model'], self.weights_version)
+        self._weights_changed = False
+
+    def _quantize_for_workers(self):
+        """
+        Save an int8 copy of the current network for the workers, next to
+        the published weights when there are any.
+
+        Returns:
+            str: Path of the int8 network, or None when quantization is off
+        """
+        mode = Config.INFERENCE_SETTINGS['quantize']
+        if mode == 'none':
+            return None
+        if self.weights_path is not None:
+            path = quantized_path(self.weights_path)
+        else:
+            path = Config.PATHS['quantized_model']
+        directory = self.replay_buffer.directory if self.replay_buffer is not None else None
+        publish_quantized(self.ai.rl_trainer.model, path, mode, directory)
+        return path
+
+    def _record_game(self, game_moves, result):
+        """Add a finished game's positions, moves and results to the training data"""
         if result == "1-0":
             final_score = 1.0
         elif result == "0-1":
             final_score = -1.0
         else:
             final_score = 0.0
-            
+
         # Update position evaluations based on final result
-        for pos, move in zip(game_positions, game_moves):
-            self.positions.append(pos)
-            self.moves.append(move)
-            self.results.append(final_score)
+        board = chess.Board()
+        positions, scores = [], []
+        for move in game_moves:
+            positions.append(board.copy(stack=False))
+            scores.append(final_score)
             final_score *= -1  # Alternate for each position
-        
-        return game_moves, result
-    
+            board.push(move)
+
+        if self.replay_buffer is not None:
+            self.replay_buffer.append(positions, game_moves, scores)
+            self.new_samples += len(positions)
+        else:
+            self.positions.extend(positions)
+            self.moves.extend(game_moves)
+            self.results.extend(scores)
+        self.games_played += 1
+
+    @property
+    def games_per_hour(self):
+        """Games finished per hour of generation time"""
+        return self.games_played * 3600 / self.elapsed if self.elapsed > 0 else 0.0
+
     def train(self):
-        for i in range(self.num_games):
-            moves, result = self.generate_game()
-            print(f"Game {i+1}: {result} in {len(moves)} moves")
-            
+        self.publish_for_server()
+        if self.num_workers > 1:
+            games = self.generate_games(self.num_games)
+        else:
+            games = (self.generate_game() for _ in range(self.num_games))
+
+        for i, (moves, result) in enumerate(games):
+            print(f"Game {i+1}: {result} in {len(moves)} moves "
+                  f"({self.games_per_hour:.0f} games/hour)")
+
             # Train the RL model periodically
-            if len(self.positions) >= 1000:
+            if self.replay_buffer is not None:
+                if self.new_samples >= 1000:
+                    self.ai.train_records(self.replay_buffer.sample(1000))
+                    self.new_samples = 0
+                    self._weights_changed = True
+            elif len(self.positions) >= 1000:
                 self.ai.train(self.positions, self.moves, self.results)
                 self.positions = []
                 self.moves = []
                 self.results = []
-        
-        return self.positions, self.moves, self.results 
\ No newline at end of file
+                self._weights_changed = True
+            self.publish_for_server()
+
+        return self.positions, self.moves, self.results
@@ -0,0 +1,89 @@
+"""
+Streaming training data for RLTrainer.
+Serves mini-batches from an on-disk ReplayBuffer through a
+torch.utils.data.DataLoader. Worker processes read records from the
+memory-mapped shards, augment and encode them, so only the batches in
+flight are held in memory whatever the size of the buffer.
+"""
+
+import numpy as np
+import torch
+from torch.utils.data import BatchSampler, DataLoader, Dataset, RandomSampler
+from src.chess_ai.config import Config
+from src.chess_ai.data_augmentation import mirror_records
+from src.chess_ai.replay_buffer import (ReplayBuffer, records_to_planes,
+                                        records_to_move_indices)
+
+class ReplayDataset(Dataset):
+    """
+    Map-style dataset over the window of a ReplayBuffer directory.
+
+    Indexing with a list of indices returns a whole encoded batch, so the
+    DataLoader is used with batch_size=None and a BatchSampler. Each worker
+    opens its own memory maps on first use.
+
+    Attributes:
+        directory (str): ReplayBuffer directory
+        augment (bool): Mirror eligible positions with probability 0.5
+        length (int): Records in the window when the dataset was created
+    """
+    def __init__(self, directory, augment=True):
+        self.directory = directory
+        self.augment = augment
+        self.length = len(ReplayBuffer(directory))
+        self._buffer = None
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, indices):
+        """
+        Encode a batch of records.
+
+        Returns:
+            tuple: (positions (N, 8, 8, 15) float32, move indices (N,) int64,
+            values (N,) float32) tensors
+        """
+        if self._buffer is None:
+            self._buffer = ReplayBuffer(self.directory)
+        records = self._buffer.get(np.sort(np.asarray(indices)))
+        if self.augment:
+            records = mirror_records(records, mask=np.random.random(len(records)) < 0.5)
+        return (torch.from_numpy(records_to_planes(records)),
+                torch.from_numpy(records_to_move_indices(records)),
+                torch.from_numpy(np.ascontiguousarray(records['value'], dtype=np.float32)))
+
+def _seed_worker(worker_id):
+    # Give each loader worker its own augmentation stream
+    np.random.seed(torch.initial_seed() % 2**32)
+
+def make_data_loader(directory, batch_size=None, num_workers=None, augment=True, shuffle=True):
+    """
+    Build a DataLoader yielding encoded mini-batches from a replay buffer.
+
+    Args:
+        directory (str): ReplayBuffer directory
+        batch_size (int, optional): Samples per batch, RL_SETTINGS['batch_size']
+            by default
+        num_workers (int, optional): Loader processes, RL_SETTINGS['num_workers']
+            by default; 0 encodes in the calling process
+        augment (bool): Mirror eligible positions at random
+        shuffle (bool): Visit the records in random order
+
+    Returns:
+        DataLoader: Batches of (positions, move indices, values)
+    """
+    settings = Config.RL_SETTINGS
+    batch_size = batch_size or settings['batch_size']
+    num_workers = num_workers if num_workers is not None else settings['num_workers']
+    dataset = ReplayDataset(directory, augment=augment)
+    sampler = RandomSampler(dataset) if shuffle else range(len(dataset))
+    return DataLoader(
+        dataset,
+        sampler=BatchSampler(sampler, batch_size, drop_last=False),
+        batch_size=None,
+        num_workers=num_workers,
+        worker_init_fn=_seed_worker,
+        pin_memory=torch.cuda.is_available(),
+        persistent_workers=num_workers > 0,
+    )
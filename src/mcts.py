@@ -1,28 +1,64 @@
 import chess
 import math
 import random
-from evaluation import evaluate_board
+import time
 from src.chess_ai.config import Config
+from src.rollout import rollout
+from src.transposition import position_key
+
+def moves_since(root_board, board):
+    """
+    Find the moves that lead from root_board to board.
+    
+    Both boards must share move history, as boards from the same game do.
+    
+    Args:
+        root_board (chess.Board): Earlier position
+        board (chess.Board): Later position in the same game
+        
+    Returns:
+        list: Moves played since root_board, or None if board does not
+        continue root_board
+    """
+    root_stack = root_board.move_stack
+    stack = board.move_stack
+    if len(stack) < len(root_stack) or stack[:len(root_stack)] != root_stack:
+        return None
+    
+    moves = stack[len(root_stack):]
+    replay = root_board.copy(stack=False)
+    for move in moves:
+        replay.push(move)
+    if replay.fen() != board.fen():
+        return None
+    return moves
 
 class Node:
     """
     Node in the MCTS tree representing a board position.
     
+    Nodes do not store a board. The search keeps one working board and
+    pushes each node's move on the way down, popping back to the root at
+    the end of the iteration.
+    
     Attributes:
-        board (chess.Board): Chess position at this node
+        move (chess.Move): Move leading to this node, None at the root
         parent (Node): Parent node in the tree
         children (dict): Child nodes mapped by moves
         wins (float): Number of wins from this position
         visits (int): Number of times this node was visited
-        untried_moves (list): Legal moves not yet explored
+        untried_moves (list): Legal moves not yet explored, None until the
+            node is first expanded
+        prior (float): Policy prior of the move leading to this node
     """
-    def __init__(self, board, parent=None):
-        self.board = board.copy()
+    def __init__(self, parent=None, move=None, prior=1.0):
+        self.move = move
         self.parent = parent
         self.children = {}  # Map moves to nodes
         self.wins = 0
         self.visits = 0
-        self.untried_moves = list(board.legal_moves)
+        self.untried_moves = None
+        self.prior = prior
     
     def ucb1(self):
         """Calculate UCB1 value for node selection"""
@@ -32,21 +68,34 @@ class Node:
                 Config.MCTS_SETTINGS['exploration_constant'] * 
                 math.sqrt(math.log(self.parent.visits) / self.visits))
     
+    def puct(self, c_puct):
+        """Calculate PUCT value for node selection; unvisited nodes count as draws"""
+        q_value = self.wins / self.visits if self.visits > 0 else 0.5
+        return (q_value + c_puct * self.prior *
+                math.sqrt(self.parent.visits) / (1 + self.visits))
+    
     def select_child(self):
         """Select child with highest UCB1 value"""
         if not self.children:
             return None
         return max(self.children.values(), key=lambda node: node.ucb1())
     
-    def expand(self):
-        """Expand the tree by adding a new child node"""
+    def expand(self, board):
+        """
+        Expand the tree by adding a new child node.
+        
+        Args:
+            board (chess.Board): Working board at this node; the child's move
+                is pushed onto it
+        """
+        if self.untried_moves is None:
+            self.untried_moves = list(board.legal_moves)
         if not self.untried_moves:
             return None
         
         move = self.untried_moves.pop()
-        new_board = self.board.copy()
-        new_board.push(move)
-        child_node = Node(new_board, parent=self)
+        board.push(move)
+        child_node = Node(parent=self, move=move)
         self.children[move] = child_node
         return child_node
     
@@ -56,38 +105,66 @@ class Node:
         self.wins += result
 
 class MCTS:
-    def __init__(self, board, max_iterations=None):
-        self.root = Node(board)
+    """
+    Monte Carlo Tree Search over chess positions.
+    
+    Attributes:
+        root (Node): Root node of the search tree
+        board (chess.Board): Working board, at the root position between
+            iterations
+        max_iterations (int): Upper bound on iterations per search
+        iterations (int): Iterations completed by the last search
+        simulations (int): Simulations (rollouts) run by the last search
+        elapsed (float): Wall-clock seconds spent in the last search
+        transpositions (TranspositionTable): Optional table of leaf results
+            shared with other searches of the same kind
+        tt_samples (int): Results a table entry needs before it replaces a
+            rollout
+        rollout_policy (RolloutPolicy): Plays the simulations, the default
+            policy from src/rollout.py if None
+    """
+    def __init__(self, board, max_iterations=None, transpositions=None, rollout_policy=None):
+        self.root = Node()
+        self.board = board.copy()
+        self.root_ply = self.board.ply()
         self.max_iterations = max_iterations or Config.MCTS_SETTINGS['max_iterations']
+        self.transpositions = transpositions
+        self.tt_samples = Config.MCTS_SETTINGS['tt_samples']
+        self.rollout_policy = rollout_policy
+        self.iterations = 0
+        self.simulations = 0
+        self.elapsed = 0.0
     
     def select(self):
-        """Select a leaf node using UCB1"""
+        """Select a leaf node using UCB1, pushing its path onto the working board"""
         node = self.root
         while node.untried_moves == [] and node.children:
             node = node.select_child()
+            self.board.push(node.move)
         return node
     
+    def unwind(self):
+        """Pop the working board back to the root position"""
+        while self.board.ply() > self.root_ply:
+            self.board.pop()
+    
     def simulate(self, board):
-        """Run a random simulation from the current position"""
-        temp_board = board.copy()
-        depth = 0
-        max_depth = Config.MCTS_SETTINGS['max_depth']
-        
-        while not temp_board.is_game_over() and depth < max_depth:
-            legal_moves = list(temp_board.legal_moves)
-            move = random.choice(legal_moves)
-            temp_board.push(move)
-            depth += 1
+        """Run a simulation from the current position"""
+        if self.rollout_policy is None:
+            return rollout(board)
+        return self.rollout_policy(board)
+    
+    def evaluate_leaf(self, board):
+        """Result for a leaf, from the transposition table or a new rollout"""
+        if self.transpositions is None:
+            self.simulations += 1
+            return self.simulate(board)
         
-        # Evaluate final position
-        if temp_board.is_checkmate():
-            return 1.0 if temp_board.turn != board.turn else 0.0
-        elif temp_board.is_stalemate() or temp_board.is_insufficient_material():
-            return 0.5
-        else:
-            # Use evaluation function for non-terminal positions
-            eval_score = evaluate_board(temp_board)
-            return 1.0 / (1.0 + math.exp(-eval_score/100))  # Sigmoid normalization
+        result, simulated = self.transpositions.sample(position_key(board),
+                                                       lambda: self.simulate(board),
+                                                       self.tt_samples)
+        self.simulations += simulated
+        return result
     
     def backpropagate(self, node, result):
         """Backpropagate the simulation result up the tree"""
@@ -96,23 +173,101 @@ class MCTS:
             node = node.parent
             result = 1 - result  # Flip result for opponent
     
-    def get_best_move(self):
-        """Run MCTS and return the best move"""
-        for _ in range(self.max_iterations):
-            leaf = self.select()
-            child = leaf.expand()
+    def add_virtual_loss(self, node, amount):
+        """
+        Add visits without wins along the path from node to the root, so that
+        pending paths look worse to concurrent selections. A negative amount
+        removes it again.
+        """
+        while node is not None:
+            node.visits += amount
+            node = node.parent
+    
+    def get_best_move(self, time_limit=None):
+        """
+        Run MCTS and return the best move.
+        
+        Args:
+            time_limit (float, optional): Wall-clock budget in seconds. The
+                search stops at the first iteration boundary past the
+                deadline, or after max_iterations, whichever comes first.
+        
+        Returns:
+            chess.Move: Most visited move at the root
+        """
+        start = time.monotonic()
+        deadline = start + time_limit if time_limit is not None else None
+        self.iterations = 0
+        self.simulations = 0
+        
+        while self.iterations < self.max_iterations:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
             
-            if child is None:
-                simulation_result = self.simulate(leaf.board)
-            else:
-                simulation_result = self.simulate(child.board)
+            leaf = self.select()
+            child = leaf.expand(self.board)
+            if child is not None:
                 leaf = child
             
+            simulation_result = self.evaluate_leaf(self.board)
+            self.unwind()
             self.backpropagate(leaf, simulation_result)
+            self.iterations += 1
+        
+        self.elapsed = time.monotonic() - start
         
         # Select move with highest visit count
         if not self.root.children:
-            return random.choice(list(self.root.board.legal_moves))
+            return random.choice(list(self.board.legal_moves))
         
         return max(self.root.children.items(),
-                  key=lambda x: x[1].visits)[0] 
\ No newline at end of file
+                  key=lambda x: x[1].visits)[0]
+    
+    def root_statistics(self):
+        """Visit count and summed result of each expanded root move"""
+        return {move: (child.visits, child.wins)
+                for move, child in self.root.children.items()}
+    
+    def reroot(self, board):
+        """
+        Move the root to the node for board, keeping its subtree.
+        
+        Everything outside the new root's subtree is dropped. Moves that
+        were never expanded get a fresh node.
+        
+        Args:
+            board (chess.Board): Position reached from the current root
+            
+        Returns:
+            bool: False if board does not continue the root position
+        """
+        moves = moves_since(self.board, board)
+        if moves is None:
+            return False
+        
+        node = self.root
+        for move in moves:
+            node = node.children.get(move)
+            if node is None:
+                node = Node()
+                break
+        
+        node.parent = None
+        node.move = None
+        self.root = node
+        self.board = board.copy()
+        self.root_ply = self.board.ply()
+        return True
+    
+    def search_stats(self):
+        """Summary of the last search for logging and time tuning"""
+        return {
+            'iterations': self.iterations,
+            'simulations': self.simulations,
+            'elapsed': self.elapsed,
+            'simulations_per_second': (self.simulations / self.elapsed
+                                       if self.elapsed > 0 else 0.0),
+            'root_visits': self.root.visits,
+            'transpositions': (self.transpositions.stats()
+                               if self.transpositions is not None else None),
+        }
@@ -0,0 +1,195 @@
+"""
+Network-guided Monte Carlo Tree Search (PUCT).
+ChessNet's policy head sets the child priors and its value head replaces
+the random rollout, as in AlphaZero. Leaves are evaluated in batches:
+several are selected under virtual loss, scored with one forward pass and
+then expanded and backed up together.
+"""
+
+import random
+import time
+import numpy as np
+from src.mcts import MCTS, Node
+from src.chess_ai.config import Config
+from src.chess_ai.move_encoding import legal_move_indices, move_to_index
+from src.transposition import position_key
+
+def priors_from_table(board, stored):
+    """
+    Priors over the legal moves of board from a transposition entry.
+
+    Moves outside the stored highest priors share the remaining mass.
+
+    Args:
+        board (chess.Board): Position of the entry
+        stored (tuple): (policy indices, probabilities) from probe
+
+    Returns:
+        dict: Legal move to prior
+    """
+    moves, indices = legal_move_indices(board)
+    known = dict(zip(stored[0].tolist(), stored[1].tolist()))
+    missing = sum(1 for index in indices.tolist() if index not in known)
+    rest = max(1.0 - sum(known.values()), 0.0) / missing if missing else 0.0
+    return {move: known.get(index, rest) for move, index in zip(moves, indices.tolist())}
+
+class NeuralMCTS(MCTS):
+    """
+    PUCT search guided by a policy/value evaluator.
+
+    A node's wins are stored from the point of view of the player who made
+    the move leading to it, so a parent always picks the child with the
+    highest score.
+
+    Attributes:
+        evaluator: Object with an evaluate_batch(boards) method returning,
+            per board, a dict of priors over the legal moves and a value in
+            [-1, 1] for the side to move (RLTrainer provides one)
+        c_puct (float): Exploration weight of the prior
+        batch_size (int): Maximum number of leaves per network call
+        virtual_loss (float): Visits added to each node on a pending path
+        evaluations (int): Positions evaluated by the last search
+        batches (int): Network calls made by the last search
+        collisions (int): Batches cut short because a pending leaf was reselected
+    """
+    def __init__(self, board, evaluator, max_iterations=None, c_puct=None, batch_size=None,
+                 transpositions=None):
+        super().__init__(board, max_iterations=max_iterations, transpositions=transpositions)
+        self.evaluator = evaluator
+        self.c_puct = c_puct if c_puct is not None else Config.MCTS_SETTINGS['c_puct']
+        self.batch_size = batch_size or Config.MCTS_SETTINGS['eval_batch_size']
+        self.virtual_loss = Config.MCTS_SETTINGS['virtual_loss']
+        self.evaluations = 0
+        self.batches = 0
+        self.collisions = 0
+
+    def select(self):
+        """Select a leaf node using PUCT, pushing its path onto the working board"""
+        node = self.root
+        while node.children:
+            node = max(node.children.values(), key=lambda child: child.puct(self.c_puct))
+            self.board.push(node.move)
+        return node
+
+    def expand(self, node, priors):
+        """Create every child of node at once, each with its policy prior"""
+        for move, prior in priors.items():
+            node.children[move] = Node(parent=node, move=move, prior=prior)
+        node.untried_moves = []
+
+    def terminal_result(self, node):
+        """
+        Score the working board, which is at node, if its game is over.
+
+        Returns:
+            float: Result in [0, 1] for the player who moved into node, or
+            None if the position needs a network evaluation
+        """
+        board = self.board
+        if board.is_checkmate():
+            return 1.0
+        if board.is_insufficient_material() or not any(board.generate_legal_moves()):
+            return 0.5
+        return None
+
+    def collect_leaves(self, limit):
+        """
+        Select up to limit leaves for one batch. Terminal leaves and leaves
+        found in the transposition table are expanded and backed up
+        immediately. Selection stops early when it returns to a leaf that is
+        already pending.
+
+        Returns:
+            list: (leaf, board, key) tuples waiting for evaluation, each leaf
+            under virtual loss with its own copy of the position
+        """
+        pending = []
+        pending_ids = set()
+        for _ in range(limit):
+            leaf = self.select()
+            if id(leaf) in pending_ids:
+                self.unwind()
+                self.collisions += 1
+                break
+
+            key = position_key(self.board)
+            result = self.terminal_result(leaf)
+            if result is None and self.transpositions is not None:
+                entry = self.transpositions.probe(key)
+                if entry is not None and entry[2] is not None:
+                    result = entry[0]
+                    self.expand(leaf, priors_from_table(self.board, entry[2]))
+            if result is not None:
+                self.unwind()
+                self.backpropagate(leaf, result)
+                self.iterations += 1
+                continue
+
+            self.add_virtual_loss(leaf, self.virtual_loss)
+            pending.append((leaf, self.board.copy(stack=False), key))
+            pending_ids.add(id(leaf))
+            self.unwind()
+        return pending
+
+    def evaluate_leaves(self, leaves):
+        """Evaluate leaves in one network call, then expand and back them up"""
+        results = self.evaluator.evaluate_batch([board for _, board, _ in leaves])
+        self.evaluations += len(leaves)
+        self.batches += 1
+
+        for (leaf, _, key), (priors, value) in zip(leaves, results):
+            self.add_virtual_loss(leaf, -self.virtual_loss)
+            self.expand(leaf, priors)
+            # value is for the side to move at leaf, i.e. the opponent of its mover
+            result = (1.0 - value) / 2.0
+            if self.transpositions is not None:
+                indices = np.fromiter((move_to_index(move) for move in priors), dtype=np.int64,
+                                      count=len(priors))
+                values = np.fromiter(priors.values(), dtype=np.float32, count=len(priors))
+                self.transpositions.store(key, result, priors=(indices, values))
+            self.backpropagate(leaf, result)
+            self.iterations += 1
+            self.simulations += 1
+
+    def get_best_move(self, time_limit=None):
+        """
+        Run PUCT search and return the best move.
+
+        Args:
+            time_limit (float, optional): Wall-clock budget in seconds
+
+        Returns:
+            chess.Move: Most visited move at the root
+        """
+        start = time.monotonic()
+        deadline = start + time_limit if time_limit is not None else None
+        self.iterations = 0
+        self.simulations = 0
+        self.evaluations = 0
+        self.batches = 0
+        self.collisions = 0
+
+        while self.iterations < self.max_iterations:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+            leaves = self.collect_leaves(min(self.batch_size,
+                                             self.max_iterations - self.iterations))
+            if leaves:
+                self.evaluate_leaves(leaves)
+
+        self.elapsed = time.monotonic() - start
+
+        if not self.root.children:
+            return random.choice(list(self.board.legal_moves))
+        return max(self.root.children.items(), key=lambda x: x[1].visits)[0]
+
+    def search_stats(self):
+        """Summary of the last search for logging and time tuning"""
+        stats = super().search_stats()
+        stats['evaluations'] = self.evaluations
+        stats['batches'] = self.batches
+        stats['collisions'] = self.collisions
+        stats['evaluations_per_second'] = (self.evaluations / self.elapsed
+                                           if self.elapsed > 0 else 0.0)
+        return stats
@@ -0,0 +1,277 @@
+"""
+Parallel Monte Carlo Tree Search over a process pool.
+
+Root parallelism runs independent trees in worker processes and merges
+their root statistics. Tree parallelism keeps one tree in the calling
+process and farms rollouts out to the workers, using virtual loss so that
+concurrent selections spread over different branches.
+"""
+
+import atexit
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+from src.mcts import MCTS
+from src.rollout import rollout
+from src.array_mcts import ArrayMCTS
+from src.chess_ai.config import Config
+from src.transposition import position_key
+
+_pool = None
+_pool_workers = 0
+
+def _seed_worker():
+    # Forked workers inherit the parent's RNG state; reseed from the OS
+    random.seed()
+    np.random.seed()
+
+def get_pool(num_workers):
+    """
+    Process pool shared by all parallel searches in this process.
+
+    Args:
+        num_workers (int): Number of worker processes
+
+    Returns:
+        ProcessPoolExecutor: Pool with num_workers processes
+    """
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != num_workers:
+        shutdown_pool()
+        _pool = ProcessPoolExecutor(max_workers=num_workers, initializer=_seed_worker)
+        _pool_workers = num_workers
+    return _pool
+
+def shutdown_pool():
+    """Stop the shared worker processes"""
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+atexit.register(shutdown_pool)
+
+def _search_worker(board, time_limit, max_iterations, seed):
+    """Run one independent search and return its root statistics"""
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    if Config.MCTS_SETTINGS['tree_type'] == 'array':
+        search = ArrayMCTS(board, max_iterations=max_iterations)
+    else:
+        search = MCTS(board, max_iterations=max_iterations)
+    best_move = search.get_best_move(time_limit=time_limit)
+    stats = search.search_stats()
+    stats['worker'] = os.getpid()
+    return best_move, search.root_statistics(), stats
+
+def _rollout_worker(policy, board):
+    """Run one rollout; returns (result, worker process id)"""
+    return policy(board), os.getpid()
+
+def merge_root_statistics(results, merge_policy='visits'):
+    """
+    Combine root statistics from independent searches.
+
+    Args:
+        results (list): (best_move, root_statistics, search_stats) per worker
+        merge_policy (str): 'visits' picks the move with the most visits
+            summed over all trees, 'vote' picks the move most workers chose
+            and breaks ties by summed visits
+
+    Returns:
+        chess.Move: Selected move, or None if no tree expanded the root
+    """
+    visits = Counter()
+    for _, statistics, _ in results:
+        for move, (move_visits, _) in statistics.items():
+            visits[move] += move_visits
+    if not visits:
+        return None
+
+    if merge_policy == 'vote':
+        votes = Counter(best_move for best_move, _, _ in results)
+        return max(votes, key=lambda move: (votes[move], visits[move]))
+    if merge_policy != 'visits':
+        raise ValueError(f"Unknown merge policy: {merge_policy}")
+    return max(visits, key=visits.get)
+
+class RootParallelMCTS:
+    """
+    Root-parallel search: num_workers independent trees, merged at the root.
+
+    Attributes:
+        board (chess.Board): Position to search
+        num_workers (int): Number of trees searched in parallel
+        merge_policy (str): How root statistics are combined
+        max_iterations (int): Upper bound on iterations per worker tree
+        iterations (int): Iterations completed by all workers in the last search
+        simulations (int): Simulations run by all workers in the last search
+        elapsed (float): Wall-clock seconds spent in the last search
+    """
+    def __init__(self, board, max_iterations=None, num_workers=None, merge_policy=None, seed=None):
+        self.board = board.copy(stack=False)
+        self.num_workers = num_workers or Config.MCTS_SETTINGS['num_workers']
+        self.merge_policy = merge_policy or Config.MCTS_SETTINGS['merge_policy']
+        self.max_iterations = max_iterations or Config.MCTS_SETTINGS['max_iterations']
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.iterations = 0
+        self.simulations = 0
+        self.elapsed = 0.0
+        self.root_visits = 0
+        self.workers_used = 0
+
+    def get_best_move(self, time_limit=None):
+        """
+        Search in all workers and return the merged best move.
+
+        Args:
+            time_limit (float, optional): Wall-clock budget in seconds
+
+        Returns:
+            chess.Move: Selected move
+        """
+        start = time.monotonic()
+        pool = get_pool(self.num_workers)
+        futures = [pool.submit(_search_worker, self.board, time_limit,
+                               self.max_iterations, self.seed + i)
+                   for i in range(self.num_workers)]
+        results = [future.result() for future in futures]
+
+        self.iterations = sum(stats['iterations'] for _, _, stats in results)
+        self.simulations = sum(stats['simulations'] for _, _, stats in results)
+        self.root_visits = sum(stats['root_visits'] for _, _, stats in results)
+        self.workers_used = len({stats['worker'] for _, _, stats in results})
+        self.elapsed = time.monotonic() - start
+
+        move = merge_root_statistics(results, self.merge_policy)
+        if move is None:
+            return random.choice(list(self.board.legal_moves))
+        return move
+
+    def reroot(self, board):
+        """Worker trees live in other processes and are not kept between moves"""
+        return False
+
+    def search_stats(self):
+        """Summary of the last search for logging and time tuning"""
+        return {
+            'iterations': self.iterations,
+            'simulations': self.simulations,
+            'elapsed': self.elapsed,
+            'simulations_per_second': (self.simulations / self.elapsed
+                                       if self.elapsed > 0 else 0.0),
+            'root_visits': self.root_visits,
+            'workers': self.num_workers,
+            'workers_used': self.workers_used,
+        }
+
+class TreeParallelMCTS(MCTS):
+    """
+    Tree-parallel search: one shared tree, rollouts run in worker processes.
+
+    Up to num_workers leaves are in flight at once. Every in-flight path
+    carries a virtual loss (extra visits with no wins) so the next
+    selection is steered away from it until its result comes back.
+
+    Attributes:
+        num_workers (int): Maximum number of rollouts in flight
+        virtual_loss (float): Visits added to each node on an in-flight path
+        rollout_time (float): Running estimate of a rollout's round trip
+            in seconds
+        workers_used (int): Worker processes that ran rollouts in the last
+            search
+    """
+    def __init__(self, board, max_iterations=None, num_workers=None, virtual_loss=None,
+                 transpositions=None, rollout_policy=None):
+        super().__init__(board, max_iterations=max_iterations, transpositions=transpositions,
+                         rollout_policy=rollout_policy)
+        self.num_workers = num_workers or Config.MCTS_SETTINGS['num_workers']
+        self.virtual_loss = (virtual_loss if virtual_loss is not None
+                             else Config.MCTS_SETTINGS['virtual_loss'])
+        self.rollout_time = 0.0
+        self.workers_used = 0
+
+    def get_best_move(self, time_limit=None):
+        """
+        Run the shared-tree search and return the best move.
+
+        A running rollout cannot be cancelled, so none is left behind to
+        occupy the shared pool during the next move: a rollout is only
+        started if it is expected to return before the deadline, and the
+        search waits for the ones in flight (at most num_workers).
+
+        Args:
+            time_limit (float, optional): Wall-clock budget in seconds
+
+        Returns:
+            chess.Move: Most visited move at the root
+        """
+        start = time.monotonic()
+        deadline = start + time_limit if time_limit is not None else None
+        pool = get_pool(self.num_workers)
+        pending = {}
+        started = 0
+        workers = set()
+        self.iterations = 0
+        self.simulations = 0
+
+        while True:
+            can_start = deadline is None or time.monotonic() + self.rollout_time < deadline
+            while (can_start and len(pending) < self.num_workers
+                   and started < self.max_iterations):
+                leaf = self.select()
+                child = leaf.expand(self.board)
+                if child is not None:
+                    leaf = child
+                started += 1
+
+                key = None
+                if self.transpositions is not None:
+                    # The rollout runs in a worker; its result is stored when it arrives
+                    key = position_key(self.board)
+                    value = self.transpositions.settled_value(key, self.tt_samples)
+                    if value is not None:
+                        self.unwind()
+                        self.backpropagate(leaf, value)
+                        self.iterations += 1
+                        continue
+
+                self.add_virtual_loss(leaf, self.virtual_loss)
+                future = pool.submit(_rollout_worker, self.rollout_policy or rollout,
+                                     self.board.copy(stack=False))
+                self.unwind()
+                pending[future] = (leaf, key, time.monotonic())
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                leaf, key, submitted = pending.pop(future)
+                result, worker = future.result()
+                workers.add(worker)
+                self.rollout_time = 0.8 * self.rollout_time + 0.2 * (time.monotonic() - submitted)
+                if key is not None:
+                    self.transpositions.store(key, result)
+                self.add_virtual_loss(leaf, -self.virtual_loss)
+                self.backpropagate(leaf, result)
+                self.iterations += 1
+                self.simulations += 1
+
+        self.workers_used = len(workers)
+        self.elapsed = time.monotonic() - start
+
+        if not self.root.children:
+            return random.choice(list(self.board.legal_moves))
+        return max(self.root.children.items(), key=lambda x: x[1].visits)[0]
+
+    def search_stats(self):
+        """Summary of the last search for logging and time tuning"""
+        stats = super().search_stats()
+        stats['workers'] = self.num_workers
+        stats['workers_used'] = self.workers_used
+        return stats
@@ -0,0 +1,165 @@
+"""
+Rollout policies for MCTS simulations.
+A rollout plays moves from a leaf until the game ends, a depth limit is
+reached or the material balance is decisive, then scores the position.
+Moves are drawn from pseudo-legal generation and only the chosen move is
+checked for legality, the board is updated with push/pop and terminal
+conditions are checked only when they can have changed.
+"""
+
+import math
+import random
+import chess
+from evaluation import IncrementalEvaluator, PIECE_VALUES
+from src.chess_ai.config import Config
+
+def result_from_score(score, mover):
+    """
+    Map a centipawn score from white's point of view to a result in [0, 1]
+    for mover.
+    """
+    white_result = 1.0 / (1.0 + math.exp(-score / 100))  # Sigmoid normalization
+    return white_result if mover == chess.WHITE else 1.0 - white_result
+
+class RolloutPolicy:
+    """
+    Plays and scores one simulation per call.
+
+    Results are from the point of view of the player who made the last move
+    into the starting position, the convention MCTS nodes store their wins
+    in.
+
+    Attributes:
+        max_depth (int): Maximum number of moves played
+        policy (str): 'uniform' picks legal moves with equal probability,
+            'heavy' favours captures, promotions and (optionally) checks
+        capture_weight (float): Extra weight of a capture per pawn of
+            captured material, used by the heavy policy
+        check_weight (float): Extra weight of a checking move, used by the
+            heavy policy; 0 skips the gives_check test
+        cutoff (int): Stop once the material balance reaches this many
+            centipawns either way; 0 disables the cutoff
+        rng (random.Random): Source of randomness, the random module if None
+    """
+    def __init__(self, max_depth=None, policy=None, capture_weight=None, check_weight=None,
+                 cutoff=None, rng=None):
+        settings = Config.MCTS_SETTINGS
+        self.max_depth = max_depth if max_depth is not None else settings['max_depth']
+        self.policy = policy or settings['rollout_policy']
+        self.capture_weight = (capture_weight if capture_weight is not None
+                               else settings['rollout_capture_weight'])
+        self.check_weight = (check_weight if check_weight is not None
+                             else settings['rollout_check_weight'])
+        self.cutoff = cutoff if cutoff is not None else settings['rollout_cutoff']
+        self.rng = rng
+        if self.policy not in ('uniform', 'heavy'):
+            raise ValueError(f"Unknown rollout policy: {self.policy}")
+
+    def __call__(self, board):
+        """
+        Run a rollout from board. The board is returned to its starting
+        position afterwards.
+
+        Args:
+            board (chess.Board): Position to start from
+
+        Returns:
+            float: Result in [0, 1] for the player who moved into board
+        """
+        mover = not board.turn
+        tracker = IncrementalEvaluator(board)
+        depth = 0
+        result = None
+
+        while depth < self.max_depth:
+            move = self.choose_move(board)
+            if move is None:
+                # Checkmate or stalemate; board.turn is the side with no moves
+                if not board.is_check():
+                    result = 0.5
+                else:
+                    result = 1.0 if board.turn != mover else 0.0
+                break
+
+            changes_material = (move.promotion is not None or
+                                board.piece_type_at(move.to_square) is not None or
+                                board.is_en_passant(move))
+            tracker.push(move)
+            depth += 1
+
+            if board.halfmove_clock >= 100:
+                result = 0.5
+                break
+            if changes_material:
+                if board.is_insufficient_material():
+                    result = 0.5
+                    break
+                if self.cutoff and abs(tracker.material) >= self.cutoff:
+                    result = result_from_score(tracker.material + tracker.position, mover)
+                    break
+
+        if result is None:
+            result = result_from_score(tracker.evaluate(), mover)
+
+        for _ in range(depth):
+            tracker.pop()
+        return result
+
+    def choose_move(self, board):
+        """
+        Pick a legal move for the side to move.
+
+        Returns:
+            chess.Move: Chosen move, or None if there is no legal move
+        """
+        rng = self.rng or random
+        if board.is_check():
+            # Evasion generation is cheap and nearly always legal
+            moves = list(board.generate_legal_moves())
+            if not moves:
+                return None
+            if self.policy == 'uniform':
+                return rng.choice(moves)
+            return rng.choices(moves, [self.move_weight(board, move) for move in moves])[0]
+
+        moves = list(board.generate_pseudo_legal_moves())
+        weights = ([self.move_weight(board, move) for move in moves]
+                   if self.policy == 'heavy' else None)
+
+        # Draw until a legal move comes up, discarding illegal draws
+        while moves:
+            if weights is None:
+                index = rng.randrange(len(moves))
+            else:
+                index = rng.choices(range(len(moves)), weights)[0]
+            move = moves[index]
+            if not board.is_into_check(move):
+                return move
+            moves[index] = moves[-1]
+            moves.pop()
+            if weights is not None:
+                weights[index] = weights[-1]
+                weights.pop()
+        return None
+
+    def move_weight(self, board, move):
+        """Sampling weight of a move under the heavy policy"""
+        weight = 1.0
+        captured = board.piece_type_at(move.to_square)
+        if captured is None and board.is_en_passant(move):
+            captured = chess.PAWN
+        if captured is not None:
+            weight += self.capture_weight * PIECE_VALUES[captured] / PIECE_VALUES[chess.PAWN]
+        if move.promotion:
+            weight += self.capture_weight * (PIECE_VALUES[move.promotion] -
+                                             PIECE_VALUES[chess.PAWN]) / PIECE_VALUES[chess.PAWN]
+        if self.check_weight and board.gives_check(move):
+            weight += self.check_weight
+        return weight
+
+# Policy used by MCTS searches that are not given one
+default_policy = RolloutPolicy()
+
+def rollout(board):
+    """Run one rollout from board with the default policy"""
+    return default_policy(board)
@@ -0,0 +1,197 @@
+"""
+Transposition table for MCTS.
+Positions are keyed by their Zobrist hash so that a position reached
+through different move orders is evaluated once.
+"""
+
+import chess.polyglot
+import numpy as np
+
+def position_key(board):
+    """Zobrist hash of a position (pieces, side to move, castling, en passant)"""
+    return chess.polyglot.zobrist_hash(board)
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of position evaluations.
+
+    Each slot holds the full key, a running sum of results, a visit count,
+    the search generation that last wrote it and, for network evaluations,
+    the prior_moves highest policy priors as (policy index, probability)
+    pairs. Memory is fixed: the result arrays at construction, the prior
+    arrays (size * prior_moves * 4 bytes) when the first priors are stored.
+
+    Replacement policy: a slot is overwritten when it is empty, was written
+    by an older search, or holds no more visits than the incoming entry.
+    Otherwise the incoming entry is dropped, which keeps well-explored
+    positions from the current search.
+
+    Attributes:
+        size (int): Number of slots (rounded up to a power of two)
+        prior_moves (int): Priors kept per position
+        hits (int): Successful probes
+        misses (int): Failed probes
+        stores (int): Entries written or accumulated
+        replacements (int): Occupied slots overwritten by a different position
+        rejected (int): Stores dropped by the replacement policy
+    """
+    def __init__(self, size, prior_moves=32):
+        self.size = 1 << max(int(size) - 1, 0).bit_length()
+        self._mask = self.size - 1
+        self.keys = np.zeros(self.size, dtype=np.uint64)
+        self.value_sum = np.zeros(self.size, dtype=np.float32)
+        self.visits = np.zeros(self.size, dtype=np.int32)
+        self.generation = np.zeros(self.size, dtype=np.uint8)
+        self.prior_moves = prior_moves
+        self.prior_indices = None  # (size, prior_moves) uint16, allocated on first use
+        self.prior_values = None  # (size, prior_moves) float16; 0 marks an unused pair
+        self.has_priors = np.zeros(self.size, dtype=bool)
+        self.current_generation = 1
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.replacements = 0
+        self.rejected = 0
+
+    def new_search(self):
+        """Age existing entries so the next search may replace them"""
+        self.current_generation = self.current_generation % 255 + 1
+
+    def probe(self, key):
+        """
+        Look up a position.
+
+        Args:
+            key (int): Zobrist hash from position_key
+
+        Returns:
+            tuple: (mean value, visits, priors), or None if not stored;
+            priors is (policy indices, probabilities) or None
+        """
+        slot = key & self._mask
+        visits = int(self.visits[slot])
+        if visits == 0 or int(self.keys[slot]) != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        priors = None
+        if self.has_priors[slot]:
+            used = self.prior_values[slot] > 0
+            priors = (self.prior_indices[slot][used].astype(np.int64),
+                      self.prior_values[slot][used].astype(np.float32))
+        return float(self.value_sum[slot]) / visits, visits, priors
+
+    def settled_value(self, key, min_samples):
+        """
+        Mean result of a position evaluated by noisy samples (rollouts),
+        once its entry averages at least min_samples of them.
+
+        Returns:
+            float: Mean result, or None if the position needs another sample
+        """
+        entry = self.probe(key)
+        if entry is None or entry[1] < min_samples:
+            return None
+        return entry[0]
+
+    def sample(self, key, simulate, min_samples):
+        """
+        Result for a position evaluated by noisy samples: the settled mean
+        (see settled_value), or a new sample from simulate, which is
+        averaged into the entry.
+
+        Args:
+            key (int): Zobrist hash from position_key
+            simulate (callable): Returns one sampled result
+            min_samples (int): Samples averaged before the mean is reused
+
+        Returns:
+            tuple: (result, whether simulate was called)
+        """
+        value = self.settled_value(key, min_samples)
+        if value is not None:
+            return value, False
+        result = simulate()
+        self.store(key, result)
+        return result, True
+
+    def store(self, key, value, visits=1, priors=None):
+        """
+        Record an evaluation. Results for a position already in its slot
+        are accumulated.
+
+        Args:
+            key (int): Zobrist hash from position_key
+            value (float): Result to add to the running sum
+            visits (int): Number of results value represents
+            priors (tuple, optional): (policy indices, probabilities) of the
+                legal moves; the prior_moves highest are kept (existing
+                priors are kept if None)
+
+        Returns:
+            bool: False if the replacement policy dropped the entry
+        """
+        slot = key & self._mask
+        old_visits = int(self.visits[slot])
+        if old_visits and int(self.keys[slot]) == key:
+            self.value_sum[slot] += value
+            self.visits[slot] = old_visits + visits
+            self.generation[slot] = self.current_generation
+            if priors is not None:
+                self._store_priors(slot, priors)
+            self.stores += 1
+            return True
+
+        if (old_visits and self.generation[slot] == self.current_generation
+                and old_visits > visits):
+            self.rejected += 1
+            return False
+
+        if old_visits:
+            self.replacements += 1
+        self.keys[slot] = key
+        self.value_sum[slot] = value
+        self.visits[slot] = visits
+        self.generation[slot] = self.current_generation
+        self.has_priors[slot] = False
+        if priors is not None:
+            self._store_priors(slot, priors)
+        self.stores += 1
+        return True
+
+    def _store_priors(self, slot, priors):
+        indices, values = (np.asarray(array) for array in priors)
+        if self.prior_indices is None:
+            self.prior_indices = np.zeros((self.size, self.prior_moves), dtype=np.uint16)
+            self.prior_values = np.zeros((self.size, self.prior_moves), dtype=np.float16)
+        top = np.argsort(values)[::-1][:self.prior_moves]
+        self.prior_indices[slot] = 0
+        self.prior_values[slot] = 0
+        self.prior_indices[slot, :len(top)] = indices[top]
+        self.prior_values[slot, :len(top)] = values[top]
+        self.has_priors[slot] = True
+
+    def clear(self):
+        """Remove all entries and reset the counters"""
+        self.visits[:] = 0
+        self.has_priors[:] = False
+        self.hits = self.misses = self.stores = self.replacements = self.rejected = 0
+
+    @property
+    def hit_rate(self):
+        """Fraction of probes that found their position"""
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def stats(self):
+        """Counters for sizing the table"""
+        return {
+            'size': self.size,
+            'used': int(np.count_nonzero(self.visits)),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'stores': self.stores,
+            'replacements': self.replacements,
+            'rejected': self.rejected,
+        }
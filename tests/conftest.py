@@ -0,0 +1,83 @@
+"""Helpers shared by the test modules"""
+
+import random
+import time
+import chess
+import numpy as np
+import pytest
+from evaluation import PIECE_VALUES, PAWN_TABLE
+from src.chess_ai.config import Config
+from src.chess_ai.position_encoding import encode_position
+
+class UniformEvaluator:
+    """Stand-in for RLTrainer: uniform priors and a neutral value"""
+    def evaluate_batch(self, boards):
+        results = []
+        for board in boards:
+            legal_moves = list(board.legal_moves)
+            results.append(({move: 1.0 / len(legal_moves) for move in legal_moves}, 0.0))
+        return results
+
+def random_positions(num_games=5, seed=0):
+    """Positions from random games, including their final positions"""
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(num_games):
+        board = chess.Board()
+        while not board.is_game_over():
+            positions.append(board.copy())
+            board.push(rng.choice(list(board.legal_moves)))
+        positions.append(board.copy())
+    return positions
+
+def reference_evaluate_position(board):
+    """Square-by-square evaluation the bitboard path must reproduce exactly"""
+    if board.is_checkmate():
+        return -10000 if board.turn else 10000
+    if board.is_stalemate() or board.is_insufficient_material():
+        return 0
+    
+    features = encode_position(board)
+    material_score = 0
+    position_score = 0
+    for square in chess.SQUARES:
+        piece = board.piece_at(square)
+        if piece is None:
+            continue
+        sign = 1 if piece.color == chess.WHITE else -1
+        material_score += sign * PIECE_VALUES[piece.piece_type]
+        if piece.piece_type == chess.PAWN:
+            position_score += sign * PAWN_TABLE[square if piece.color else 63 - square]
+    
+    mobility_score = np.sum(features[:,:,-1]) * 0.1
+    attack_score = (np.sum(features[:,:,-3]) - np.sum(features[:,:,-2])) * 5
+    return material_score + position_score + mobility_score + attack_score
+
+def game_samples(num_games=1):
+    """Positions, the move played in each and alternating values"""
+    positions = random_positions(num_games=num_games)
+    boards, moves, values = [], [], []
+    for board, next_board in zip(positions, positions[1:]):
+        if next_board.move_stack and len(next_board.move_stack) == len(board.move_stack) + 1:
+            boards.append(board)
+            moves.append(next_board.move_stack[-1])
+            values.append(1.0 if board.turn else -1.0)
+    return boards, moves, values
+
+def positions_per_second(forward, positions, duration=1.0):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        forward(positions)
+        count += len(positions)
+    return count / (time.perf_counter() - start)
+
+@pytest.fixture
+def training_paths(tmp_path, monkeypatch):
+    """Point the replay buffers and the label store at tmp_path"""
+    paths = dict(Config.PATHS,
+                 replay_buffer=str(tmp_path / 'replay' / 'self_play'),
+                 stockfish_buffer=str(tmp_path / 'replay' / 'stockfish'),
+                 label_store=str(tmp_path / 'cache' / 'labels.sqlite'))
+    monkeypatch.setattr(Config, 'PATHS', paths)
+    return paths
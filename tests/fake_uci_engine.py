@@ -0,0 +1,60 @@
+"""
+Minimal UCI engine for tests: plays the first legal move and scores
+positions by material for the side to move. Set FAKE_ENGINE_DELAY to
+make every search take that many seconds.
+"""
+
+import os
+import sys
+import time
+import chess
+
+PIECE_VALUES = {chess.PAWN: 100, chess.KNIGHT: 300, chess.BISHOP: 300,
+                chess.ROOK: 500, chess.QUEEN: 900, chess.KING: 0}
+
+def parse_position(tokens):
+    if tokens[0] == 'startpos':
+        board = chess.Board()
+        rest = tokens[1:]
+    else:
+        board = chess.Board(' '.join(tokens[1:7]))
+        rest = tokens[7:]
+    if rest and rest[0] == 'moves':
+        for move in rest[1:]:
+            board.push_uci(move)
+    return board
+
+def material(board):
+    return sum(PIECE_VALUES[piece.piece_type] * (1 if piece.color == board.turn else -1)
+               for piece in board.piece_map().values())
+
+def main():
+    delay = float(os.environ.get('FAKE_ENGINE_DELAY', '0'))
+    board = chess.Board()
+    for line in sys.stdin:
+        tokens = line.split()
+        if not tokens:
+            continue
+        command = tokens[0]
+        if command == 'uci':
+            print('id name FakeEngine')
+            print('option name Threads type spin default 1 min 1 max 1')
+            print('uciok')
+        elif command == 'isready':
+            print('readyok')
+        elif command == 'position':
+            board = parse_position(tokens[1:])
+        elif command == 'go':
+            time.sleep(delay)
+            move = next(iter(board.legal_moves), None)
+            if move is None:
+                print('bestmove (none)')
+            else:
+                print(f'info depth 1 score cp {material(board)} pv {move.uci()}')
+                print(f'bestmove {move.uci()}')
+        elif command == 'quit':
+            break
+        sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import multiprocessing
+import os
+import pathlib
+import tempfile
+import torch
+from src.chess_ai import self_play
+from src.chess_ai.actor_learner import ActorLearnerPipeline, run_learner
+from src.chess_ai.config import Config
+from src.chess_ai.quantization import quantized_path
+from src.chess_ai.reinforcement import RLTrainer
+from src.chess_ai.replay_buffer import ReplayBuffer
+from tests.conftest import game_samples
+
+def test_learner_publishes_weights(tmp_path, monkeypatch):
+    monkeypatch.setitem(Config.INFERENCE_SETTINGS, 'quantize', 'static')
+    directory = str(tmp_path / "buffer")
+    weights_path = str(tmp_path / "published.pth")
+    ReplayBuffer(directory).append(*game_samples())
+
+    stats = run_learner(directory, weights_path, multiprocessing.Event(), batch_size=8,
+                        publish_interval=2, min_samples=1, max_steps=3)
+    print(f"Learner stats: {stats}")
+
+    assert stats['steps'] == 3 and stats['samples'] == 24
+    assert stats['version'] == 2, "Publishes after step 2 and once more when stopping"
+    assert RLTrainer().load_published_weights(weights_path) == 2
+    assert os.path.exists(quantized_path(weights_path)), "Actors load the int8 copy"
+
+def test_actor_reloads_published_weights(tmp_path):
+    weights_path = str(tmp_path / "published.pth")
+    self_play._init_worker(None, weights_path)
+    publisher = RLTrainer()
+    publisher.publish_weights(weights_path, 1)
+
+    self_play._reload_published_weights()
+    for name, tensor in publisher.model.state_dict().items():
+        assert torch.equal(self_play._worker_ai.rl_trainer.model.state_dict()[name], tensor)
+
+def test_actor_learner_pipeline(tmp_path):
+    pipeline = ActorLearnerPipeline(num_games=2, replay_buffer=ReplayBuffer(str(tmp_path / "buffer")),
+                                    weights_path=str(tmp_path / "published.pth"), num_workers=1)
+    assert pipeline.replay_buffer.directory == str(tmp_path / "buffer")
+    pipeline.self_play_trainer.random_move_rate = 1.0
+    stats = pipeline.run(batch_size=8, publish_interval=1, min_samples=1)
+    print(f"Pipeline stats: {stats}")
+
+    assert stats['games'] == 2 and stats['failed_games'] == 0
+    assert stats['games_per_hour'] > 0
+    assert stats['learner'] is not None, "The learner must report its final stats"
+
+if __name__ == "__main__":
+    import pytest
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_learner_publishes_weights(pathlib.Path(tempfile.mkdtemp()), monkeypatch)
+    test_actor_learner_pipeline(pathlib.Path(tempfile.mkdtemp()))
@@ -1,5 +1,6 @@
 import chess
 from src.chess_ai.chess_ai import ModernChessAI
+from src.chess_ai.config import Config
 
 def test_ai_moves():
     """
@@ -35,7 +36,64 @@ def test_ai_components():
     assert rl_move in board.legal_moves, "RL should return a legal move"
     print("RL move:", rl_move)
 
+def test_ai_reuses_tree():
+    ai = ModernChessAI()
+    board = chess.Board()
+    board.push(ai.get_best_move(board, time_limit=0.5))
+    
+    # The reply is searched from the subtree under the move just played
+    best_move = ai.get_best_move(board, time_limit=0.5)
+    assert best_move in board.legal_moves
+    print("Reused visits:", ai.last_search_stats['reused_visits'])
+    assert ai.last_search_stats['reused_visits'] > 0
+    
+    # A position from a different game starts a fresh tree
+    board = chess.Board("8/8/8/4k3/4P3/4K3/8/8 w - - 0 1")
+    assert ai.get_best_move(board, time_limit=0.2) in board.legal_moves
+    assert ai.last_search_stats['reused_visits'] == 0
+
+def test_ai_uses_its_time_budget(monkeypatch):
+    """With a deadline the search runs until it, not until MCTS_MAX_ITERATIONS"""
+    monkeypatch.setitem(Config.MCTS_SETTINGS, 'max_iterations', 50)
+    monkeypatch.setitem(Config.MCTS_SETTINGS, 'parallel_mode', 'none')
+    ai = ModernChessAI(use_mcts=True, use_rl=False)
+    board = chess.Board("r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4")
+    budget = 1.0
+    move = ai.get_best_move(board, time_limit=budget)
+    stats = ai.last_search_stats
+    print(f"{stats['iterations']} iterations in {stats['elapsed']:.2f}s of {budget}s")
+
+    assert move in board.legal_moves
+    assert stats['iterations'] > 50
+    assert stats['elapsed'] > 0.8 * budget, "Most of the budget should be used"
+
+    # Without a time limit the iteration cap applies
+    ai.get_best_move(board, time_limit=None)
+    assert ai.last_search_stats['iterations'] <= 50
+
+def test_search_guidance(tmp_path, monkeypatch):
+    monkeypatch.setitem(Config.PATHS, 'model_save', str(tmp_path / "chess_model.pth"))
+    monkeypatch.setitem(Config.MCTS_SETTINGS, 'tree_type', 'array')
+    board = chess.Board()
+    
+    # Without a trained model the network would only mislead the search
+    ai = ModernChessAI(use_mcts=True, use_rl=True)
+    ai.get_best_move(board, time_limit=0.1)
+    assert ai.search_type == 'ArrayMCTS' and ai._rl_trainer is None
+    
+    monkeypatch.setitem(Config.MCTS_SETTINGS, 'guidance', 'network')
+    ai = ModernChessAI(use_mcts=True, use_rl=True)
+    ai.get_best_move(board, time_limit=0.1)
+    assert ai.search_type == 'NeuralMCTS'
+    
+    monkeypatch.setitem(Config.MCTS_SETTINGS, 'guidance', 'auto')
+    ai.rl_trainer.save_model()
+    ai = ModernChessAI(use_mcts=True, use_rl=True)
+    ai.get_best_move(board, time_limit=0.1)
+    assert ai.search_type == 'NeuralMCTS'
+
 if __name__ == "__main__":
     test_ai_moves()
     test_ai_components()
+    test_ai_reuses_tree()
     print("✅ All AI tests passed!") 
\ No newline at end of file
@@ -1,6 +1,7 @@
 import chess
 import time
 from src.chess_ai.chess_ai import ModernChessAI
+from src.mcts import MCTS
 
 def test_ai_speed():
     board = chess.Board()
@@ -20,5 +21,19 @@ def test_ai_speed():
         print(f"Time limit: {time_limit}s - Move found: {move} in {elapsed:.2f}s")
         assert elapsed <= time_limit * 1.2, f"Move took too long for {time_limit}s limit"
 
+
+def test_mcts_deadline():
+    board = chess.Board()
+    mcts = MCTS(board, max_iterations=10**6)
+
+    move = mcts.get_best_move(time_limit=0.3)
+    stats = mcts.search_stats()
+    print(f"MCTS stats: {stats}")
+
+    assert move in board.legal_moves, "MCTS must return a legal move"
+    assert stats['iterations'] > 0, "MCTS should complete at least one iteration"
+    assert stats['elapsed'] <= 0.3 * 1.2, "MCTS overran its time budget"
+
 if __name__ == "__main__":
     test_ai_speed()
+    test_mcts_deadline()
@@ -0,0 +1,55 @@
+import time
+import chess
+import numpy as np
+import torch
+from src.chess_ai.batch_encoding import encode_boards, empty_batch
+from tests.conftest import random_positions
+
+def reference_board_to_tensor(board):
+    """Square-by-square encoding the batch encoder must reproduce"""
+    tensor = np.zeros((8, 8, 15), dtype=np.float32)
+    piece_idx = {'P': 0, 'N': 1, 'B': 2, 'R': 3, 'Q': 4, 'K': 5}
+    for square in range(64):
+        piece = board.piece_at(square)
+        if piece:
+            rank, file = square // 8, square % 8
+            offset = 0 if piece.color else 6
+            tensor[rank, file, piece_idx[piece.symbol().upper()] + offset] = 1
+    tensor[:, :, 12] = float(board.turn)
+    tensor[:, :, 13] = float(board.has_kingside_castling_rights(True) or
+                             board.has_kingside_castling_rights(False))
+    tensor[:, :, 14] = float(board.has_queenside_castling_rights(True) or
+                             board.has_queenside_castling_rights(False))
+    return tensor
+
+def test_batch_encoding_matches_reference():
+    boards = random_positions(num_games=2)
+    expected = np.stack([reference_board_to_tensor(board) for board in boards])
+    
+    assert np.array_equal(encode_boards(boards), expected)
+    assert np.array_equal(encode_boards([board.fen() for board in boards]), expected)
+
+def test_batch_encoding_into_shared_buffer():
+    boards = [chess.Board(), chess.Board("8/8/8/4k3/4P3/4K3/8/8 b - - 0 1")]
+    buffer = empty_batch(len(boards), pin_memory=True)
+    tensor = torch.from_numpy(buffer)
+    
+    encode_boards(boards, out=buffer)
+    assert tensor.data_ptr() == buffer.ctypes.data, "Tensor should share the buffer"
+    assert tensor[0, 0, 4, 5].item() == 1.0  # White king on e1
+    assert tensor[1, :, :, 12].sum().item() == 0.0  # Black to move
+
+def test_batch_encoding_speed():
+    boards = random_positions(num_games=1)
+    
+    start = time.perf_counter()
+    np.stack([reference_board_to_tensor(board) for board in boards])
+    reference_rate = len(boards) / (time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    encode_boards(boards)
+    batch_rate = len(boards) / (time.perf_counter() - start)
+    
+    print(f"Per-board loop: {reference_rate:.0f} boards/s, "
+          f"batch encoder: {batch_rate:.0f} boards/s")
+    assert batch_rate > reference_rate
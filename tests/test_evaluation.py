@@ -1,5 +1,17 @@
+import random
 import chess
-from evaluation import evaluate_board
+from evaluation import (evaluate_board, evaluate_position, evaluate_center_control,
+                        EvaluationCache, IncrementalEvaluator)
+from tests.conftest import reference_evaluate_position, random_positions
+
+def reference_center_control(board):
+    score = 0
+    for square in [chess.E4, chess.E5, chess.D4, chess.D5]:
+        if board.is_attacked_by(chess.WHITE, square):
+            score += 10
+        if board.is_attacked_by(chess.BLACK, square):
+            score -= 10
+    return score
 
 def test_evaluate_board():
     board = chess.Board()
@@ -26,5 +38,53 @@ def test_evaluate_board():
 
     print("✅ `evaluate_board()` test passed!")
 
+def test_bitboard_evaluation_matches_reference():
+    for board in random_positions():
+        expected = reference_evaluate_position(board)
+        score = evaluate_position(board)
+        assert score == expected and type(score) == type(expected), board.fen()
+        assert evaluate_center_control(board) == reference_center_control(board), board.fen()
+
+def test_cached_evaluation_matches():
+    board = chess.Board()
+    board.push_san("e4")
+    assert evaluate_board(board) == evaluate_position(board)
+    assert evaluate_board(board) == evaluate_position(board), "Cached score must not change"
+
+def test_incremental_evaluation_matches():
+    rng = random.Random(1)
+    for _ in range(5):
+        board = chess.Board()
+        tracker = IncrementalEvaluator(board)
+        while not board.is_game_over():
+            tracker.push(rng.choice(list(board.legal_moves)))
+            assert tracker.evaluate() == evaluate_position(board), board.fen()
+        
+        start_fen = chess.Board().fen()
+        while board.move_stack:
+            tracker.pop()
+        assert board.fen() == start_fen
+        assert tracker.evaluate() == evaluate_position(board)
+
+def test_evaluation_cache_lru(tmp_path):
+    cache = EvaluationCache(capacity=2)
+    cache.put(1, 10.0)
+    cache.put(2, 20.0)
+    assert cache.get(1) == 10.0  # 1 is now most recently used
+    cache.put(3, 30.0)
+    
+    assert cache.get(2) is None, "Least recently used entry should be evicted"
+    assert cache.get(3) == 30.0
+    assert cache.stats()['hits'] == 2
+    assert cache.stats()['misses'] == 1
+    
+    path = str(tmp_path / "evaluation_cache.npz")
+    cache.save(path)
+    warm = EvaluationCache(capacity=10)
+    assert warm.load(path) == 2
+    assert warm.get(1) == 10.0 and warm.get(3) == 30.0
+
 if __name__ == "__main__":
     test_evaluate_board()
+    test_cached_evaluation_matches()
+    test_incremental_evaluation_matches()
@@ -0,0 +1,24 @@
+import time
+from evaluation import evaluate_position
+from tests.conftest import reference_evaluate_position, random_positions
+
+def test_evaluation_speed():
+    """Benchmark evaluations/sec of the bitboard path against the square-by-square one"""
+    positions = random_positions(num_games=2)
+
+    start = time.perf_counter()
+    for board in positions:
+        reference_evaluate_position(board)
+    reference_rate = len(positions) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for board in positions:
+        evaluate_position(board)
+    bitboard_rate = len(positions) / (time.perf_counter() - start)
+
+    print(f"Square-by-square: {reference_rate:.0f} evals/s")
+    print(f"Bitboards: {bitboard_rate:.0f} evals/s ({bitboard_rate / reference_rate:.1f}x)")
+    assert bitboard_rate > reference_rate
+
+if __name__ == "__main__":
+    test_evaluation_speed()
@@ -0,0 +1,45 @@
+import copy
+import chess
+import torch
+from src.chess_ai.inference import InferenceModel
+from src.chess_ai.reinforcement import ChessNet
+from src.chess_ai.batch_encoding import encode_boards
+from tests.conftest import positions_per_second
+
+def reference_forward(model, positions):
+    """ChessNet evaluation as it used to run: fp32 eager, a contiguous NCHW copy, no_grad"""
+    model.eval()
+    with torch.no_grad():
+        return model(positions.permute(0, 3, 1, 2).contiguous().permute(0, 2, 3, 1))
+
+def test_inference_speed():
+    """Benchmark per-position latency and batch throughput of each inference mode"""
+    torch.manual_seed(0)
+    board = chess.Board("r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4")
+    single = torch.from_numpy(encode_boards([board]))
+    batch = torch.from_numpy(encode_boards([board] * 64))
+    reference_model = ChessNet()
+
+    variants = {'reference': lambda positions: reference_forward(reference_model, positions)}
+    for name, bf16, compile in [('channels-last', False, False),
+                                ('channels-last + bf16', True, False),
+                                ('channels-last + compile', False, True)]:
+        inference = InferenceModel(copy.deepcopy(reference_model), channels_last=True,
+                                   bf16=bf16, compile=compile)
+        inference.warm_up((1, 64))
+        variants[name] = inference
+
+    expected_policy, expected_value = variants['reference'](batch)
+    for name, forward in variants.items():
+        policy, value = forward(batch)
+        tolerance = 5e-2 if 'bf16' in name else 1e-4
+        assert torch.allclose(policy, expected_policy, atol=tolerance), name
+        assert torch.allclose(value, expected_value, atol=tolerance), name
+
+        latency = 1000 / positions_per_second(forward, single)
+        throughput = positions_per_second(forward, batch)
+        print(f"{name}: {latency:.2f} ms/position at batch 1, "
+              f"{throughput:.0f} positions/s at batch 64")
+
+if __name__ == "__main__":
+    test_inference_speed()
@@ -0,0 +1,110 @@
+import os
+import sys
+import tempfile
+import time
+import chess
+import pytest
+from src.chess_ai.config import Config
+from src.chess_ai.label_store import LabelStore
+from src.chess_ai.labelling import EngineLabeller
+
+FAKE_ENGINE = [sys.executable, os.path.join(os.path.dirname(__file__), 'fake_uci_engine.py')]
+
+def test_engine_labeller():
+    boards = [chess.Board(),
+              chess.Board("4k3/8/8/8/8/8/8/3QK3 b - - 0 1"),
+              chess.Board("R5k1/5ppp/8/8/8/8/5PPP/6K1 b - - 1 1")]  # Checkmated
+    with EngineLabeller(FAKE_ENGINE, num_engines=2, depth=1) as labeller:
+        labels = labeller.label(boards)
+        # Engines are kept between calls
+        engines = list(labeller._engines)
+        labeller.label(boards[:1])
+        assert labeller._engines == engines
+
+    assert labels[0] == (next(iter(boards[0].legal_moves)), 0)
+    assert labels[1][1] == -900, "Scores are for the side to move"
+    assert labels[2] is None, "A position without moves cannot be labelled"
+    assert labeller.labelled == 3 and labeller.failed == 1
+
+def test_engine_labeller_restarts_dead_engine():
+    with EngineLabeller(FAKE_ENGINE, num_engines=1, depth=1) as labeller:
+        labeller.start()
+        labeller._engines[0].transport.kill()
+        labels = labeller.label([chess.Board(), chess.Board("4k3/8/8/8/8/8/8/3QK3 b - - 0 1")])
+        assert labels.count(None) <= 1
+        assert labeller.label([chess.Board()])[0] is not None, "A replacement engine must be started"
+
+def test_engine_labeller_drops_engines_that_cannot_restart():
+    restarts = []
+
+    async def fail_to_restart(engine):
+        restarts.append(engine)
+        raise RuntimeError("No labelling engines left")
+
+    boards = [chess.Board(), chess.Board("4k3/8/8/8/8/8/8/3QK3 b - - 0 1"), chess.Board()]
+    with EngineLabeller(FAKE_ENGINE, num_engines=1, depth=1) as labeller:
+        labeller.start()
+        labeller._engines[0].transport.kill()
+        labeller._replace_engine = fail_to_restart
+        with pytest.raises(RuntimeError, match="No labelling engines left"):
+            labeller.label(boards)
+        time.sleep(0.2)  # Let the other positions' tasks run
+        assert len(restarts) == 1, "A dead engine must not go back to the idle queue"
+
+def test_label_store_skips_known_positions():
+    boards = [chess.Board(), chess.Board(), chess.Board("4k3/8/8/8/8/8/8/3QK3 b - - 0 1")]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'labels.sqlite')
+        with LabelStore(path) as store, \
+                EngineLabeller(FAKE_ENGINE, num_engines=1, depth=2, store=store) as labeller:
+            labels = labeller.label(boards)
+            assert labeller.labelled == 2, "Repeated positions are labelled once"
+            assert labels[0] == labels[1]
+
+        # A later run only analyses what the store cannot answer
+        with LabelStore(path) as store:
+            assert len(store) == 2
+            assert store.get(boards[2], min_depth=3) is None, "Shallower labels are not enough"
+            with EngineLabeller(FAKE_ENGINE, num_engines=1, depth=2, store=store) as labeller:
+                assert labeller.label(boards) == labels
+                assert labeller.labelled == 0 and labeller.reused == 3
+                assert labeller._engines == [], "No engine is started when every label is stored"
+
+            export_path = os.path.join(directory, 'labels.npz')
+            assert store.export(export_path) == 2
+
+        with LabelStore(os.path.join(directory, 'copy.sqlite')) as copy:
+            assert copy.import_file(export_path) == 2
+            assert copy.get(boards[2], min_depth=2) == labels[2]
+
+def test_node_limited_labels_are_not_stored():
+    with tempfile.TemporaryDirectory() as directory:
+        with LabelStore(os.path.join(directory, 'labels.sqlite')) as store:
+            with EngineLabeller(FAKE_ENGINE, num_engines=1, nodes=100, store=store) as labeller:
+                assert labeller.store_depth is None
+                labeller.label([chess.Board()])
+                labeller.label([chess.Board()])
+                assert labeller.labelled == 2, "Node-limited labels are not reused"
+            assert len(store) == 0
+
+def test_pipeline_labels_twice(training_paths, monkeypatch):
+    """The label store stays open between training runs until the pipeline is closed"""
+    from train_ai import TrainingPipeline
+    monkeypatch.setitem(training_paths, 'stockfish', FAKE_ENGINE)
+    monkeypatch.setitem(Config.LABELLING_SETTINGS, 'num_engines', 1)
+    monkeypatch.setitem(Config.LABELLING_SETTINGS, 'use_store', True)
+
+    pipeline = TrainingPipeline()
+    try:
+        first = pipeline._generate_stockfish_data(num_positions=5)
+        second = pipeline._generate_stockfish_data(num_positions=5)
+        assert first['positions'] and second['positions']
+        assert pipeline.stockfish_engine.reused > 0, "Labels from the first run are reused"
+    finally:
+        pipeline.close()
+
+if __name__ == "__main__":
+    test_engine_labeller()
+    test_engine_labeller_restarts_dead_engine()
+    test_label_store_skips_known_positions()
+    test_node_limited_labels_are_not_stored()
@@ -0,0 +1,51 @@
+import os
+import random
+import sys
+import time
+import chess
+from src.chess_ai.labelling import EngineLabeller
+
+FAKE_ENGINE = [sys.executable, os.path.join(os.path.dirname(__file__), 'fake_uci_engine.py')]
+
+def random_positions(count):
+    random.seed(0)
+    positions = []
+    board = chess.Board()
+    while len(positions) < count:
+        if board.is_game_over():
+            board.reset()
+        positions.append(board.copy(stack=False))
+        board.push(random.choice(list(board.legal_moves)))
+    return positions
+
+def sequential_labels_per_second(boards):
+    """Labelling as TrainingPipeline used to do it: one engine, one position at a time"""
+    with EngineLabeller(FAKE_ENGINE, num_engines=1, depth=1) as labeller:
+        start = time.perf_counter()
+        for board in boards:
+            labeller.label([board])
+        return len(boards) / (time.perf_counter() - start)
+
+def test_labelling_speed():
+    """Benchmark positions/sec of one engine against a pool of four"""
+    # Searches that wait rather than compute, so the pool scales on a single core too
+    os.environ['FAKE_ENGINE_DELAY'] = '0.02'
+    try:
+        boards = random_positions(100)
+        sequential_rate = sequential_labels_per_second(boards)
+        rates = {}
+        for num_engines in (1, 4):
+            with EngineLabeller(FAKE_ENGINE, num_engines=num_engines, depth=1) as labeller:
+                labeller.label(boards)
+                rates[num_engines] = labeller.labels_per_second
+    finally:
+        del os.environ['FAKE_ENGINE_DELAY']
+
+    print(f"Sequential: {sequential_rate:.1f} positions/s")
+    for num_engines, rate in rates.items():
+        print(f"{num_engines} engine(s): {rate:.1f} positions/s ({rate / sequential_rate:.1f}x)")
+
+    assert rates[4] > 2 * rates[1]
+
+if __name__ == "__main__":
+    test_labelling_speed()
@@ -0,0 +1,98 @@
+import chess
+from src.mcts import MCTS
+from src.array_mcts import ArrayMCTS, pack_move, unpack_move
+from src.neural_mcts import NeuralMCTS
+from tests.conftest import UniformEvaluator
+
+def test_pack_move_roundtrip():
+    board = chess.Board("8/P7/8/8/8/8/8/k6K w - - 0 1")
+    for move in board.legal_moves:
+        assert unpack_move(pack_move(move)) == move
+
+def test_array_mcts_move():
+    board = chess.Board("r1bqkb1r/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 2 4")
+    mcts = ArrayMCTS(board, max_iterations=200)
+    move = mcts.get_best_move()
+    stats = mcts.search_stats()
+    print(f"ArrayMCTS stats: {stats}")
+
+    assert move in board.legal_moves, "ArrayMCTS must return a legal move"
+    assert stats['iterations'] == 200
+    assert mcts.nodes.visits[0] == 200, "Root should be visited once per iteration"
+
+def test_array_mcts_memory_bound():
+    board = chess.Board()
+    mcts = ArrayMCTS(board, max_iterations=100, max_nodes=50)
+    move = mcts.get_best_move()
+
+    assert move in board.legal_moves
+    assert mcts.nodes.size <= 50, "Tree must not grow past max_nodes"
+
+def test_reroot_keeps_subtree():
+    board = chess.Board()
+    for search in (MCTS(board, max_iterations=300), ArrayMCTS(board, max_iterations=300)):
+        our_move = search.get_best_move()
+        game = board.copy()
+        
+        # Each new root keeps the visits of the child it came from
+        for move in (our_move, None):
+            statistics = search.root_statistics()
+            move = move or max(statistics, key=lambda m: statistics[m][0])
+            game.push(move)
+            assert search.reroot(game), "Tree should re-root at a position further down the game"
+            assert search.search_stats()['root_visits'] == statistics[move][0] > 0
+        assert search.get_best_move() in game.legal_moves
+
+def test_reroot_rejects_unrelated_position():
+    board = chess.Board()
+    other = chess.Board("8/8/8/4k3/4P3/4K3/8/8 w - - 0 1")
+    for search in (MCTS(board, max_iterations=20), ArrayMCTS(board, max_iterations=20)):
+        search.get_best_move()
+        assert not search.reroot(other)
+
+def test_array_reroot_matches_child_visits():
+    board = chess.Board()
+    search = ArrayMCTS(board, max_iterations=400)
+    move = search.get_best_move()
+    child = search.find_child(0, move)
+    child_visits = int(search.nodes.visits[child])
+    
+    game = board.copy()
+    game.push(move)
+    assert search.reroot(game)
+    assert search.nodes.visits[0] == child_visits
+    assert search.nodes.parent[0] == -1
+
+def test_neural_mcts_finds_mate_in_one():
+    board = chess.Board("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+    search = NeuralMCTS(board, UniformEvaluator(), max_iterations=200)
+    assert search.get_best_move() == chess.Move.from_uci("a1a8")
+    assert search.search_stats()['evaluations'] > 0
+
+def test_neural_mcts_follows_priors():
+    board = chess.Board()
+    preferred = chess.Move.from_uci("g1f3")
+    
+    class PreferringEvaluator:
+        def evaluate_batch(self, boards):
+            results = []
+            for board in boards:
+                priors = {move: 0.01 for move in board.legal_moves}
+                if preferred in priors:
+                    priors[preferred] = 1.0
+                results.append((priors, 0.0))
+            return results
+    
+    search = NeuralMCTS(board, PreferringEvaluator(), max_iterations=50, batch_size=1)
+    assert search.get_best_move() == preferred
+
+def test_neural_mcts_batches_leaves():
+    board = chess.Board()
+    search = NeuralMCTS(board, UniformEvaluator(), max_iterations=64, batch_size=8)
+    assert search.get_best_move() in board.legal_moves
+    
+    stats = search.search_stats()
+    assert stats['iterations'] == 64
+    assert stats['batches'] < stats['evaluations'], "Leaves should share network calls"
+    # Virtual loss must be fully removed after the batch is backed up
+    assert search.root.visits == 64
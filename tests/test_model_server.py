@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+import threading
+import chess
+import numpy as np
+from src.chess_ai.chess_ai import ModernChessAI
+from src.chess_ai.config import Config
+from src.chess_ai.model_client import ModelClient
+from src.chess_ai.model_server import ModelServer
+from src.chess_ai.reinforcement import RLTrainer
+from src.chess_ai.self_play import SelfPlayTrainer
+
+BOARDS = [chess.Board(),
+          chess.Board("r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"),
+          chess.Board("7k/5QQ1/8/8/8/8/8/K7 b - - 0 1")]  # Stalemate: no priors
+
+def short_socket_path(tmp_path):
+    # Unix socket paths are limited to about 100 characters
+    return os.path.join('/tmp', f'chess_ai_test_{os.getpid()}_{tmp_path.name}.sock')
+
+def test_client_matches_local_evaluation(tmp_path):
+    trainer = RLTrainer()
+    path = short_socket_path(tmp_path)
+    with ModelServer(path, trainer=trainer, max_batch=8, max_wait=0.001) as server, \
+            ModelClient(path) as client:
+        results = client.evaluate_batch(BOARDS)
+        expected = trainer.evaluate_batch(BOARDS)
+        for (priors, value), (expected_priors, expected_value) in zip(results, expected):
+            assert list(priors) == list(expected_priors)
+            assert np.allclose(list(priors.values()), list(expected_priors.values()), atol=1e-6)
+            assert abs(value - expected_value) < 1e-5
+        assert results[2][0] == {}
+        assert server.stats()['positions'] == len(BOARDS)
+
+def test_server_batches_concurrent_clients(tmp_path):
+    path = short_socket_path(tmp_path)
+    with ModelServer(path, trainer=RLTrainer(), max_batch=64, max_wait=0.02) as server:
+        def play(index):
+            with ModelClient(path) as client:
+                for _ in range(5):
+                    client.evaluate(BOARDS[index % 2])
+        threads = [threading.Thread(target=play, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = server.stats()
+    print(f"Model server: {stats}")
+    assert stats['requests'] == 40
+    assert stats['mean_batch_size'] > 1, "Requests from different clients should share batches"
+
+def test_client_reconnects_after_server_restart(tmp_path):
+    path = short_socket_path(tmp_path)
+    trainer = RLTrainer()
+    client = ModelClient(path)
+    with ModelServer(path, trainer=trainer):
+        client.evaluate(BOARDS[0])
+    with ModelServer(path, trainer=trainer):
+        priors, _ = client.evaluate(BOARDS[0])
+    client.close()
+    assert len(priors) == 20
+
+def test_ai_uses_model_server_without_torch(tmp_path, monkeypatch):
+    path = short_socket_path(tmp_path)
+    monkeypatch.setitem(Config.MODEL_SERVER_SETTINGS, 'enabled', True)
+    monkeypatch.setitem(Config.MODEL_SERVER_SETTINGS, 'socket', path)
+    with ModelServer(path, trainer=RLTrainer()):
+        ai = ModernChessAI(use_mcts=True, use_rl=True)
+        move = ai.get_best_move(BOARDS[1], time_limit=0.3)
+        assert move in BOARDS[1].legal_moves
+        assert isinstance(ai.evaluator, ModelClient) and ai._rl_trainer is None
+
+        # A client process never imports torch, even once it evaluates
+        code = ("import sys, chess; from src.chess_ai.chess_ai import ModernChessAI; "
+                "ModernChessAI(use_mcts=True, use_rl=True).evaluator.evaluate(chess.Board()); "
+                "assert 'torch' not in sys.modules")
+        env = dict(os.environ, MODEL_SERVER='true', MODEL_SERVER_SOCKET=path, PYTHONPATH='.')
+        subprocess.run([sys.executable, '-c', code], check=True, env=env,
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def test_self_play_publishes_weights_to_server(tmp_path, monkeypatch):
+    path = short_socket_path(tmp_path)
+    weights_path = str(tmp_path / "published.pth")
+    monkeypatch.setitem(Config.MODEL_SERVER_SETTINGS, 'enabled', True)
+    monkeypatch.setitem(Config.MODEL_SERVER_SETTINGS, 'socket', path)
+    monkeypatch.setitem(Config.PATHS, 'published_model', weights_path)
+    trainer = SelfPlayTrainer(num_games=1, num_workers=1)
+    local = trainer.ai.rl_trainer
+    
+    with ModelServer(path, trainer=RLTrainer(), weights_path=weights_path) as server, \
+            ModelClient(path) as client:
+        trainer.publish_for_server()
+        assert abs(client.evaluate(BOARDS[1])[1] - local.evaluate(BOARDS[1])[1]) < 1e-5
+        
+        # Training changes the weights; the server picks up the next publish
+        local.train_step(BOARDS[:2], [chess.Move.from_uci("e2e4"), chess.Move.from_uci("e1g1")],
+                         [1.0, -1.0])
+        trainer._weights_changed = True
+        trainer.publish_for_server()
+        assert abs(client.evaluate(BOARDS[1])[1] - local.evaluate(BOARDS[1])[1]) < 1e-5
+        assert trainer.weights_version == 2
+
+if __name__ == "__main__":
+    import pathlib, tempfile
+    test_client_matches_local_evaluation(pathlib.Path(tempfile.mkdtemp()))
+    test_server_batches_concurrent_clients(pathlib.Path(tempfile.mkdtemp()))
+    test_client_reconnects_after_server_restart(pathlib.Path(tempfile.mkdtemp()))
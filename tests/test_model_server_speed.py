@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import chess
+from src.chess_ai.model_client import ModelClient
+from src.chess_ai.model_server import ModelServer
+from src.chess_ai.reinforcement import RLTrainer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOARD = chess.Board("r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4")
+
+def ai_process_memory(model_server, socket_path):
+    """Peak RSS in MB of a process whose ModernChessAI evaluates a position"""
+    # ru_maxrss would include the forking test process; VmHWM starts at exec
+    code = ("import chess; from src.chess_ai.chess_ai import ModernChessAI; "
+            "ModernChessAI(use_mcts=True, use_rl=True).evaluator.evaluate(chess.Board()); "
+            "print([line.split()[1] for line in open('/proc/self/status') "
+            "if line.startswith('VmHWM')][0])")
+    env = dict(os.environ, MODEL_SERVER=str(model_server).lower(),
+               MODEL_SERVER_SOCKET=socket_path, PYTHONPATH='.')
+    output = subprocess.run([sys.executable, '-c', code], check=True, env=env, cwd=ROOT,
+                            capture_output=True, text=True).stdout
+    return int(output.split()[-1]) / 1024
+
+def test_model_server_speed():
+    """Benchmark client memory and positions/sec of many clients sharing one server"""
+    socket_path = f'/tmp/chess_ai_speed_{os.getpid()}.sock'
+    num_clients, requests = 8, 20
+    trainer = RLTrainer()
+    trainer.evaluate(BOARD)  # Warm up
+
+    # Every game evaluating its own positions, one at a time
+    start = time.perf_counter()
+    for _ in range(num_clients * requests):
+        trainer.evaluate(BOARD)
+    local_rate = num_clients * requests / (time.perf_counter() - start)
+
+    with ModelServer(socket_path, trainer=trainer, max_batch=num_clients, max_wait=0.005) as server:
+        def play():
+            with ModelClient(socket_path) as client:
+                for _ in range(requests):
+                    client.evaluate(BOARD)
+        threads = [threading.Thread(target=play) for _ in range(num_clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        server_rate = num_clients * requests / (time.perf_counter() - start)
+        stats = server.stats()
+
+        # The AI loads its network, or connects, on its first evaluation
+        local_memory = ai_process_memory(False, socket_path)
+        client_memory = ai_process_memory(True, socket_path)
+    print(f"Local evaluation: {local_rate:.0f} positions/s")
+    print(f"Model server, {num_clients} clients: {server_rate:.0f} positions/s "
+          f"(mean batch {stats['mean_batch_size']:.1f})")
+    print(f"AI process memory: {local_memory:.0f} MB with its own model, "
+          f"{client_memory:.0f} MB as a model server client")
+
+    assert client_memory < local_memory / 2
+    assert stats['mean_batch_size'] > 1
+
+if __name__ == "__main__":
+    test_model_server_speed()
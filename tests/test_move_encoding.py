@@ -0,0 +1,63 @@
+import random
+import chess
+import numpy as np
+import torch
+from src.array_mcts import pack_move
+from src.chess_ai.inference import masked_policy
+from src.chess_ai.move_encoding import (POLICY_SIZE, index_to_move, legal_move_indices,
+                                        move_to_index, packed_to_indices)
+from src.chess_ai.reinforcement import RLTrainer
+
+def test_move_indices_are_unique_and_invertible():
+    random.seed(0)
+    positions = [chess.Board("8/P6k/8/8/8/8/p6K/8 w - - 0 1"),  # Promotions for both sides
+                 chess.Board("8/P6k/8/8/8/8/p6K/8 b - - 0 1")]
+    board = chess.Board()
+    while len(positions) < 300:
+        if board.is_game_over():
+            board.reset()
+        positions.append(board.copy(stack=False))
+        board.push(random.choice(list(board.legal_moves)))
+
+    for board in positions:
+        moves, indices = legal_move_indices(board)
+        assert len(set(indices.tolist())) == len(moves), board.fen()
+        assert ((indices >= 0) & (indices < POLICY_SIZE)).all()
+        assert [index_to_move(index, board) for index in indices] == moves
+        assert packed_to_indices([pack_move(move) for move in moves]).tolist() == indices.tolist()
+
+def test_underpromotions_have_their_own_indices():
+    board = chess.Board("1n5k/P7/8/8/8/8/8/7K w - - 0 1")
+    indices = {move.promotion: move_to_index(move) for move in board.legal_moves
+               if move.to_square == chess.A8}
+    assert len(set(indices.values())) == 4
+    capture = chess.Move(chess.A7, chess.B8, chess.KNIGHT)
+    assert move_to_index(capture) not in indices.values()
+
+def test_masked_policy_covers_only_legal_moves():
+    logits = torch.randn(3, POLICY_SIZE)
+    boards = [chess.Board(), chess.Board("7k/5QQ1/8/8/8/8/8/K7 b - - 0 1"),  # Stalemate
+              chess.Board("4k3/8/8/8/8/8/8/R3K3 b - - 0 1")]
+    indices = [legal_move_indices(board)[1] for board in boards]
+    legal_logits, priors = masked_policy(logits, indices)
+
+    assert [len(row) for row in priors] == [20, 0, 5]
+    for row, row_indices in zip(range(3), indices):
+        assert np.allclose(legal_logits[row], logits[row, row_indices].numpy())
+    expected = torch.softmax(logits[0, indices[0]], dim=0).numpy()
+    assert np.allclose(priors[0], expected, atol=1e-6)
+    assert abs(priors[2].sum() - 1.0) < 1e-5
+
+def test_evaluate_uses_legal_move_priors():
+    trainer = RLTrainer()
+    board = chess.Board("r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4")
+    priors, value = trainer.evaluate(board)
+    assert set(priors) == set(board.legal_moves)
+    assert abs(sum(priors.values()) - 1.0) < 1e-5
+    assert -1.0 <= value <= 1.0
+
+if __name__ == "__main__":
+    test_move_indices_are_unique_and_invertible()
+    test_underpromotions_have_their_own_indices()
+    test_masked_policy_covers_only_legal_moves()
+    test_evaluate_uses_legal_move_priors()
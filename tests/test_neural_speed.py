@@ -0,0 +1,31 @@
+import chess
+import time
+from src.chess_ai.reinforcement import RLTrainer
+from src.neural_mcts import NeuralMCTS
+
+def test_batched_evaluation_speed():
+    """Benchmark evaluated positions/sec for different batch sizes"""
+    trainer = RLTrainer()
+    board = chess.Board("r1bqkb1r/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 2 4")
+    trainer.evaluate_batch([board])  # Warm up
+
+    for batch_size in [1, 8, 32]:
+        boards = [board] * batch_size
+        rounds = max(64 // batch_size, 2)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            results = trainer.evaluate_batch(boards)
+        elapsed = time.perf_counter() - start
+        print(f"evaluate_batch({batch_size}): {rounds * batch_size / elapsed:.0f} positions/s")
+        assert len(results) == batch_size
+
+    for batch_size in [1, 8, 16]:
+        search = NeuralMCTS(board, trainer, max_iterations=10**6, batch_size=batch_size)
+        move = search.get_best_move(time_limit=1.0)
+        stats = search.search_stats()
+        print(f"NeuralMCTS batch {batch_size}: {stats['evaluations_per_second']:.0f} evals/s, "
+              f"{stats['batches']} batches, {stats['collisions']} collisions")
+        assert move in board.legal_moves
+
+if __name__ == "__main__":
+    test_batched_evaluation_speed()
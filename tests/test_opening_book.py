@@ -0,0 +1,148 @@
+import os
+import struct
+import tempfile
+import time
+import chess
+import chess.polyglot
+from src.chess_ai import resources
+from src.chess_ai.chess_ai import ModernChessAI
+from src.chess_ai.config import Config
+from src.chess_ai.opening_book import OpeningBook
+
+def write_book(path, lines):
+    """
+    Write a Polyglot book.
+
+    Args:
+        path (str): Book file
+        lines (list): (moves leading to the position, {uci move: weight})
+    """
+    entries = []
+    for moves, book_moves in lines:
+        board = chess.Board()
+        for move in moves:
+            board.push_uci(move)
+        key = chess.polyglot.zobrist_hash(board)
+        for uci, weight in book_moves.items():
+            move = chess.Move.from_uci(uci)
+            raw = move.to_square | move.from_square << 6
+            if move.promotion:
+                raw |= (move.promotion - 1) << 12
+            entries.append((key, raw, weight, 0))
+    with open(path, 'wb') as f:
+        for entry in sorted(entries):
+            f.write(struct.pack('>QHHI', *entry))
+
+BOOK_LINES = [
+    ([], {'e2e4': 3, 'd2d4': 1, 'g1f3': 0}),
+    (['e2e4'], {'e7e5': 1}),
+]
+
+def test_weighted_choice():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'book.bin')
+        write_book(path, BOOK_LINES)
+        with OpeningBook(path, seed=1) as book:
+            board = chess.Board()
+            picks = [book.choose(board).uci() for _ in range(4000)]
+            print("e2e4 share:", picks.count('e2e4') / len(picks))
+            assert set(picks) == {'e2e4', 'd2d4'}  # Zero weight is never played
+            assert 0.7 < picks.count('e2e4') / len(picks) < 0.8
+
+            # The same seed repeats the same choices
+            book.seed(7)
+            first = [book.choose(board) for _ in range(20)]
+            book.seed(7)
+            assert [book.choose(board) for _ in range(20)] == first
+
+def test_in_memory_map():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'book.bin')
+        write_book(path, BOOK_LINES)
+        with OpeningBook(path, seed=0, max_ply=1, cache_size=2) as book:
+            assert len(book) == 4
+            board = chess.Board()
+            book.choose(board)
+            book.choose(board)
+            assert book.stats()['hits'] == 1 and book.stats()['misses'] == 1
+
+            board.push_uci('e2e4')
+            assert book.choose(board) == chess.Move.from_uci('e7e5')
+
+            # Positions out of the book are remembered too
+            board.pop()
+            board.push_uci('a2a3')
+            assert book.choose(board) is None
+            assert book.choose(board) is None
+            assert book.stats()['size'] == 2  # The start position was evicted
+
+            board.push_uci('e7e5')
+            misses = book.misses
+            assert book.choose(board) is None  # Past max_ply
+            assert book.misses == misses
+
+def test_ai_plays_book_moves():
+    """Book positions are answered without searching"""
+    saved_path = Config.PATHS['opening_book']
+    with tempfile.TemporaryDirectory() as directory:
+        Config.PATHS['opening_book'] = os.path.join(directory, 'book.bin')
+        write_book(Config.PATHS['opening_book'], BOOK_LINES)
+        resources.clear()
+        try:
+            ai = ModernChessAI(use_mcts=True, use_rl=False)
+            board = chess.Board()
+            start = time.perf_counter()
+            move = ai.get_best_move(board, time_limit=1.0)
+            assert move.uci() in ('e2e4', 'd2d4')
+            assert time.perf_counter() - start < 0.1
+            assert ai.last_search_stats is None
+
+            # Out of the book, the AI searches
+            board.push_uci('g1f3')
+            move = ai.get_best_move(board, time_limit=0.2)
+            assert move in board.legal_moves
+            assert ai.last_search_stats is not None
+        finally:
+            Config.PATHS['opening_book'] = saved_path
+            resources.clear()
+
+def test_book_move_speed():
+    """Compare a book move with reopening the book for every lookup"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'book.bin')
+        # Enough positions that the book is searched rather than scanned
+        lines = list(BOOK_LINES)
+        board = chess.Board()
+        for move in board.legal_moves:
+            board.push(move)
+            for reply in list(board.legal_moves)[:5]:
+                lines.append(([move.uci(), reply.uci()], {'e2e4': 1, 'g1f3': 2}))
+            board.pop()
+        write_book(path, lines)
+
+        board = chess.Board()
+        board.push_uci('e2e4')
+        count = 2000
+
+        start = time.perf_counter()
+        for _ in range(count):
+            with chess.polyglot.open_reader(path) as reader:
+                reader.weighted_choice(board)
+        reopen = (time.perf_counter() - start) / count
+
+        with OpeningBook(path, seed=0) as book:
+            book.choose(board)
+            start = time.perf_counter()
+            for _ in range(count):
+                book.choose(board)
+            cached = (time.perf_counter() - start) / count
+
+    print(f"Reopening the book: {reopen * 1e6:.1f} us per move")
+    print(f"OpeningBook: {cached * 1e6:.1f} us per move ({reopen / cached:.1f}x)")
+    assert cached < reopen
+
+if __name__ == "__main__":
+    test_weighted_choice()
+    test_in_memory_map()
+    test_ai_plays_book_moves()
+    test_book_move_speed()
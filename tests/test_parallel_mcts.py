@@ -0,0 +1,38 @@
+import chess
+import time
+from src.parallel_mcts import (RootParallelMCTS, TreeParallelMCTS,
+                               merge_root_statistics)
+
+MID_GAME_FEN = "r1bqkb1r/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 2 4"
+
+def test_merge_root_statistics():
+    e4, d4 = chess.Move.from_uci("e2e4"), chess.Move.from_uci("d2d4")
+    results = [
+        (e4, {e4: (10, 6.0), d4: (2, 1.0)}, {}),
+        (d4, {e4: (3, 1.0), d4: (5, 3.0)}, {}),
+        (d4, {e4: (4, 2.0), d4: (6, 4.0)}, {}),
+    ]
+    assert merge_root_statistics(results, 'visits') == e4
+    assert merge_root_statistics(results, 'vote') == d4
+
+def test_root_parallel_move():
+    board = chess.Board(MID_GAME_FEN)
+    search = RootParallelMCTS(board, num_workers=2, seed=1)
+    move = search.get_best_move(time_limit=0.5)
+    print(f"Root-parallel stats: {search.search_stats()}")
+
+    assert move in board.legal_moves, "Root-parallel search must return a legal move"
+    assert search.search_stats()['simulations'] > 0
+
+def test_tree_parallel_move():
+    board = chess.Board(MID_GAME_FEN)
+    search = TreeParallelMCTS(board, num_workers=2)
+    start = time.monotonic()
+    move = search.get_best_move(time_limit=0.5)
+    elapsed = time.monotonic() - start
+    print(f"Tree-parallel stats: {search.search_stats()}")
+
+    assert move in board.legal_moves, "Tree-parallel search must return a legal move"
+    assert elapsed <= 0.5 * 1.2, "Tree-parallel search overran its time budget"
+    # All virtual loss must be removed once the search returns
+    assert search.root.visits == search.search_stats()['simulations']
@@ -0,0 +1,30 @@
+import os
+import chess
+from src.parallel_mcts import RootParallelMCTS, TreeParallelMCTS
+
+def test_parallel_scaling():
+    """Benchmark simulations/sec as the number of workers grows"""
+    board = chess.Board()
+    max_workers = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, max_workers // 2 or 1, max_workers})
+
+    for search_class in (RootParallelMCTS, TreeParallelMCTS):
+        baseline = None
+        for num_workers in worker_counts:
+            search = search_class(board, max_iterations=10**6, num_workers=num_workers)
+            # First call starts the worker processes; only time the second
+            search.get_best_move(time_limit=0.2)
+            move = search.get_best_move(time_limit=1.0)
+            stats = search.search_stats()
+            rate = stats['simulations_per_second']
+            baseline = baseline or rate
+            print(f"{search_class.__name__}: {num_workers} workers - "
+                  f"{rate:.0f} sims/s ({rate / baseline:.2f}x)")
+            assert move in board.legal_moves
+            if num_workers > 1:
+                assert stats['workers_used'] > 1, "The search must spread over the workers"
+            # No rollout is left running into the next move's budget
+            assert stats['elapsed'] < 1.0 + 0.25
+
+if __name__ == "__main__":
+    test_parallel_scaling()
@@ -0,0 +1,25 @@
+import chess
+import numpy as np
+from src.chess_ai.position_encoding import encode_mobility, encode_position
+from tests.conftest import random_positions
+
+def reference_encode_mobility(board):
+    """Per-square legal move scan the fast encoder must reproduce"""
+    mobility_map = np.zeros((8, 8), dtype=np.float32)
+    for square in chess.SQUARES:
+        if board.piece_at(square) is not None:
+            mobility = sum(1 for move in board.legal_moves if move.from_square == square)
+            mobility_map[chess.square_rank(square), chess.square_file(square)] = mobility
+    return mobility_map
+
+def test_encode_mobility_matches_reference():
+    for board in random_positions(num_games=2):
+        mobility = encode_mobility(board)
+        assert mobility.dtype == np.float32 and mobility.shape == (8, 8)
+        assert np.array_equal(mobility, reference_encode_mobility(board)), board.fen()
+
+def test_encode_position_shape():
+    features = encode_position(chess.Board())
+    assert features.shape == (8, 8, 15)
+    # 20 legal moves in the starting position, all from ranks 1 and 2
+    assert features[:, :, -1].sum() == 20
@@ -0,0 +1,61 @@
+import os
+import chess
+import torch
+from src.chess_ai import self_play
+from src.chess_ai.quantization import (QuantizedEvaluator, calibration_planes, load_quantized,
+                                       publish_quantized, quantization_drift, quantize_model,
+                                       quantized_path, save_quantized)
+from src.chess_ai.reinforcement import ChessNet
+from src.chess_ai.replay_buffer import ReplayBuffer
+from tests.conftest import game_samples
+
+def test_quantize_static_from_self_play(tmp_path):
+    buffer = ReplayBuffer(str(tmp_path / "replay"))
+    buffer.append(*game_samples(40))
+    positions = calibration_planes(buffer.directory, 32)
+    assert positions.shape == (32, 8, 8, 15)
+
+    torch.manual_seed(0)
+    model = ChessNet()
+    quantized = quantize_model(model, 'static', positions)
+    path = str(tmp_path / "model.int8.pt")
+    save_quantized(quantized, path)
+    loaded = load_quantized(path)
+
+    drift = quantization_drift(model, loaded, positions)
+    print(f"Static int8 drift: {drift}")
+    assert drift['positions'] == 32
+    assert drift['top1_agreement'] > 0.5
+    assert drift['value_mae'] < 0.05
+
+def test_quantize_requires_calibration_for_static():
+    try:
+        quantize_model(ChessNet(), 'static')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Static quantization without calibration positions must fail")
+
+def test_worker_uses_only_the_int8_network(tmp_path):
+    weights_path = str(tmp_path / "published.pth")
+    path = quantized_path(weights_path)
+    assert publish_quantized(ChessNet(), path, 'static') == 'dynamic'  # Nothing to calibrate on
+    self_play._init_worker(None, weights_path, path)
+    ai = self_play._worker_ai
+    assert isinstance(ai.evaluator, QuantizedEvaluator) and ai._rl_trainer is None
+    priors, value = ai.evaluator.evaluate(chess.Board())
+    assert len(priors) == 20 and abs(sum(priors.values()) - 1) < 1e-5 and -1 <= value <= 1
+
+    # The worker reloads the int8 network published with new weights
+    old = ai.evaluator.network
+    publish_quantized(ChessNet(), path, 'dynamic')
+    os.utime(path, ns=(1, 1))
+    self_play._reload_published_weights()
+    assert ai.evaluator.network is not old and ai._rl_trainer is None
+    assert ai.get_best_move(chess.Board(), time_limit=0.2) in chess.Board().legal_moves
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_quantize_static_from_self_play(pathlib.Path(tempfile.mkdtemp()))
+    test_quantize_requires_calibration_for_static()
+    test_worker_uses_only_the_int8_network(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import time
+import torch
+from src.chess_ai.quantization import (calibration_planes, load_quantized, quantization_drift,
+                                       quantize_model, save_quantized)
+from src.chess_ai.reinforcement import ChessNet
+from src.chess_ai.replay_buffer import ReplayBuffer
+from tests.conftest import game_samples, positions_per_second
+
+def test_quantization_speed():
+    """Benchmark start-up time, checkpoint size and positions/sec of the int8 networks"""
+    torch.manual_seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        buffer = ReplayBuffer(os.path.join(directory, 'replay'))
+        buffer.append(*game_samples(20))
+        positions = calibration_planes(buffer.directory, 256)
+        model = ChessNet().eval()
+
+        fp32_path = os.path.join(directory, 'model.pth')
+        torch.save(model.state_dict(), fp32_path)
+        start = time.perf_counter()
+        loaded = ChessNet()
+        loaded.load_state_dict(torch.load(fp32_path))
+        fp32_load = time.perf_counter() - start
+        results = {'fp32': (model, os.path.getsize(fp32_path), fp32_load)}
+
+        for mode in ('dynamic', 'static'):
+            path = os.path.join(directory, f'model.{mode}.pt')
+            save_quantized(quantize_model(model, mode, positions), path)
+            start = time.perf_counter()
+            quantized = load_quantized(path)
+            results[mode] = (quantized, os.path.getsize(path), time.perf_counter() - start)
+
+        batch = positions[:64]
+        rates = {}
+        for name, (network, size, load_time) in results.items():
+            with torch.inference_mode():
+                network(batch)  # Warm up
+                latency = 1000 / positions_per_second(network, batch[:1])
+                rates[name] = positions_per_second(network, batch)
+            line = (f"{name}: load {load_time * 1000:.0f} ms, {size / 1e6:.1f} MB, "
+                    f"{latency:.2f} ms/position at batch 1, {rates[name]:.0f} positions/s at batch 64")
+            if name != 'fp32':
+                drift = quantization_drift(model, network, positions)
+                line += (f", top-1 agreement {drift['top1_agreement']:.1%}, "
+                         f"value MAE {drift['value_mae']:.4f}")
+            print(line)
+
+        assert results['static'][1] < results['fp32'][1] / 3
+        assert rates['static'] > rates['fp32']
+
+if __name__ == "__main__":
+    test_quantization_speed()
@@ -0,0 +1,52 @@
+import os
+import pickle
+import chess
+import numpy as np
+from src.chess_ai.batch_encoding import encode_boards
+from src.chess_ai.reinforcement import move_to_index
+from src.chess_ai.replay_buffer import (ReplayBuffer, RECORD_DTYPE, records_to_planes,
+                                        records_to_move_indices, records_to_moves)
+from tests.conftest import game_samples
+
+def test_replay_buffer_roundtrip(tmp_path):
+    boards, moves, values = game_samples()
+    buffer = ReplayBuffer(str(tmp_path), capacity=10000, shard_size=64)
+    buffer.append(boards, moves, values)
+    records = buffer.get(np.arange(len(buffer)))
+
+    assert len(buffer) == len(boards)
+    assert np.array_equal(records_to_planes(records), encode_boards(boards))
+    assert records_to_moves(records) == moves
+    assert records_to_move_indices(records).tolist() == [move_to_index(move) for move in moves]
+    assert records['value'].tolist() == values
+
+def test_replay_buffer_window_and_restart(tmp_path):
+    boards, moves, values = game_samples()
+    buffer = ReplayBuffer(str(tmp_path), capacity=100, shard_size=32)
+    buffer.append(boards, moves, values)
+    buffer.close()
+
+    assert len(buffer) == min(len(boards), 100)
+    # Shards wholly before the window are deleted
+    shards = [name for name in os.listdir(tmp_path) if name.startswith('shard_')]
+    assert len(shards) <= 100 // 32 + 2
+
+    reopened = ReplayBuffer(str(tmp_path), capacity=100)
+    assert reopened.total == len(boards) and reopened.shard_size == 32
+    recent = reopened.recent(10)
+    assert records_to_moves(recent) == moves[-10:]
+
+    sample = reopened.sample(256, rng=np.random.default_rng(0))
+    window_moves = set(reopened.get(np.arange(len(reopened)))['move'].tolist())
+    assert set(sample['move'].tolist()) <= window_moves
+
+def test_replay_buffer_memory_per_sample():
+    boards, moves, _ = game_samples()
+    # The lists SelfPlayTrainer kept before: a full board copy per sample
+    list_bytes = sum(len(pickle.dumps(board.copy())) for board in boards) / len(boards)
+    print(f"Board copy: {list_bytes:.0f} bytes/sample, record: {RECORD_DTYPE.itemsize} bytes/sample "
+          f"({list_bytes / RECORD_DTYPE.itemsize:.0f}x smaller)")
+    assert RECORD_DTYPE.itemsize == 103
+
+if __name__ == "__main__":
+    test_replay_buffer_memory_per_sample()
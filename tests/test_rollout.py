@@ -0,0 +1,72 @@
+import random
+import chess
+import evaluation
+from src.rollout import RolloutPolicy, result_from_score
+from src.mcts import MCTS
+from src.array_mcts import ArrayMCTS
+from tests.conftest import random_positions
+
+MATE_IN_ONE = "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"
+
+def test_rollout_moves_are_legal():
+    rng = random.Random(0)
+    for board in random_positions(num_games=3):
+        for policy in ('uniform', 'heavy'):
+            rollout_policy = RolloutPolicy(policy=policy, check_weight=1.0, rng=rng)
+            move = rollout_policy.choose_move(board)
+            if board.is_checkmate() or board.is_stalemate():
+                assert move is None
+            else:
+                assert move in board.legal_moves, board.fen()
+
+def test_rollout_restores_board():
+    board = chess.Board("r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4")
+    fen = board.fen()
+    for policy in ('uniform', 'heavy'):
+        result = RolloutPolicy(policy=policy, rng=random.Random(1))(board)
+        assert 0.0 <= result <= 1.0
+        assert board.fen() == fen and len(board.move_stack) == 0
+
+def test_rollout_perspective():
+    # Black to move is mated: a win for white, who moved into the position
+    board = chess.Board("R5k1/5ppp/8/8/8/8/5PPP/6K1 b - - 1 1")
+    assert RolloutPolicy()(board) == 1.0
+    
+    # White is a queen up with black to move
+    board = chess.Board("3qk3/8/8/8/8/8/8/3QK2Q b - - 0 1")
+    assert RolloutPolicy(max_depth=0)(board) > 0.99
+    board = chess.Board("3qk3/8/8/8/8/8/8/3QK2Q w - - 0 1")
+    assert RolloutPolicy(max_depth=0)(board) < 0.01
+
+def test_rollout_cutoff():
+    # White to move wins the queen; the rollout stops on the material swing
+    board = chess.Board("4k3/8/8/3q4/8/8/8/3QK2R w K - 0 1")
+    rollout_policy = RolloutPolicy(policy='heavy', capture_weight=1000.0, cutoff=1000,
+                                   rng=random.Random(0))
+    result = rollout_policy(board)
+    # Material is then 1400 centipawns for white, scored for black who moved last
+    assert result == result_from_score(1400, chess.BLACK)
+
+def test_rollout_leaf_uses_evaluation_cache():
+    """Rollouts ending in the same position score it once"""
+    board = chess.Board("r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4")
+    cache = evaluation.evaluation_cache
+    cache.clear()
+    rollout_policy = RolloutPolicy(max_depth=0)
+    first = rollout_policy(board)
+    assert rollout_policy(board) == first
+    assert cache.stats()['misses'] == 1 and cache.stats()['hits'] == 1
+    assert len(cache) <= cache.capacity
+
+def test_mcts_finds_mate_in_one():
+    board = chess.Board(MATE_IN_ONE)
+    for search in (MCTS(board, max_iterations=400), ArrayMCTS(board, max_iterations=400)):
+        assert search.get_best_move() == chess.Move.from_uci("a1a8")
+
+if __name__ == "__main__":
+    test_rollout_moves_are_legal()
+    test_rollout_restores_board()
+    test_rollout_perspective()
+    test_rollout_cutoff()
+    test_rollout_leaf_uses_evaluation_cache()
+    test_mcts_finds_mate_in_one()
@@ -0,0 +1,70 @@
+import math
+import random
+import time
+import chess
+from evaluation import evaluate_position
+from src.mcts import MCTS
+from src.rollout import RolloutPolicy
+
+def reference_rollout(board):
+    """Rollout as MCTS.simulate used to play it: full legal move lists and is_game_over every ply"""
+    temp_board = board.copy()
+    mover = not board.turn
+    depth = 0
+    while not temp_board.is_game_over() and depth < 50:
+        temp_board.push(random.choice(list(temp_board.legal_moves)))
+        depth += 1
+    if temp_board.is_checkmate():
+        return 1.0 if temp_board.turn != mover else 0.0
+    if temp_board.is_stalemate() or temp_board.is_insufficient_material():
+        return 0.5
+    white_result = 1.0 / (1.0 + math.exp(-evaluate_position(temp_board) / 100))
+    return white_result if mover == chess.WHITE else 1.0 - white_result
+
+def rollouts_per_second(rollout, board, duration=1.0):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        rollout(board)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+def play_game(white_policy, black_policy, time_per_move=0.05, max_plies=40):
+    """
+    Play MCTS against MCTS with different rollout policies.
+
+    Returns:
+        float: Score for white, adjudicated by evaluate_position at max_plies
+    """
+    board = chess.Board()
+    while not board.is_game_over() and board.ply() < max_plies:
+        policy = white_policy if board.turn == chess.WHITE else black_policy
+        board.push(MCTS(board, max_iterations=10**6, rollout_policy=policy)
+                   .get_best_move(time_limit=time_per_move))
+    outcome = board.outcome()
+    if outcome is not None:
+        return 0.5 if outcome.winner is None else float(outcome.winner)
+    score = evaluate_position(board)
+    return 1.0 if score > 100 else 0.0 if score < -100 else 0.5
+
+def test_rollout_speed():
+    """Benchmark rollouts/sec of each policy and a short heavy-against-uniform match"""
+    random.seed(0)
+    board = chess.Board("r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4")
+    uniform = RolloutPolicy(policy='uniform')
+    heavy = RolloutPolicy(policy='heavy')
+
+    reference_rate = rollouts_per_second(reference_rollout, board)
+    uniform_rate = rollouts_per_second(uniform, board)
+    heavy_rate = rollouts_per_second(heavy, board)
+    print(f"Reference: {reference_rate:.0f} rollouts/s")
+    print(f"Uniform: {uniform_rate:.0f} rollouts/s ({uniform_rate / reference_rate:.1f}x)")
+    print(f"Heavy: {heavy_rate:.0f} rollouts/s ({heavy_rate / reference_rate:.1f}x)")
+
+    heavy_score = (play_game(heavy, uniform) + 1.0 - play_game(uniform, heavy)) / 2
+    print(f"Heavy against uniform: {heavy_score:.2f} points per game")
+
+    assert uniform_rate > reference_rate
+
+if __name__ == "__main__":
+    test_rollout_speed()
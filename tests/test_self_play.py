@@ -0,0 +1,73 @@
+import os
+from src.chess_ai import self_play
+from src.chess_ai.config import Config
+from src.chess_ai.self_play import SelfPlayTrainer, play_game
+from src.chess_ai.replay_buffer import ReplayBuffer
+
+def test_play_game_is_seeded():
+    # With only random moves the game depends on nothing but the seed
+    moves_a, result_a = play_game(None, seed=7, time_per_move=0.0, random_move_rate=1.0)
+    moves_b, result_b = play_game(None, seed=7, time_per_move=0.0, random_move_rate=1.0)
+    moves_c, _ = play_game(None, seed=8, time_per_move=0.0, random_move_rate=1.0)
+
+    assert moves_a == moves_b and result_a == result_b
+    assert moves_a != moves_c
+
+def test_self_play_book_is_opt_in(monkeypatch):
+    """Book moves would become policy targets, so self-play skips the book unless asked"""
+    monkeypatch.setitem(Config.BOOK_SETTINGS, 'enabled', True)
+    monkeypatch.setitem(Config.SELF_PLAY_SETTINGS, 'book', False)
+    trainer = SelfPlayTrainer(num_games=1)
+    assert not trainer.ai.use_book and trainer.ai.opening_book is None
+
+    monkeypatch.setitem(Config.SELF_PLAY_SETTINGS, 'book', True)
+    assert SelfPlayTrainer(num_games=1).ai.use_book
+
+def test_workers_search_like_the_trainer(tmp_path, monkeypatch):
+    """Without a trained model, workers play rollout MCTS like the trainer's own AI"""
+    monkeypatch.setitem(Config.MCTS_SETTINGS, 'guidance', 'auto')
+    monkeypatch.setitem(Config.MODEL_SERVER_SETTINGS, 'enabled', False)
+    monkeypatch.setitem(Config.PATHS, 'model_save', str(tmp_path / 'missing.pth'))
+    trainer = SelfPlayTrainer(num_games=1, num_workers=2)
+    assert not trainer.ai.network_guided()
+
+    self_play._init_worker(*trainer._worker_initargs())
+    assert self_play._worker_ai._network_given, "Workers are handed the trainer's weights"
+    assert not self_play._worker_ai.network_guided()
+
+    monkeypatch.setitem(Config.MCTS_SETTINGS, 'guidance', 'network')
+    self_play._init_worker(*trainer._worker_initargs())
+    assert self_play._worker_ai.network_guided()
+
+def test_parallel_self_play_survives_worker_crash(tmp_path, monkeypatch):
+    marker = str(tmp_path / "crashed")
+    def crash_once(ai, seed, time_per_move, random_move_rate):
+        # The first worker to play game 1 dies; the replay succeeds
+        if seed == 1 and not os.path.exists(marker):
+            open(marker, 'w').close()
+            os._exit(1)
+        return play_game(ai, seed, time_per_move, 1.0)
+    monkeypatch.setattr(self_play, 'play_game', crash_once)
+
+    trainer = SelfPlayTrainer(num_games=3, num_workers=2, seed=0, time_per_move=0.0)
+    games = list(trainer.generate_games(3))
+    print(f"Self-play: {trainer.games_per_hour:.0f} games/hour, "
+          f"{trainer.worker_crashes} worker crashes")
+
+    assert len(games) == 3, "Games finished before the crash must be kept and the rest replayed"
+    assert trainer.games_played == 3 and trainer.failed_games == 0
+    assert trainer.worker_crashes == 1
+    assert len(trainer.positions) == sum(len(moves) for moves, _ in games)
+    assert trainer.games_per_hour > 0
+
+def test_self_play_into_replay_buffer(tmp_path):
+    buffer = ReplayBuffer(str(tmp_path), capacity=10000)
+    trainer = SelfPlayTrainer(num_games=1, seed=3, random_move_rate=1.0, replay_buffer=buffer)
+    moves, _ = trainer.generate_game()
+
+    assert len(buffer) == len(moves) and trainer.positions == []
+    loss = trainer.ai.train_records(buffer.sample(8))
+    assert loss > 0
+
+if __name__ == "__main__":
+    test_play_game_is_seeded()
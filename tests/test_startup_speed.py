@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import torch
+from src.chess_ai.reinforcement import ChessNet, create_model
+from src.chess_ai import resources
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Times, in a fresh process, creating an AI, its first evaluation and a
+# second AI; eager loads the model in the constructor as before
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import chess
+from src.chess_ai.config import Config
+from src.chess_ai.chess_ai import ModernChessAI
+Config.PATHS['model_save'] = sys.argv[1]
+Config.MODEL_SERVER_SETTINGS['enabled'] = False
+Config.INFERENCE_SETTINGS['warm_up'] = False
+eager = sys.argv[2] == 'eager'
+timings = {'import': time.perf_counter() - start}
+
+start = time.perf_counter()
+ai = ModernChessAI(use_mcts=False, use_rl=True)
+if eager:
+    ai.rl_trainer
+timings['construct'] = time.perf_counter() - start
+timings['torch_imported'] = 'torch' in sys.modules
+
+start = time.perf_counter()
+ai.evaluator.evaluate(chess.Board())
+timings['first_evaluate'] = time.perf_counter() - start
+
+start = time.perf_counter()
+second = ModernChessAI(use_mcts=False, use_rl=True)
+if eager:
+    import torch
+    from src.chess_ai.reinforcement import RLTrainer
+    trainer = RLTrainer()  # Random initialisation, then a full read of the file
+    trainer.model.load_state_dict(torch.load(sys.argv[1]))
+    trainer.model.eval()
+    trainer.evaluate(chess.Board())
+else:
+    second.evaluator.evaluate(chess.Board())
+timings['second_ready'] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+def startup_timings(model_path, mode):
+    env = dict(os.environ, PYTHONPATH='.')
+    output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, model_path, mode],
+                            check=True, env=env, cwd=ROOT, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def test_checkpoint_cache():
+    """Checkpoints are loaded once and built without a random initialisation"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'model.pth')
+        torch.save(ChessNet().state_dict(), path)
+        resources.clear()
+        state_dict = resources.load_checkpoint(path)
+        assert resources.load_checkpoint(path) is state_dict
+        assert resources.load_checkpoint(os.path.join(directory, 'missing.pth')) is None
+
+        model = create_model(state_dict)
+        for name, tensor in model.state_dict().items():
+            assert torch.equal(tensor, state_dict[name])
+            assert tensor.data_ptr() != state_dict[name].data_ptr()  # Copied out of the mmap
+
+        # A new checkpoint at the same path is picked up
+        torch.save(ChessNet().state_dict(), path)
+        os.utime(path, ns=(0, 0))
+        assert resources.load_checkpoint(path) is not state_dict
+        resources.clear()
+
+def test_startup_speed():
+    """Benchmark lazy, cached model loading against loading in the constructor"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'model.pth')
+        torch.save(ChessNet().state_dict(), path)
+        lazy = startup_timings(path, 'lazy')
+        eager = startup_timings(path, 'eager')
+
+    print(f"Import: {lazy['import'] * 1000:.0f} ms")
+    print(f"Construct: {lazy['construct'] * 1000:.1f} ms lazy, {eager['construct'] * 1000:.0f} ms eager")
+    print(f"First evaluation: {lazy['first_evaluate'] * 1000:.0f} ms lazy, "
+          f"{eager['first_evaluate'] * 1000:.0f} ms eager")
+    print(f"Second AI ready: {lazy['second_ready'] * 1000:.1f} ms lazy (cached), "
+          f"{eager['second_ready'] * 1000:.0f} ms reloading the model")
+
+    assert not lazy['torch_imported']
+    assert lazy['construct'] < 0.05
+    assert lazy['second_ready'] < eager['second_ready']
+
+if __name__ == "__main__":
+    test_checkpoint_cache()
+    test_startup_speed()
@@ -5,8 +5,10 @@ import chess
 import os
 
 @pytest.fixture
-def training_pipeline():
-    return TrainingPipeline()
+def training_pipeline(training_paths):
+    pipeline = TrainingPipeline()
+    yield pipeline
+    pipeline.close()
 
 def test_training_initialization(training_pipeline):
     assert training_pipeline.ai is not None
@@ -22,6 +24,10 @@ def test_stockfish_data_generation(training_pipeline):
     assert len(data['moves']) == len(data['positions'])
     assert len(data['values']) == len(data['positions'])
 
+def test_training_skips_empty_buffer(training_pipeline):
+    assert len(training_pipeline.stockfish_buffer) == 0
+    assert training_pipeline.train_epochs(training_pipeline.stockfish_buffer, "Stockfish") is None
+
 def test_model_saving(training_pipeline):
     model_path = training_pipeline._save_model()
     assert os.path.exists(model_path) 
\ No newline at end of file
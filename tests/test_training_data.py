@@ -0,0 +1,53 @@
+import chess
+import numpy as np
+import torch
+from src.chess_ai.data_augmentation import mirror_records
+from src.chess_ai.reinforcement import RLTrainer
+from src.chess_ai.replay_buffer import ReplayBuffer, RECORD_DTYPE, records_to_moves
+from src.chess_ai.batch_encoding import board_to_bitboards
+from src.array_mcts import pack_move
+from src.chess_ai.training_data import make_data_loader
+from tests.conftest import game_samples
+
+def test_mirror_records():
+    board = chess.Board("8/2k5/8/3p4/4P3/8/1K6/8 w - - 0 1")
+    castling = chess.Board()
+    records = np.zeros(2, dtype=RECORD_DTYPE)
+    for record, position, move in zip(records, (board, castling),
+                                      (chess.Move.from_uci("e4d5"), chess.Move.from_uci("g1f3"))):
+        record['bitboards'], record['flags'] = board_to_bitboards(position)
+        record['move'] = pack_move(move)
+    mirrored = mirror_records(records)
+
+    expected_bitboards, _ = board_to_bitboards(board.transform(chess.flip_horizontal))
+    assert mirrored['bitboards'][0].tolist() == expected_bitboards
+    assert records_to_moves(mirrored)[0] == chess.Move.from_uci("d4e5")
+    # Positions with castling rights are left alone
+    assert np.array_equal(mirrored[1], records[1])
+
+def test_data_loader_covers_buffer(tmp_path):
+    boards, moves, values = game_samples()
+    ReplayBuffer(str(tmp_path)).append(boards, moves, values)
+
+    loader = make_data_loader(str(tmp_path), batch_size=16, num_workers=1, augment=False,
+                              shuffle=False)
+    batches = list(loader)
+    positions = torch.cat([batch[0] for batch in batches])
+
+    assert all(len(batch[0]) <= 16 for batch in batches)
+    assert positions.shape == (len(boards), 8, 8, 15)
+    assert torch.cat([batch[2] for batch in batches]).tolist() == values
+
+def test_train_epochs(tmp_path):
+    boards, moves, values = game_samples()
+    ReplayBuffer(str(tmp_path)).append(boards, moves, values)
+
+    stats = RLTrainer().train_epochs(str(tmp_path), num_epochs=2, batch_size=32, num_workers=1)
+    print(f"Training: {stats['samples_per_second']:.0f} samples/s, "
+          f"{len(stats['losses'])} batches")
+
+    assert stats['samples'] == 2 * len(boards)
+    assert len(stats['losses']) == 2 * -(-len(boards) // 32)
+
+if __name__ == "__main__":
+    test_mirror_records()
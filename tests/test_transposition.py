@@ -0,0 +1,91 @@
+import chess
+import numpy as np
+from src.transposition import TranspositionTable, position_key
+from src.mcts import MCTS
+from src.neural_mcts import NeuralMCTS
+from tests.conftest import UniformEvaluator
+
+def test_transpositions_share_a_key():
+    first = chess.Board()
+    for san in ["Nf3", "d5", "d4"]:
+        first.push_san(san)
+    second = chess.Board()
+    for san in ["d4", "d5", "Nf3"]:
+        second.push_san(san)
+    assert position_key(first) == position_key(second)
+
+def test_probe_and_accumulate():
+    table = TranspositionTable(1000)
+    assert table.size == 1024
+    key = position_key(chess.Board())
+
+    assert table.probe(key) is None
+    table.store(key, 1.0)
+    table.store(key, 0.0)
+    value, visits, priors = table.probe(key)
+    assert (value, visits, priors) == (0.5, 2, None)
+    assert table.hit_rate == 0.5
+
+def test_priors_have_a_fixed_size():
+    table = TranspositionTable(16, prior_moves=4)
+    key = position_key(chess.Board())
+    indices = np.arange(20)
+    values = np.linspace(0.01, 0.1, 20, dtype=np.float32)
+    table.store(key, 0.0, priors=(indices, values))
+
+    _, _, (kept_indices, kept_values) = table.probe(key)
+    assert kept_indices.tolist() == [19, 18, 17, 16], "Only the highest priors are kept"
+    assert np.allclose(kept_values, values[[19, 18, 17, 16]], atol=1e-3)
+    assert table.prior_indices.shape == table.prior_values.shape == (16, 4)
+
+    # Results without priors keep the stored ones; a new position drops them
+    table.store(key, 1.0)
+    assert table.probe(key)[2] is not None
+    table.new_search()
+    table.store(key + 16, 1.0)
+    assert table.probe(key + 16)[2] is None
+
+def test_sample_until_settled():
+    table = TranspositionTable(16)
+    samples = iter([1.0, 0.0])
+    assert table.sample(7, lambda: next(samples), 2) == (1.0, True)
+    assert table.settled_value(7, 2) is None
+    assert table.sample(7, lambda: next(samples), 2) == (0.0, True)
+    assert table.settled_value(7, 2) == 0.5
+    assert table.sample(7, lambda: next(samples), 2) == (0.5, False)
+
+def test_rollouts_are_averaged():
+    """A position keeps being sampled until its entry averages tt_samples results"""
+    board = chess.Board()
+    board.push_san("e4")
+    table = TranspositionTable(4096)
+    results = iter([1.0, 0.0, 1.0, 1.0])
+    search = MCTS(chess.Board(), transpositions=table, rollout_policy=lambda board: next(results))
+    search.tt_samples = 3
+
+    assert [search.evaluate_leaf(board) for _ in range(3)] == [1.0, 0.0, 1.0]
+    assert table.probe(position_key(board))[:2] == (2 / 3, 3)
+    assert search.evaluate_leaf(board) == 2 / 3, "Enough samples: the mean is reused"
+    assert search.simulations == 3
+
+def test_replacement_policy():
+    table = TranspositionTable(1)
+    table.store(1, 1.0, visits=5)
+    assert not table.store(2, 0.0, visits=1), "Deeper entry from this search is kept"
+    assert table.rejected == 1
+
+    table.new_search()
+    assert table.store(2, 0.0, visits=1), "Entries from older searches are replaced"
+    assert table.probe(1) is None
+    assert table.replacements == 1
+
+def test_searches_use_table():
+    board = chess.Board()
+    for search in (MCTS(board, max_iterations=100, transpositions=TranspositionTable(4096)),
+                   NeuralMCTS(board, UniformEvaluator(), max_iterations=100,
+                              transpositions=TranspositionTable(4096))):
+        search.get_best_move()
+        stats = search.search_stats()['transpositions']
+        print(f"{type(search).__name__} transposition stats: {stats}")
+        assert stats['stores'] > 0
+        assert stats['hits'] + stats['misses'] >= stats['stores']
@@ -1,11 +1,14 @@
 import chess
 from src.chess_ai.chess_ai import ModernChessAI
 from src.chess_ai.self_play import SelfPlayTrainer
-import stockfish
+from src.chess_ai.replay_buffer import ReplayBuffer
+from src.chess_ai.labelling import EngineLabeller
+from src.chess_ai.label_store import LabelStore
 from src.chess_ai.config import Config
 from utils.logger import setup_logger
 import traceback
 import os
+import math
 import random
 from datetime import datetime
 
@@ -18,8 +21,16 @@ class TrainingPipeline:
         
         try:
             self.ai = ModernChessAI(use_mcts=True, use_rl=True)
-            self.self_play_trainer = SelfPlayTrainer(num_games=100)
-            self.stockfish_engine = stockfish.Stockfish(path=Config.STOCKFISH_PATH)
+            # Training data is kept on disk so it survives restarts
+            self.self_play_buffer = ReplayBuffer(Config.PATHS['replay_buffer'])
+            self.stockfish_buffer = ReplayBuffer(Config.PATHS['stockfish_buffer'])
+            self.self_play_trainer = SelfPlayTrainer(num_games=100,
+                                                     replay_buffer=self.self_play_buffer)
+            # Labels from earlier runs, so only new positions reach Stockfish
+            self.label_store = (LabelStore(Config.PATHS['label_store'])
+                                if Config.LABELLING_SETTINGS['use_store'] else None)
+            # Pool of Stockfish processes, started when the first positions are labelled
+            self.stockfish_engine = EngineLabeller(store=self.label_store)
         except Exception as e:
             self.logger.error(f"Failed to initialize training pipeline: {str(e)}")
             raise
@@ -30,22 +41,23 @@ class TrainingPipeline:
             
             # Phase 1: Self-play training
             self.logger.info("Phase 1: Self-play training")
-            positions, moves, results = self.self_play_trainer.train()
+            self.self_play_trainer.train()
             
             # Train on self-play data
-            self.ai.train(positions, moves, results)
+            self.train_epochs(self.self_play_buffer, "self-play")
             
             # Phase 2: Learn from Stockfish
             self.logger.info("Phase 2: Learning from Stockfish")
             stockfish_data = self._generate_stockfish_data()
-            
-            # Train on Stockfish data
-            self.ai.train(
+            self.stockfish_buffer.append(
                 stockfish_data['positions'],
                 stockfish_data['moves'],
                 stockfish_data['values']
             )
             
+            # Train on Stockfish data
+            self.train_epochs(self.stockfish_buffer, "Stockfish")
+            
             # Save the trained model
             model_path = self._save_model()
             self.logger.info(f"Training complete! Model saved at: {model_path}")
@@ -54,38 +66,63 @@ class TrainingPipeline:
             self.logger.error(f"Training failed: {str(e)}\n{traceback.format_exc()}")
             raise
     
-    def _generate_stockfish_data(self):
-        positions, moves, values = [], [], []
-        board = chess.Board()
+    def train_epochs(self, buffer, name):
+        """
+        Train the AI on a replay buffer, skipping it when it is empty (for
+        example when labelling failed), since there is nothing to sample.
         
+        Returns:
+            dict: Stats from RLTrainer.train_epochs, or None if skipped
+        """
+        buffer.flush()
+        if len(buffer) == 0:
+            self.logger.warning(f"The {name} replay buffer is empty; skipping its training epochs")
+            return None
+        return self.ai.rl_trainer.train_epochs(buffer.directory)
+    
+    def _generate_stockfish_data(self, num_positions=1000):
         try:
-            for _ in range(1000):
-                if not self._process_position(board, positions, moves, values):
-                    board.reset()
+            boards = self._random_positions(num_positions)
+            # Label every position in one batch so all engines stay busy
+            labels = self.stockfish_engine.label(boards)
+            positions, moves, values = [], [], []
+            for board, label in zip(boards, labels):
+                if label is None:
+                    continue
+                move, score = label
+                positions.append(board)
+                moves.append(move)
+                values.append(math.tanh(score / 400))  # Centipawns to [-1, 1] for the side to move
+            self.logger.info(f"Labelled {len(positions)}/{len(boards)} positions, "
+                             f"{self.stockfish_engine.reused} without the engine "
+                             f"({self.stockfish_engine.labels_per_second:.1f} positions/sec)")
             return {'positions': positions, 'moves': moves, 'values': values}
         except Exception as e:
             self.logger.error(f"Stockfish data generation failed: {str(e)}")
             raise
+        finally:
+            # Engines are restarted by the next call; the label store stays
+            # open until close
+            self.stockfish_engine.close()
     
-    def _process_position(self, board, positions, moves, values):
-        try:
-            self.stockfish_engine.set_position(board.fen())
-            best_move = self.stockfish_engine.get_best_move()
-            
-            if best_move:
-                positions.append(board.copy())
-                moves.append(chess.Move.from_uci(best_move))
-                values.append(1.0)
-                
-                # Make a random move to generate new position
-                legal_moves = list(board.legal_moves)
-                if legal_moves:
-                    board.push(random.choice(legal_moves))
-                    return True
-            return False
-        except Exception as e:
-            self.logger.warning(f"Failed to process position: {str(e)}")
-            return False
+    def close(self):
+        """Stop the engines and close the label store and replay buffers"""
+        self.stockfish_engine.close()
+        if self.label_store is not None:
+            self.label_store.close()
+        self.self_play_buffer.close()
+        self.stockfish_buffer.close()
+    
+    def _random_positions(self, num_positions):
+        """Positions from random games, starting over whenever a game ends"""
+        positions = []
+        board = chess.Board()
+        while len(positions) < num_positions:
+            if board.is_game_over():
+                board.reset()
+            positions.append(board.copy(stack=False))
+            board.push(random.choice(list(board.legal_moves)))
+        return positions
     
     def _save_model(self):
         try:
@@ -103,4 +140,7 @@ class TrainingPipeline:
 if __name__ == "__main__":
     Config.create_directories()
     pipeline = TrainingPipeline()
-    pipeline.train() 
\ No newline at end of file
+    try:
+        pipeline.train()
+    finally:
+        pipeline.close() 
\ No newline at end of file
@@ -1,10 +1,21 @@
 from src.chess_ai.self_play import SelfPlayTrainer
+from src.chess_ai.actor_learner import ActorLearnerPipeline
 from src.chess_ai.config import Config
 
 def main():
     # Create necessary directories
     Config.create_directories()
     
+    if Config.ACTOR_LEARNER_SETTINGS['enabled']:
+        # Self-play actors and a learner process run side by side
+        pipeline = ActorLearnerPipeline(num_games=100)
+        print("Starting actor/learner self-play training...")
+        stats = pipeline.run()
+        print(f"\nTraining completed!")
+        print(f"Self-play throughput: {stats['games_per_hour']:.0f} games/hour")
+        print(f"Learner: {stats['learner']}")
+        return
+    
     # Initialize trainer
     trainer = SelfPlayTrainer(num_games=100)  # Adjust number of games as needed
     
@@ -15,6 +26,7 @@ def main():
     print(f"\nTraining completed!")
     print(f"Total positions collected: {len(positions)}")
     print(f"Total moves analyzed: {len(moves)}")
+    print(f"Self-play throughput: {trainer.games_per_hour:.0f} games/hour")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file